@@ -0,0 +1,220 @@
+"""
+Compiler and simulator benchmarks
+
+Measures the tokenizer, the parser, the translator and the simulation of
+every workload (see `workloads.py`) separately and writes the results to a
+JSON file, so results of different releases can be compared:
+
+    python benchmarks/run.py --output benchmark_results.json
+
+Simulations run in a fresh process each. The peak RSS of a simulation is
+measured from its start: the peak (VmHWM) is reset to the current RSS right
+before the simulation is created, so it includes the interpreter and the
+imported modules, but not the memory used before. Where the peak can't be
+reset (not Linux), it is the peak of the whole worker process.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
+
+import yaml
+
+BENCHMARKS_DIRNAME = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIRNAME), "src"))
+sys.path.insert(0, BENCHMARKS_DIRNAME)
+
+from workloads import DEFAULT_SIZES, WORKLOADS, Workload  # noqa: E402
+
+from compiler.parser import Parser  # noqa: E402
+from compiler.tokenizer import Tokenizer  # noqa: E402
+from compiler.translator import Translator  # noqa: E402
+from machine import ENGINES, create_simulation  # noqa: E402
+from machine.units.common.exceptions import MachineLimitException  # noqa: E402
+
+T = TypeVar("T")
+
+
+def _timed(function: Callable[[], T]) -> Tuple[T, float]:
+    started_at = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started_at
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the peak RSS of the process to its current RSS (Linux only), False if it can't be reset"""
+    try:
+        with open("/proc/self/clear_refs", mode="w") as file:
+            file.write("5")
+    except OSError:
+        return False
+
+    return True
+
+
+def _peak_rss_kb() -> int:
+    try:
+        with open("/proc/self/status", mode="r") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak_rss // 1024 if sys.platform == "darwin" else peak_rss
+
+
+def measure_compilation(workload: Workload, repeat: int) -> Tuple[bytes, Dict[str, Any]]:
+    """Best of `repeat` times of every compilation stage"""
+    tokenize_times, parse_times, translate_times = [], [], []
+
+    for _ in range(repeat):
+        tokens, tokenize_time = _timed(lambda: Tokenizer(workload.source).tokenize())
+        terms, parse_time = _timed(lambda: Parser(tokens).parse())
+        (compiled, _), translate_time = _timed(lambda: Translator(terms).translate())
+
+        tokenize_times.append(tokenize_time)
+        parse_times.append(parse_time)
+        translate_times.append(translate_time)
+
+    source_kb = len(workload.source.encode()) / 1024
+    compile_time = min(tokenize_times) + min(parse_times) + min(translate_times)
+
+    return compiled, {
+        "source_bytes": len(workload.source.encode()),
+        "binary_bytes": len(compiled),
+        "tokenize_time": min(tokenize_times),
+        "parse_time": min(parse_times),
+        "translate_time": min(translate_times),
+        "compile_time_per_kb": compile_time / source_kb,
+    }
+
+
+def count_instructions(binary_filename: str, config_filename: str, simulation_dirname: str) -> int:
+    """Executed instructions (interrupt entries included), counted by an untimed run"""
+    simulation = create_simulation(binary_filename, config_filename, simulation_dirname, "tick")
+    control_unit = simulation.control_unit
+    process_instruction = control_unit.process_instruction
+
+    count = 0
+
+    def counted_process_instruction() -> None:
+        nonlocal count
+        count += 1
+        process_instruction()
+
+    control_unit.process_instruction = counted_process_instruction
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            simulation.run()
+        except MachineLimitException:
+            pass
+
+    return count
+
+
+def measure_simulation(
+    binary_filename: str,
+    config_filename: str,
+    simulation_dirname: str,
+    engine: str,
+) -> Dict[str, Any]:
+    """Runs in a fresh worker process (see `run_benchmarks`)"""
+    peak_rss_reset = _reset_peak_rss()
+    simulation = create_simulation(binary_filename, config_filename, simulation_dirname, engine)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, wall_time = _timed(simulation.run)
+
+    return {
+        "wall_time": wall_time,
+        "ticks": simulation.control_unit._tick,
+        "output": simulation.format_output(),
+        "peak_rss_kb": _peak_rss_kb(),
+        "peak_rss_scope": "simulation" if peak_rss_reset else "process",
+    }
+
+
+def run_benchmarks(workloads: List[Workload], engines: List[str], repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as dirname:
+        for workload in workloads:
+            print(f"{workload.name} (size {workload.size})", file=sys.stderr)
+
+            compiled, result = measure_compilation(workload, repeat)
+            result = {"workload": workload.name, "size": workload.size, **result}
+
+            binary_filename = os.path.join(dirname, f"{workload.name}_{workload.size}.bin")
+            config_filename = os.path.join(dirname, f"{workload.name}_{workload.size}.yaml")
+            with open(binary_filename, mode="wb") as file:
+                file.write(compiled)
+            with open(config_filename, mode="w") as file:
+                yaml.safe_dump(workload.config, file)
+
+            simulation_dirname = os.path.join(dirname, "simulation")
+            result["instructions"] = count_instructions(binary_filename, config_filename, simulation_dirname)
+
+            result["simulations"] = {}
+            for engine in engines:
+                wall_times, simulation = [], {}
+                for _ in range(repeat):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        simulation = executor.submit(
+                            measure_simulation, binary_filename, config_filename, simulation_dirname, engine,
+                        ).result()
+                    wall_times.append(simulation["wall_time"])
+
+                wall_time = min(wall_times)
+                result["simulations"][engine] = {
+                    **simulation,
+                    "wall_time": wall_time,
+                    "ticks_per_second": simulation["ticks"] / wall_time,
+                    "instructions_per_second": result["instructions"] / wall_time,
+                }
+
+            results.append(result)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiler and the simulator")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--sizes", nargs="+", type=int, help="Workload sizes (default sizes differ per workload)")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3, help="Every measurement is the best of N runs")
+    parser.add_argument("--output", default="benchmark_results.json", help="The JSON file for the results")
+    args = parser.parse_args()
+
+    workloads = [
+        WORKLOADS[name](size)
+        for name in args.workloads
+        for size in (args.sizes or DEFAULT_SIZES[name])
+    ]
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": run_benchmarks(workloads, args.engines, args.repeat),
+    }
+
+    with open(args.output, mode="w") as file:
+        json.dump(report, file, indent=2)
+
+    print(f"Saving benchmark results to {args.output}", file=sys.stderr)
@@ -0,0 +1,101 @@
+"""
+Benchmark workloads
+
+Every workload is generated for a size parameter, so the same program can be
+measured at several scales. A workload is the source code and the machine
+config (the same format as `machine.read_config` reads).
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple
+
+TICKS_LIMIT = 10 ** 10
+INPUT_TOKENS_INTERVAL = 50
+
+JOURNAL_FMT = "{TICK:dec:32} {PC:hex:32} {AR:hex:32} {BR:hex:32}\n"
+
+
+class Workload(NamedTuple):
+    name: str
+    size: int
+    source: str
+    config: Dict[str, Any]
+
+
+def _config(memory_size: int, tokens: List[List[Any]], output_fmt: str) -> Dict[str, Any]:
+    return {
+        "machine": {
+            "ticks_limit": TICKS_LIMIT,
+            "memory_size": memory_size,
+        },
+        "journal_fmt": JOURNAL_FMT,
+        "memio": {
+            "tokens": tokens,
+            "output_fmt": output_fmt,
+        },
+    }
+
+
+def nested_loops(size: int) -> Workload:
+    """Arithmetic in two nested loops (`size` x `size` iterations)"""
+    source = (
+        "total:int32 = 0\n"
+        f"for [i:int32 = 0; i < {size}; i = i + 1] {{\n"
+        f"    for [j:int32 = 0; j < {size}; j = j + 1] {{\n"
+        "        total = total + i * j % 7\n"
+        "    }\n"
+        "}\n"
+        "print(total)\n"
+    )
+    return Workload("nested_loops", size, source, _config(2000, [], "num"))
+
+
+def string_output(size: int) -> Workload:
+    """A string printed `size` times"""
+    source = (
+        f"for [i:int32 = 0; i < {size}; i = i + 1] {{\n"
+        "    print(\"Hello, World!\")\n"
+        "}\n"
+    )
+    return Workload("string_output", size, source, _config(2000, [], "str"))
+
+
+def heavy_input(size: int) -> Workload:
+    """`size` input tokens read into a string and printed back"""
+    tokens = [[INPUT_TOKENS_INTERVAL * (i + 1), chr(ord("a") + i % 26)] for i in range(size)]
+    tokens.append([INPUT_TOKENS_INTERVAL * (size + 1), "\0"])
+
+    source = (
+        f"text:str = input({size})\n"
+        "print(text)\n"
+    )
+    return Workload("heavy_input", size, source, _config(4000 + 64 * size, tokens, "str"))
+
+
+def long_program(size: int) -> Workload:
+    """`size` statements of straight-line code (mostly stresses the compiler)"""
+    lines = ["acc:int32 = 1"]
+    for i in range(size):
+        if i % 3 == 0:
+            lines.append(f"acc = acc * 3 + {i} % 11 - (acc >> 2)")
+        elif i % 3 == 1:
+            lines.append(f"if [acc > {i}] {{\n    acc = acc - {i}\n}} else {{\n    acc = acc + {i}\n}}")
+        else:
+            lines.append(f"acc = (acc + {i}) % 1000")
+    lines.append("print(acc)")
+
+    return Workload("long_program", size, "\n".join(lines) + "\n", _config(2000 + 200 * size, [], "num"))
+
+
+WORKLOADS: Dict[str, Callable[[int], Workload]] = {
+    "nested_loops": nested_loops,
+    "string_output": string_output,
+    "heavy_input": heavy_input,
+    "long_program": long_program,
+}
+
+DEFAULT_SIZES: Dict[str, List[int]] = {
+    "nested_loops": [10, 30, 100],
+    "string_output": [10, 100, 300],
+    "heavy_input": [10, 100, 300],
+    "long_program": [100, 300, 1000],
+}
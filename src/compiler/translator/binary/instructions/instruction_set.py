@@ -48,6 +48,11 @@ class Move(R2Instruction):
         super().__init__(InstructionOpcode.MV, *args)
 
 
+class Swap(R2Instruction):
+    def __init__(self, *args):
+        super().__init__(InstructionOpcode.SWAP, *args)
+
+
 class SignedAddition(R3Instruction):
     def __init__(self, *args):
         super().__init__(InstructionOpcode.ADD, *args)
@@ -5,3 +5,4 @@ WORD_SIZE = 32
 # Instruction
 REG_ID_SIZE = 5
 INSTR_OPCODE_SIZE = 7
+ADDRESSING_MODE_SIZE = 3
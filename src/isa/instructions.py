@@ -1,4 +1,7 @@
 from enum import Enum
+from typing import List, Optional
+
+from .constants import ADDRESSING_MODE_SIZE, INSTR_OPCODE_SIZE
 
 
 class InstructionOpcode(Enum):
@@ -10,6 +13,7 @@ class InstructionOpcode(Enum):
     LWR = "1010010"
     SWR = "1010011"
     MV = "1010101"
+    SWAP = "1010110"
 
     # Arithmetic Instructions
     ADD = "1100000"
@@ -60,6 +64,14 @@ class InstructionOpcode(Enum):
     def bincode(self) -> str:
         return self.value
 
+    @property
+    def opcode(self) -> int:
+        return int(self.value, 2)
+
+    @property
+    def addressing_mode(self) -> "AddressingMode":
+        return AddressingMode(self.value[:ADDRESSING_MODE_SIZE])
+
 
 class AddressingMode(Enum):
     ABSOLUTE = "000"
@@ -73,3 +85,20 @@ class AddressingMode(Enum):
     @property
     def bincode(self) -> str:
         return self.value
+
+    @property
+    def code(self) -> int:
+        return int(self.value, 2)
+
+
+OPCODES_COUNT = 2 ** INSTR_OPCODE_SIZE
+
+INSTRUCTION_BY_OPCODE: List[Optional[InstructionOpcode]] = [None] * OPCODES_COUNT
+"""Instructions indexed by their integer opcode (None for unused opcodes)"""
+
+ADDRESSING_MODE_BY_OPCODE: List[Optional[AddressingMode]] = [None] * OPCODES_COUNT
+"""Addressing modes indexed by the integer opcode (None for unused opcodes)"""
+
+for _instruction in InstructionOpcode:
+    INSTRUCTION_BY_OPCODE[_instruction.opcode] = _instruction
+    ADDRESSING_MODE_BY_OPCODE[_instruction.opcode] = _instruction.addressing_mode
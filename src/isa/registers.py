@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List
 
 
 class RegisterCode(Enum):
@@ -34,3 +35,11 @@ class RegisterCode(Enum):
     A6 = "11101"
     A7 = "11110"
     A8 = "11111"
+
+    @property
+    def code(self) -> int:
+        return int(self.value, 2)
+
+
+REGISTER_BY_CODE: List[RegisterCode] = sorted(RegisterCode, key=lambda register: register.code)
+"""Registers indexed by their integer code"""
@@ -1,22 +1,61 @@
+import asyncio
+import contextlib
+import json
+import math
 import os
-from typing import Any, Dict, List, Tuple
+import sys
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import yaml
 
 from isa.constants import WORD_SIZE
-from machine.fmt.format_instruction import string_repr_instruction
 
-from .constants import OUTPUT_ADDR
+from .checkpoint import load_checkpoint, save_checkpoint
+from .constants import START_ADDR
+from .fmt.format_instruction import repr_instruction
 from .fmt.format_number import _LogNumberFmt, format_number
-from .units.common.exceptions import MachineStop
+from .journal import JournalWriter
+from .live import (
+    LIVE_STDIO,
+    LIVE_YIELD_EVERY,
+    LiveInput,
+    LiveOutput,
+    Sink,
+    open_live_io,
+)
+from .profiler import ProfiledMemory, Profiler
+from .snapshots import SNAPSHOTS_DIRNAME, SnapshotRecorder, find_snapshot
+from .units.block_engine import BlockEngine
+from .units.common.exceptions import MachineLimitException, MachineStop
 from .units.common.helpers import convert_to_signed
 from .units.control_unit import ControlUnit
+from .units.core_scheduler import CoreScheduler
 from .units.datapath import Datapath
+from .units.instruction_engine import InstructionEngine
 from .units.memory import Memory
+from .units.memory_cache import MemoryCache
+from .units.trace import TickTrace
 
 MEMORY_DUMP_FILENAME = "memory.txt"
 EXEC_LOG_FILENAME = "execution.txt"
 OUTPUT_LOG_FILENAME = "output.txt"
+PROFILE_REPORT_FILENAME = "profile.txt"
+PROFILE_JSON_FILENAME = "profile.json"
+CACHE_STATS_FILENAME = "cache.json"
+
+TICK_ENGINE = "tick"
+INSTRUCTION_ENGINE = "instruction"
+BLOCK_ENGINE = "block"
+ENGINES = (TICK_ENGINE, INSTRUCTION_ENGINE, BLOCK_ENGINE)
 
 
 class Simulation:
@@ -29,31 +68,336 @@ class Simulation:
         tokens: Dict[int, str],
         journal_fmt: List[Tuple[str, _LogNumberFmt, int]],
         output_fmt: str,
+        engine: str = TICK_ENGINE,
+        memory_mapped: bool = False,
+        journal_chunk_size: Optional[int] = None,
+        signal_log: bool = False,
+        strict_checks: bool = True,
+        snapshot_every: Optional[int] = None,
+        profile: bool = False,
+        cache: Optional[Dict[str, Any]] = None,
+        cores: int = 1,
+        start_addrs: Optional[List[int]] = None,
     ):
-        self.memory_size: int = memory_size
-        self.memory_unit: Memory = Memory(memory_filename, memory_size)
+        """
+        `cache` is the memory cache config (`MemoryCache` arguments), the machine has no cache without it.
+
+        With several `cores`, every core has its own datapath, control unit
+        and memory cache, and starts at its address of `start_addrs` (all of
+        them start at `START_ADDR` by default). The cores share the memory
+        and are run by `CoreScheduler` on the tick-level engine. The first
+        core owns the I/O ports, the execution journal traces it only.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"unexpected engine {engine} (enabled engines are {', '.join(ENGINES)})")
+
+        start_addrs = start_addrs or [START_ADDR] * cores
+        if cores < 1 or len(start_addrs) != cores:
+            raise ValueError(f"expected a start address for each of {cores} cores (got {len(start_addrs)})")
+        if cores > 1 and (engine != TICK_ENGINE or snapshot_every is not None or profile):
+            raise ValueError("several cores run on the tick-level engine only, without snapshots and profiling")
 
-        self.datapath: Datapath = Datapath(self.memory_unit)
+        self.memory_size: int = memory_size
+        self.profiler: Optional[Profiler] = None
+        self.memory_unit: Memory
+        if profile:
+            self.memory_unit = ProfiledMemory(memory_filename, memory_size, mapped=memory_mapped)
+            self.profiler = self.memory_unit.profiler
+        else:
+            self.memory_unit = Memory(memory_filename, memory_size, mapped=memory_mapped)
+
+        self.caches: List[MemoryCache] = [MemoryCache(**cache) for _ in range(cores)] if cache is not None else []
+        self.cache: Optional[MemoryCache] = self.caches[0] if self.caches else None
+        self.datapath: Datapath = Datapath(self.memory_unit, self.cache, start_addrs[0])
+        self.datapaths: List[Datapath] = [self.datapath]
+        for index in range(1, cores):
+            core_cache = self.caches[index] if self.caches else None
+            self.datapaths.append(
+                Datapath(self.memory_unit, core_cache, start_addrs[index], self.datapath.output_port),
+            )
+
+        for datapath in self.datapaths:
+            datapath.set_strict_checks(strict_checks)
+            datapath.control_unit.ticks_limit = ticks_limit
+            datapath.control_unit.signal_log_enabled = signal_log
 
         self.control_unit: ControlUnit = self.datapath.control_unit
-        self.control_unit.ticks_limit = ticks_limit
         self.control_unit.input_tokens = tokens
+        self.core_scheduler: Optional[CoreScheduler] = None
+        if cores > 1:
+            self.core_scheduler = CoreScheduler([datapath.control_unit for datapath in self.datapaths])
 
         self.simulation_dirname: str = simulation_dirname
         self.journal_fmt: List[Tuple[str, _LogNumberFmt, int]] = journal_fmt
         self.output_fmt: str = output_fmt
+        self.journal_chunk_size: Optional[int] = journal_chunk_size
+        self.journal_writer: Optional[JournalWriter] = None
+
+        self.engine: str = engine
+        self.instruction_engine: Optional[InstructionEngine] = None
+        if engine in (INSTRUCTION_ENGINE, BLOCK_ENGINE):
+            engine_class = BlockEngine if engine == BLOCK_ENGINE else InstructionEngine
+            self.instruction_engine = engine_class(self.control_unit)
+            self.instruction_engine.profiler = self.profiler
+        else:
+            journal_fields = [register for register, *_ in journal_fmt] + ["IR"]
+            self.control_unit.trace = TickTrace(journal_fields, self.control_unit.trace_probes(), journal_chunk_size)
+
+        self.snapshot_every: Optional[int] = snapshot_every
+        self.snapshots_dirname: str = os.path.join(simulation_dirname, SNAPSHOTS_DIRNAME)
+
+        self.halted: bool = False
+        """The machine has stopped at HALT (every core has, with several cores)"""
+        self.finished: bool = False
+        """The logs of an incremental run are saved (see `finish`)"""
+        self._logs_started: bool = False
+
+    @property
+    def tick(self) -> int:
+        return self.control_unit._tick
 
     def run(self) -> None:
-        self.make_memory_log()
+        self._start_logs()
+
+        try:
+            if self.snapshot_every is None:
+                self._run_until(None)
+            else:
+                snapshot_recorder = SnapshotRecorder(self.snapshots_dirname, self.snapshot_every)
+                while True:
+                    snapshot_recorder.record(self.datapath)
+                    self._run_until(snapshot_recorder.next_tick)
+        except MachineStop:
+            self.halted = True
+        finally:
+            self._finish_logs()
+
+    async def run_live(
+        self,
+        source: AsyncIterator[str],
+        sink: Sink,
+        yield_every: int = LIVE_YIELD_EVERY,
+        ticks_per_second: Optional[float] = None,
+    ) -> None:
+        """
+        Run with live I/O, without snapshots (see `machine.live`)
+
+        Characters of `source` become input tokens as they arrive (see
+        `LiveInput`), output words are passed to `sink` formatted by
+        `output_fmt`. Every `yield_every` ticks the output is flushed and the
+        event loop gets control. Logs are saved as by `run`.
+
+        The machine runs as fast as it can, so waiting for input uses up the
+        ticks limit quickly. With `ticks_per_second`, the simulation sleeps
+        between the slices to keep the machine clock at this rate.
+        """
+        live_input = LiveInput(self.control_unit, source)
+        live_output = LiveOutput(self.datapath.output_port, self.format_word)
+        reader = asyncio.create_task(live_input.read())
+
+        loop = asyncio.get_running_loop()
+        started_at, start_tick = loop.time(), self.control_unit._tick
+
+        self._start_logs()
 
         try:
             while True:
-                self.control_unit.process_instruction()
+                live_input.start_polling()
+                try:
+                    self._run_until(self.control_unit._tick + yield_every)
+                finally:
+                    await live_output.flush(sink)
+
+                delay = 0.0
+                if ticks_per_second is not None:
+                    delay = started_at + (self.control_unit._tick - start_tick) / ticks_per_second - loop.time()
+                await asyncio.sleep(max(delay, 0.0))
         except MachineStop:
-            pass
+            self.halted = True
         finally:
+            reader.cancel()
+            live_input.stop_polling()
+            live_output.close()
+            self._finish_logs()
+
+    def step(self) -> None:
+        """
+        Run a single instruction (of the first core, the others run the same ticks)
+
+        `step`, `run_for` and `run_until` keep the machine state between
+        calls. The first of them starts the logs as `run` does (the memory
+        dump and the streamed execution journal), `finish` saves the rest.
+        They do nothing once the machine has halted (see `halted`) or the run
+        is finished, `MachineLimitException` is raised as by `run`. Snapshots
+        are recorded by `run` only.
+        """
+        if not self._prepare_incremental():
+            return
+
+        try:
+            self._run_until(self.tick + 1)
+
+            # the scheduler runs tick by tick, a halted first core takes no instructions
+            control_unit, core_scheduler = self.control_unit, self.core_scheduler
+            while (
+                core_scheduler is not None
+                and not core_scheduler.halted[0]
+                and (control_unit.microstep_index != 0 or control_unit.stall_ticks != 0)
+            ):
+                core_scheduler.run(self.tick + 1)
+        except MachineStop:
+            self.halted = True
+
+    def run_for(self, ticks: int) -> None:
+        """Run until the first instruction boundary `ticks` ticks later or after (see `step`)"""
+        if not self._prepare_incremental():
+            return
+
+        try:
+            self._run_until(self.tick + ticks)
+        except MachineStop:
+            self.halted = True
+
+    def run_until(self, target: Union[int, Callable[["Simulation"], bool]], max_ticks: Optional[int] = None) -> bool:
+        """
+        Run instruction by instruction until `target` is reached (see `step`)
+
+        `target` is the address of the next instruction or a predicate of the
+        simulation, both are checked at instruction boundaries (of the first
+        core). Returns False when the machine halts or `max_ticks` pass first.
+        """
+        reached: Callable[[Simulation], bool]
+        if callable(target):
+            reached = target
+        else:
+            def reached(simulation: Simulation) -> bool:
+                return simulation.control_unit.pc.get_value() == target
+
+        stop = math.inf if max_ticks is None else self.tick + max_ticks
+        while not reached(self):
+            if self.halted or self.finished or self.tick >= stop:
+                return False
+            self.step()
+
+        return True
+
+    def finish(self) -> None:
+        """
+        Save the logs of the run made by `step`, `run_for` and `run_until`
+
+        The logs are the same as `run` saves. The run can't be continued
+        after it, the next calls do nothing.
+        """
+        if self.finished:
+            return
+
+        self.finished = True
+        if not self._logs_started:
+            self._start_logs()
+        self._finish_logs()
+
+    def _prepare_incremental(self) -> bool:
+        """Start the logs before the first incremental step, False if the run can't be continued"""
+        if self.halted or self.finished:
+            return False
+
+        if not self._logs_started:
+            self._start_logs()
+        return True
+
+    def _start_logs(self) -> None:
+        self._logs_started = True
+        self.make_memory_log()
+
+        if self.control_unit.trace is not None and self.journal_chunk_size is not None:
+            self.journal_writer = self.open_execution_log()
+            self.control_unit.trace.on_chunk = self.journal_writer.write_trace
+
+    def _finish_logs(self) -> None:
+        if self.control_unit.trace is not None:
             self.make_execution_log()
-            self.make_output_log()
+        self.make_output_log()
+        if self.profiler is not None:
+            self.make_profile_log()
+        if self.cache is not None:
+            self.make_cache_log()
+
+    def _run_until(self, stop_tick: Optional[int]) -> None:
+        """Run instructions until the first instruction boundary at `stop_tick` or later"""
+        if self.instruction_engine is not None:
+            self.instruction_engine.run(stop_tick)
+            return
+
+        if self.core_scheduler is not None:
+            self.core_scheduler.run(stop_tick)
+            return
+
+        control_unit = self.control_unit
+        stop = math.inf if stop_tick is None else stop_tick
+
+        if self.profiler is None:
+            while control_unit._tick < stop:
+                control_unit.process_instruction()
+            return
+
+        record_instruction = self.profiler.record_instruction
+        while control_unit._tick < stop:
+            pc, tick = control_unit.pc.get_value(), control_unit._tick
+            control_unit.process_instruction()
+            record_instruction(pc, control_unit.instruction_decoder.ir.get_value(), control_unit._tick - tick)
+
+    def restore_tick(self, tick: int, snapshots_dirname: Optional[str] = None) -> None:
+        """
+        Rebuild the machine state at `tick` from snapshots (see `snapshot_every`)
+
+        The latest snapshot taken at `tick` or before is loaded, and the rest
+        is simulated by the tick-level engine without recording the trace.
+        If the machine halts before `tick`, the state is the halted one.
+        """
+        _, snapshot_filename = find_snapshot(snapshots_dirname or self.snapshots_dirname, tick)
+        self.load_checkpoint(snapshot_filename)
+
+        control_unit = self.control_unit
+        trace, ticks_limit = control_unit.trace, control_unit.ticks_limit
+        control_unit.trace, control_unit.ticks_limit = None, tick
+
+        try:
+            while control_unit._tick < tick:
+                control_unit.process_instruction()
+        except (MachineLimitException, MachineStop):
+            pass
+        finally:
+            control_unit.trace, control_unit.ticks_limit = trace, ticks_limit
+
+    def state_line(self) -> str:
+        """The current machine state formatted as an execution journal line"""
+        probes = self.control_unit.trace_probes()
+
+        registers_state = ", ".join(
+            f"{register}[{fmt.value}]: {format_number(probes[register](), fmt, *args)}"
+            for register, fmt, *args in self.journal_fmt
+        )
+        return f"{registers_state} - {repr_instruction(probes['IR']())}"
+
+    def save_checkpoint(self, path: str) -> None:
+        """Save the machine state, so the simulation can be resumed later by `load_checkpoint`"""
+        self._check_single_core("checkpoints")
+        save_checkpoint(self.datapath, path)
+
+    def load_checkpoint(self, path: str) -> None:
+        """
+        Restore the machine state saved by `save_checkpoint`
+
+        The memory size must be the same, ticks limit and the journal settings
+        are taken from this simulation. The next `run` continues from the
+        restored tick.
+        """
+        self._check_single_core("checkpoints")
+        load_checkpoint(self.datapath, path)
+
+    def _check_single_core(self, feature: str) -> None:
+        if len(self.datapaths) > 1:
+            raise ValueError(f"{feature} aren't supported with several cores")
 
     def make_memory_log(self):
         os.makedirs(self.simulation_dirname, exist_ok=True)
@@ -61,9 +405,10 @@ class Simulation:
         memory_dump_filename = os.path.join(self.simulation_dirname, MEMORY_DUMP_FILENAME)
         print(f"Saving memory dump to {memory_dump_filename}")
 
+        memory = self.memory_unit.dump()
         with open(memory_dump_filename, mode="w+") as file:
             for i in range(0, self.memory_size, 4):
-                value = self.memory_unit.read(i)
+                value = int.from_bytes(memory[i:i + 4], byteorder="big")
 
                 addr = format_number(i, _LogNumberFmt.HEXADECIMAL, len(bin(self.memory_size)[2:]))
                 hex_value = format_number(value, _LogNumberFmt.HEXADECIMAL, WORD_SIZE)
@@ -71,25 +416,22 @@ class Simulation:
 
                 file.write(f"{addr}: {hex_value} - {bin_value}\n")
 
-    def make_execution_log(self):
+    def open_execution_log(self) -> JournalWriter:
         os.makedirs(self.simulation_dirname, exist_ok=True)
 
         simulation_filename = os.path.join(self.simulation_dirname, EXEC_LOG_FILENAME)
         print(f"Saving simulation log to {simulation_filename}")
 
-        with open(simulation_filename, mode="w+") as file:
-            for entry in self.control_unit.simulation_log:
-                if "tick_state" in entry:
-                    tick_state = entry["tick_state"]
+        return JournalWriter(simulation_filename, self.journal_fmt)
 
-                    line = []
-                    for element in self.journal_fmt:
-                        register, fmt, *args = element
-                        line.append(f"{register}[{fmt.value}]: {format_number(tick_state[register], fmt, *args)}")
+    def make_execution_log(self):
+        journal_writer = self.journal_writer or self.open_execution_log()
+        self.journal_writer = None
 
-                    instruction = string_repr_instruction(bin(tick_state['IR'])[2:].zfill(WORD_SIZE))
-                    registers_state = ", ".join(line)
-                    file.write(f"{registers_state} - {instruction}\n")
+        try:
+            journal_writer.write_trace(self.control_unit.trace)
+        finally:
+            journal_writer.close()
 
     def make_output_log(self):
         os.makedirs(self.simulation_dirname, exist_ok=True)
@@ -98,19 +440,57 @@ class Simulation:
         print(f"Saving output log to {output_filename}")
 
         with open(output_filename, mode="w+") as file:
-            output = []
-            for entry in self.control_unit.simulation_log:
-                if "signal" in entry and entry["signal"]["type"] == "mem_write":
-                    if entry["signal"]["data"]["addr"] == OUTPUT_ADDR:
-                        value = entry["signal"]["data"]["value"]
-                        output.append(convert_to_signed(value, WORD_SIZE))
-
-            if self.output_fmt == "num":
-                file.write(str(output))
-            elif self.output_fmt == "str":
-                file.write("".join(chr(char) for char in output))
-            else:
-                raise NotImplementedError(f"unexpected output format {self.output_fmt}")
+            file.write(self.format_output())
+
+    def make_profile_log(self):
+        os.makedirs(self.simulation_dirname, exist_ok=True)
+        memory = self.memory_unit.dump()
+
+        report_filename = os.path.join(self.simulation_dirname, PROFILE_REPORT_FILENAME)
+        print(f"Saving profile report to {report_filename}")
+        self.profiler.write_report(report_filename, memory)
+
+        json_filename = os.path.join(self.simulation_dirname, PROFILE_JSON_FILENAME)
+        print(f"Saving profile to {json_filename}")
+        self.profiler.write_json(json_filename, memory)
+
+    def make_cache_log(self):
+        os.makedirs(self.simulation_dirname, exist_ok=True)
+        stats = self.cache.stats()
+
+        cache_stats_filename = os.path.join(self.simulation_dirname, CACHE_STATS_FILENAME)
+        print(f"Saving cache statistics to {cache_stats_filename} (hit rate {stats['hit_rate']:.2%})")
+
+        if len(self.caches) > 1:
+            # statistics of every core, the hit rate above is of the first one
+            stats = {"cores": [cache.stats() for cache in self.caches]}
+
+        with open(cache_stats_filename, mode="w") as file:
+            json.dump(stats, file, indent=2)
+
+    def format_output(self) -> str:
+        """Program output formatted by `output_fmt`"""
+        output = [convert_to_signed(value, WORD_SIZE) for value in self.datapath.output_port.buffer]
+
+        if self.output_fmt == "num":
+            return str(output)
+
+        if self.output_fmt == "str":
+            return "".join(chr(char) for char in output)
+
+        raise NotImplementedError(f"unexpected output format {self.output_fmt}")
+
+    def format_word(self, word: int) -> str:
+        """A single output word formatted by `output_fmt` (numbers are put on separate lines)"""
+        value = convert_to_signed(word, WORD_SIZE)
+
+        if self.output_fmt == "num":
+            return f"{value}\n"
+
+        if self.output_fmt == "str":
+            return chr(value)
+
+        raise NotImplementedError(f"unexpected output format {self.output_fmt}")
 
 
 def read_config(filename: str) -> Dict[str, Any]:
@@ -131,9 +511,16 @@ def read_config(filename: str) -> Dict[str, Any]:
     return config
 
 
-def run_simulation(memory_filename: str, config_filename: str, simulation_dirname: str = "simulation") -> None:
+def create_simulation(
+    memory_filename: str,
+    config_filename: str,
+    simulation_dirname: str = "simulation",
+    engine: Optional[str] = None,
+    snapshot_every: Optional[int] = None,
+    profile: bool = False,
+) -> Simulation:
     config = read_config(config_filename)
-    simulation = Simulation(
+    return Simulation(
         memory_filename,
         config["machine"]["memory_size"],
         simulation_dirname,
@@ -141,6 +528,73 @@ def run_simulation(memory_filename: str, config_filename: str, simulation_dirnam
         config["memio"]["tokens"],
         config["journal_fmt"],
         config["memio"]["output_fmt"],
+        engine or config["machine"].get("engine", TICK_ENGINE),
+        config["machine"].get("memory_mapped", False),
+        config["machine"].get("journal_chunk_size"),
+        config["machine"].get("signal_log", False),
+        config["machine"].get("strict_checks", True),
+        snapshot_every or config["machine"].get("snapshot_every"),
+        profile or config["machine"].get("profile", False),
+        config["machine"].get("cache"),
+        config["machine"].get("cores", 1),
+        config["machine"].get("start_addrs"),
     )
 
+
+def run_simulation(
+    memory_filename: str,
+    config_filename: str,
+    simulation_dirname: str = "simulation",
+    engine: Optional[str] = None,
+    snapshot_every: Optional[int] = None,
+    profile: bool = False,
+) -> None:
+    simulation = create_simulation(
+        memory_filename, config_filename, simulation_dirname, engine, snapshot_every, profile,
+    )
     simulation.run()
+
+
+def run_live_simulation(
+    memory_filename: str,
+    config_filename: str,
+    live_path: str = LIVE_STDIO,
+    simulation_dirname: str = "simulation",
+    engine: Optional[str] = None,
+    yield_every: int = LIVE_YIELD_EVERY,
+    ticks_per_second: Optional[float] = None,
+) -> None:
+    """
+    Run with live I/O through `live_path` (see `open_live_io`)
+
+    Input tokens of the config are ignored, log messages go to stderr.
+    """
+    simulation = create_simulation(memory_filename, config_filename, simulation_dirname, engine)
+    simulation.control_unit.input_tokens = {}
+    output = sys.stdout
+
+    async def run() -> None:
+        async with open_live_io(live_path, output) as (source, sink):
+            await simulation.run_live(source, sink, yield_every, ticks_per_second)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        asyncio.run(run())
+
+
+def restore_simulation(
+    memory_filename: str,
+    config_filename: str,
+    tick: int,
+    simulation_dirname: str = "simulation",
+    checkpoint_filename: Optional[str] = None,
+) -> Simulation:
+    """Rebuild the state at `tick` from snapshots of a previous run and print it as a journal line"""
+    simulation = create_simulation(memory_filename, config_filename, simulation_dirname)
+    simulation.restore_tick(tick)
+    print(simulation.state_line())
+
+    if checkpoint_filename is not None:
+        print(f"Saving checkpoint to {checkpoint_filename}")
+        simulation.save_checkpoint(checkpoint_filename)
+
+    return simulation
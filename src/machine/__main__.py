@@ -1,11 +1,85 @@
 import argparse
 
-from . import run_simulation
+from . import ENGINES, restore_simulation, run_live_simulation, run_simulation
+from .live import LIVE_STDIO, LIVE_YIELD_EVERY
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("memory_filename", help="The memory dump file name")
     parser.add_argument("config_filename", help="The machine's config file name")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help="The simulation engine (overrides the machine's config, tick-level by default)",
+    )
+    parser.add_argument(
+        "--snapshot-every",
+        type=int,
+        metavar="N",
+        help="Save a machine state snapshot every N ticks (overrides the machine's config)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Count ticks per instruction and memory accesses per word, save a hot-spot report",
+    )
+    parser.add_argument(
+        "--live",
+        nargs="?",
+        const=LIVE_STDIO,
+        metavar="PATH",
+        help=(
+            "Stream input while running from stdin, a file (followed like tail -f) or a Unix socket, "
+            "the output goes to stdout (or to the socket)"
+        ),
+    )
+    parser.add_argument(
+        "--yield-every",
+        type=int,
+        default=LIVE_YIELD_EVERY,
+        metavar="N",
+        help="Ticks simulated between live I/O updates",
+    )
+    parser.add_argument(
+        "--ticks-per-second",
+        type=float,
+        metavar="RATE",
+        help="Keep the machine clock of a live run at this rate (as fast as possible by default)",
+    )
+    parser.add_argument(
+        "--restore-tick",
+        type=int,
+        metavar="T",
+        help="Don't run, rebuild the state at tick T from snapshots of the previous run and print it",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILENAME",
+        help="Save the state rebuilt by --restore-tick as a checkpoint",
+    )
     args = parser.parse_args()
 
-    run_simulation(args.memory_filename, args.config_filename)
+    if args.restore_tick is not None:
+        restore_simulation(
+            args.memory_filename,
+            args.config_filename,
+            args.restore_tick,
+            checkpoint_filename=args.checkpoint,
+        )
+    elif args.live is not None:
+        run_live_simulation(
+            args.memory_filename,
+            args.config_filename,
+            args.live,
+            engine=args.engine,
+            yield_every=args.yield_every,
+            ticks_per_second=args.ticks_per_second,
+        )
+    else:
+        run_simulation(
+            args.memory_filename,
+            args.config_filename,
+            engine=args.engine,
+            snapshot_every=args.snapshot_every,
+            profile=args.profile,
+        )
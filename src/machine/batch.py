@@ -0,0 +1,128 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+import yaml
+
+from . import ENGINES, create_simulation
+from .units.common.exceptions import MachineLimitException
+
+HALT_REASON_HALT = "halt"
+HALT_REASON_TICKS_LIMIT = "ticks_limit"
+HALT_REASON_ERROR = "error"
+
+
+def read_manifest(filename: str) -> List[Dict[str, Any]]:
+    """
+    Read jobs of a batch
+
+    The manifest is a yaml file with the `jobs` list, each job has the
+    `binary` and `config` paths (relative to the manifest) and an optional
+    `name` (the binary name by default) and `engine`.
+    """
+    with open(filename, "r", encoding="utf-8") as file:
+        manifest = yaml.safe_load(file)
+
+    manifest_dirname = os.path.dirname(os.path.abspath(filename))
+
+    jobs = []
+    for job in manifest["jobs"]:
+        binary = os.path.join(manifest_dirname, job["binary"])
+        jobs.append({
+            "name": job.get("name", os.path.splitext(os.path.basename(binary))[0]),
+            "binary": binary,
+            "config": os.path.join(manifest_dirname, job["config"]),
+            "engine": job.get("engine"),
+        })
+
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("job names must be unique (set `name` for jobs with the same binary name)")
+
+    return jobs
+
+
+def run_job(job: Dict[str, Any], simulation_dirname: str, engine: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a single job and summarize it (simulation logs are saved as usual)
+
+    Any error of the job (including the output formatting) is put into the
+    summary, the job has no output then.
+    """
+    summary = {"name": job["name"], "binary": job["binary"], "config": job["config"]}
+    started_at = time.perf_counter()
+
+    simulation = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation = create_simulation(
+                job["binary"],
+                job["config"],
+                os.path.join(simulation_dirname, job["name"]),
+                engine or job["engine"],
+            )
+
+            try:
+                simulation.run()
+                summary["halt_reason"] = HALT_REASON_HALT
+            except MachineLimitException:
+                summary["halt_reason"] = HALT_REASON_TICKS_LIMIT
+
+            summary["output"] = simulation.format_output()
+            if simulation.cache is not None:
+                summary["cache"] = simulation.cache.stats()
+    except Exception as exception:
+        summary["halt_reason"] = HALT_REASON_ERROR
+        summary["error"] = f"{type(exception).__name__}: {exception}"
+        summary["output"] = None
+
+    summary["ticks"] = simulation.control_unit._tick if simulation is not None else 0
+    summary["wall_time"] = time.perf_counter() - started_at
+
+    return summary
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    simulation_dirname: str,
+    workers: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Run jobs in a process pool, summaries are yielded in the order of jobs"""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_job, job, simulation_dirname, engine) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+
+def write_summary(summaries: Iterator[Dict[str, Any]], file: TextIO) -> None:
+    for summary in summaries:
+        file.write(json.dumps(summary) + "\n")
+        file.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run simulations of a manifest in parallel")
+    parser.add_argument("manifest_filename", help="The yaml file with the jobs list")
+    parser.add_argument("--summary", help="The JSON lines file for the jobs summary (stdout by default)")
+    parser.add_argument("--workers", type=int, help="The count of worker processes (CPU count by default)")
+    parser.add_argument(
+        "--simulation-dir",
+        default="simulation",
+        help="The directory for simulation logs (every job has a subdirectory named after it)",
+    )
+    parser.add_argument("--engine", choices=ENGINES, help="The simulation engine for all jobs")
+    args = parser.parse_args()
+
+    summaries = run_batch(read_manifest(args.manifest_filename), args.simulation_dir, args.workers, args.engine)
+    if args.summary is None:
+        write_summary(summaries, sys.stdout)
+    else:
+        with open(args.summary, mode="w") as file:
+            write_summary(summaries, file)
@@ -0,0 +1,217 @@
+import struct
+import zlib
+from typing import List, Tuple
+
+from .units.common.components import DataLatch, DataSelector
+from .units.datapath import Datapath
+
+CHECKPOINT_MAGIC = b"CSACKPT\0"
+CHECKPOINT_VERSION = 2
+
+_HEADER = struct.Struct(">8sH")
+"""Magic bytes and format version, the rest of a checkpoint is zlib-compressed"""
+
+
+def machine_components(datapath: Datapath) -> Tuple[List[DataLatch], List[DataSelector]]:
+    """All latches and selectors of the machine in the checkpoint order"""
+    control_unit = datapath.control_unit
+    decoder = control_unit.instruction_decoder
+    interrupt_handler = control_unit.interrupt_handler
+
+    latches = [
+        datapath.ar,
+        datapath.br,
+        datapath.alu.a,
+        datapath.alu.b,
+        *(datapath.alu.flags[flag] for flag in "NZVC"),
+        *datapath.register_file.registers,
+        control_unit.jpc,
+        control_unit.pc,
+        decoder.ir,
+        decoder.opcode,
+        decoder.imm,
+        decoder.r1,
+        decoder.r2,
+        decoder.r3,
+        *(decoder.flags[flag] for flag in "NZVC"),
+        interrupt_handler.irq,
+        interrupt_handler.ie,
+        interrupt_handler.ipc,
+    ]
+
+    selectors = [
+        datapath.mux_ar,
+        datapath.mux_cu,
+        datapath.mux_alu_a,
+        datapath.mux_alu_b,
+        datapath.mux_br,
+        control_unit.mux_dp,
+        control_unit.mux_jpc,
+        control_unit.mux_pc,
+        decoder.out,
+        interrupt_handler.out,
+    ]
+
+    return latches, selectors
+
+
+def encode_checkpoint(datapath: Datapath) -> bytes:
+    """
+    Machine state as a checkpoint
+
+    Captures memory, every latch and selector, the tick counter, the position
+    inside the current instruction (pending cache stall ticks included), the
+    input tokens which are not delivered yet, the output port buffer and the
+    memory cache state. The signal log isn't a part of the state.
+    """
+    control_unit = datapath.control_unit
+    latches, selectors = machine_components(datapath)
+
+    body = bytearray()
+    _write_varint(body, control_unit._tick)
+    _write_varint(body, control_unit.microstep_index)
+    _write_varint(body, control_unit.stall_ticks)
+
+    _write_varint(body, len(latches))
+    for latch in latches:
+        _write_varint(body, latch.get_value())
+
+    _write_varint(body, len(selectors))
+    for selector in selectors:
+        input_values = selector.get_input_values()
+        _write_varint(body, len(input_values))
+        _write_varint(body, selector.get_selected_input())
+        for value in input_values:
+            _write_varint(body, value)
+
+    tokens = sorted((tick, token) for tick, token in control_unit.input_tokens.items() if tick > control_unit._tick)
+    _write_varint(body, len(tokens))
+    for tick, token in tokens:
+        _write_varint(body, tick)
+        _write_varint(body, ord(token))
+
+    output = datapath.output_port.buffer
+    _write_varint(body, len(output))
+    for value in output:
+        _write_varint(body, value)
+
+    memory = datapath.memory.dump()
+    _write_varint(body, len(memory))
+    body += memory
+
+    cache_state = datapath.cache.get_state() if datapath.cache is not None else []
+    _write_varint(body, int(datapath.cache is not None))
+    _write_varint(body, len(cache_state))
+    for value in cache_state:
+        _write_varint(body, value)
+
+    return _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION) + zlib.compress(body)
+
+
+def decode_checkpoint(datapath: Datapath, checkpoint: bytes) -> None:
+    """Restore the machine state from a checkpoint made by `encode_checkpoint`"""
+    if len(checkpoint) < _HEADER.size:
+        raise ValueError("checkpoint is too short")
+
+    magic, version = _HEADER.unpack_from(checkpoint)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("not a machine checkpoint")
+
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version {version} (expected {CHECKPOINT_VERSION})")
+
+    reader = _VarintReader(zlib.decompress(checkpoint[_HEADER.size:]))
+    control_unit = datapath.control_unit
+    latches, selectors = machine_components(datapath)
+
+    tick = reader.read()
+    microstep_index = reader.read()
+    stall_ticks = reader.read()
+
+    if (latches_count := reader.read()) != len(latches):
+        raise ValueError(f"checkpoint has {latches_count} latches (expected {len(latches)})")
+
+    for latch in latches:
+        latch.latch_value(reader.read())
+
+    if (selectors_count := reader.read()) != len(selectors):
+        raise ValueError(f"checkpoint has {selectors_count} selectors (expected {len(selectors)})")
+
+    for selector in selectors:
+        inputs_count = reader.read()
+        selector.select_input(reader.read())
+        for input_index in range(inputs_count):
+            selector.set_input_value(input_index, reader.read())
+
+    tokens = {}
+    for _ in range(reader.read()):
+        token_tick = reader.read()
+        tokens[token_tick] = chr(reader.read())
+
+    output = [reader.read() for _ in range(reader.read())]
+
+    datapath.memory.restore(reader.read_bytes(reader.read()))
+
+    has_cache = reader.read() == 1
+    cache_state = [reader.read() for _ in range(reader.read())]
+    if has_cache != (datapath.cache is not None):
+        raise ValueError(f"checkpoint is made {'with' if has_cache else 'without'} the memory cache")
+    if datapath.cache is not None:
+        datapath.cache.set_state(cache_state)
+
+    control_unit._tick = tick
+    control_unit.microstep_index = microstep_index
+    control_unit.stall_ticks = stall_ticks
+    control_unit.input_tokens = tokens
+    control_unit.instruction_decoder.reload_decoded()
+    datapath.output_port.buffer = output
+
+
+def save_checkpoint(datapath: Datapath, filename: str) -> None:
+    with open(filename, mode="wb") as file:
+        file.write(encode_checkpoint(datapath))
+
+
+def load_checkpoint(datapath: Datapath, filename: str) -> None:
+    with open(filename, mode="rb") as file:
+        decode_checkpoint(datapath, file.read())
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append a zigzag-encoded LEB128 integer (machine values are signed and unbounded)"""
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _VarintReader:
+    def __init__(self, data: bytes):
+        self._data: bytes = data
+        self._offset: int = 0
+
+    def read(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            if self._offset >= len(self._data):
+                raise ValueError("checkpoint is truncated")
+
+            byte = self._data[self._offset]
+            self._offset += 1
+
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+
+        return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+    def read_bytes(self, size: int) -> bytes:
+        if self._offset + size > len(self._data):
+            raise ValueError("checkpoint is truncated")
+
+        data = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return data
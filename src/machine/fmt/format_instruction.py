@@ -1,138 +1,83 @@
+from functools import lru_cache
+
 from isa.constants import INSTR_OPCODE_SIZE, REG_ID_SIZE, WORD_SIZE
-from isa.instructions import AddressingMode, InstructionOpcode
-from isa.registers import RegisterCode
+from isa.instructions import (
+    ADDRESSING_MODE_BY_OPCODE,
+    INSTRUCTION_BY_OPCODE,
+    AddressingMode,
+)
+from isa.registers import REGISTER_BY_CODE
 
 from ..units.common.helpers import convert_to_signed
 
+_OPCODE_MASK = 2 ** INSTR_OPCODE_SIZE - 1
+_REGISTER_MASK = 2 ** REG_ID_SIZE - 1
+
+_R1_SHIFT = INSTR_OPCODE_SIZE
+_R2_SHIFT = INSTR_OPCODE_SIZE + REG_ID_SIZE
+_R3_SHIFT = INSTR_OPCODE_SIZE + REG_ID_SIZE * 2
+
+DISASSEMBLY_CACHE_SIZE = 4096
+"""Max count of distinct instruction words kept by the disassembly cache"""
+
 
 def get_register_name(register_code: str) -> str:
-    for reg_enum in RegisterCode:
-        if reg_enum.value == register_code:
-            return reg_enum.name
-    raise ValueError(f"unknown register {register_code}")
+    if len(register_code) != REG_ID_SIZE:
+        raise ValueError(f"unknown register {register_code}")
+
+    return REGISTER_BY_CODE[int(register_code, 2)].name
 
 
 def string_repr_instruction(binary_instruction: str) -> str:
     if not binary_instruction or len(binary_instruction) != WORD_SIZE:
         raise ValueError("instruction must be 32 bits long")
 
-    opcode_start_bit = WORD_SIZE - INSTR_OPCODE_SIZE
-    opcode_full_bin = binary_instruction[opcode_start_bit:WORD_SIZE]
-    addressing_mode_bin = opcode_full_bin[:3]
-
-    mnemonic = None
-    instruction_type = None
-
-    for op_enum in InstructionOpcode:
-        if op_enum.bincode == opcode_full_bin:
-            mnemonic = op_enum.alias
-            instruction_type = op_enum
-            break
+    return repr_instruction(int(binary_instruction, 2))
 
-    if instruction_type is None:
-        raise ValueError(f"unknown instruction opcode: {opcode_full_bin}")
 
-    try:
-        addressing_mode = AddressingMode(addressing_mode_bin)
-    except ValueError:
-        raise ValueError(f"unknown addressing mode: {addressing_mode_bin}")
+@lru_cache(maxsize=DISASSEMBLY_CACHE_SIZE)
+def repr_instruction(word: int) -> str:
+    """
+    Disassemble an instruction word
 
-    if addressing_mode == AddressingMode.ABSOLUTE:
-        reg_start_idx = opcode_start_bit - REG_ID_SIZE
-        addr_end_idx = reg_start_idx
+    An instruction stays in IR for several ticks and loops repeat the same
+    few words, so the results are kept in a bounded LRU cache.
+    """
+    opcode = word & _OPCODE_MASK
 
-        addr_bin = binary_instruction[:addr_end_idx]
-        reg_bin = binary_instruction[reg_start_idx:opcode_start_bit]
+    instruction_type = INSTRUCTION_BY_OPCODE[opcode]
+    if instruction_type is None:
+        raise ValueError(f"unknown instruction opcode: {bin(opcode)[2:].zfill(INSTR_OPCODE_SIZE)}")
 
-        address = int(addr_bin, 2)
-        register_name = get_register_name(reg_bin)
+    mnemonic = instruction_type.alias
+    addressing_mode = ADDRESSING_MODE_BY_OPCODE[opcode]
 
-        if instruction_type in [InstructionOpcode.LW, InstructionOpcode.SW, InstructionOpcode.JAL]:
-            return f"{mnemonic} {register_name}, 0x{address:0X}"
+    register1_name = REGISTER_BY_CODE[(word >> _R1_SHIFT) & _REGISTER_MASK].name
+    register2_name = REGISTER_BY_CODE[(word >> _R2_SHIFT) & _REGISTER_MASK].name
+    register3_name = REGISTER_BY_CODE[(word >> _R3_SHIFT) & _REGISTER_MASK].name
 
-        raise ValueError(f"unexpected instruction for absolute addressing: {mnemonic}")
+    if addressing_mode == AddressingMode.ABSOLUTE:
+        address = word >> _R2_SHIFT
+        return f"{mnemonic} {register1_name}, 0x{address:0X}"
 
     elif addressing_mode == AddressingMode.RELATIVE:
-        value_bin = binary_instruction[:opcode_start_bit]
-        value = convert_to_signed(int(value_bin, 2), len(value_bin))
-
-        if instruction_type in [InstructionOpcode.JO, InstructionOpcode.JZ, InstructionOpcode.JNZ]:
-            return f"{mnemonic} 0x{value:0X}"
-
-        raise ValueError(f"unexpected instruction for relative addressing: {mnemonic}")
+        value = convert_to_signed(word >> _R1_SHIFT, WORD_SIZE - _R1_SHIFT)
+        return f"{mnemonic} 0x{value:0X}"
 
     elif addressing_mode == AddressingMode.NO_ADDRESS:
-        if instruction_type in [InstructionOpcode.RETI, InstructionOpcode.HALT]:
-            return mnemonic
-
-        raise ValueError(f"unexpected instruction for no_address addressing: {mnemonic}")
+        return mnemonic
 
     elif addressing_mode == AddressingMode.REGISTER_1:
-        reg1_bin = binary_instruction[opcode_start_bit - REG_ID_SIZE:opcode_start_bit]
-        register1_name = get_register_name(reg1_bin)
-
-        if instruction_type == InstructionOpcode.JR:
-            return f"{mnemonic} {register1_name}"
-
-        if instruction_type in [
-            InstructionOpcode.SETEQ, InstructionOpcode.SETNE,
-            InstructionOpcode.SETGE, InstructionOpcode.SETLE, InstructionOpcode.SETSG,
-            InstructionOpcode.SETSL,
-        ]:
-            return f"{mnemonic} {register1_name}"
-
-        raise ValueError(f"unexpected instruction for 1-register addressing: {mnemonic}")
+        return f"{mnemonic} {register1_name}"
 
     elif addressing_mode == AddressingMode.REGISTER_2:
-        reg2_bin = binary_instruction[opcode_start_bit - (2 * REG_ID_SIZE):opcode_start_bit - REG_ID_SIZE]
-        reg1_bin = binary_instruction[opcode_start_bit - REG_ID_SIZE:opcode_start_bit]
-
-        register1_name = get_register_name(reg1_bin)
-        register2_name = get_register_name(reg2_bin)
-
-        if instruction_type in [
-            InstructionOpcode.NEG, InstructionOpcode.NOT,
-            InstructionOpcode.CMP, InstructionOpcode.MV,
-        ]:
-            return f"{mnemonic} {register1_name}, {register2_name}"
-
-        if instruction_type == InstructionOpcode.LWR:
-            return f"{mnemonic} {register1_name}, {register2_name}"
-
-        if instruction_type == InstructionOpcode.SWR:
-            return f"{mnemonic} {register1_name}, {register2_name}"
-
-        raise ValueError(f"unexpected instruction for 2-register addressing: {mnemonic}")
+        return f"{mnemonic} {register1_name}, {register2_name}"
 
     elif addressing_mode == AddressingMode.REGISTER_3:
-        reg3_bin = binary_instruction[opcode_start_bit - (3 * REG_ID_SIZE):opcode_start_bit - (2 * REG_ID_SIZE)]
-        reg2_bin = binary_instruction[opcode_start_bit - (2 * REG_ID_SIZE):opcode_start_bit - REG_ID_SIZE]
-        reg1_bin = binary_instruction[opcode_start_bit - REG_ID_SIZE:opcode_start_bit]
-
-        register1_name = get_register_name(reg1_bin)
-        register2_name = get_register_name(reg2_bin)
-        register3_name = get_register_name(reg3_bin)
-
-        if instruction_type in [
-            InstructionOpcode.ADD, InstructionOpcode.SUB, InstructionOpcode.MUL,
-            InstructionOpcode.DIV, InstructionOpcode.REM, InstructionOpcode.AND,
-            InstructionOpcode.OR, InstructionOpcode.XOR, InstructionOpcode.SHL,
-            InstructionOpcode.SHR,
-        ]:
-            return f"{mnemonic} {register1_name}, {register2_name}, {register3_name}"
-
-        raise ValueError(f"unexpected instruction for 3-register addressing: {mnemonic}")
+        return f"{mnemonic} {register1_name}, {register2_name}, {register3_name}"
 
     elif addressing_mode == AddressingMode.DIRECT_LOAD:
-        value_bin = binary_instruction[:opcode_start_bit - REG_ID_SIZE]
-        reg_bin = binary_instruction[opcode_start_bit - REG_ID_SIZE:opcode_start_bit]
-
-        value = convert_to_signed(int(value_bin, 2), len(value_bin))
-        register_name = get_register_name(reg_bin)
-
-        if instruction_type in [InstructionOpcode.ADDI, InstructionOpcode.LUI, InstructionOpcode.LLI]:
-            return f"{mnemonic} {register_name}, 0x{value:0X}"
-
-        raise ValueError(f"unexpected instruction for direct load addressing: {mnemonic}")
+        value = convert_to_signed(word >> _R2_SHIFT, WORD_SIZE - _R2_SHIFT)
+        return f"{mnemonic} {register1_name}, 0x{value:0X}"
 
-    raise ValueError(f"unhandled instruction format (opcode: {opcode_full_bin}, addr_mode: {addressing_mode_bin})")
+    raise ValueError(f"unhandled instruction format (opcode: {instruction_type.bincode}, addr_mode: {addressing_mode})")
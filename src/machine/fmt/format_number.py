@@ -1,5 +1,6 @@
 from enum import Enum
 from math import ceil
+from typing import List, Sequence
 
 
 class _LogNumberFmt(Enum):
@@ -21,3 +22,32 @@ def format_number(value: int, fmt: _LogNumberFmt, bitsize: int):
 
     if fmt == _LogNumberFmt.HEXADECIMAL:
         return hex(value)[2:].zfill(ceil(bitsize / 4))
+
+
+def number_template(fmt: _LogNumberFmt, bitsize: int) -> str:
+    """`str.format` template producing the same fixed-width string as `format_number`"""
+    if fmt == _LogNumberFmt.BINARY:
+        return f"{{:0{bitsize}b}}"
+
+    if fmt == _LogNumberFmt.DECIMAL:
+        return f"{{:0{len(str(2 ** bitsize - 1))}d}}"
+
+    if fmt == _LogNumberFmt.HEXADECIMAL:
+        return f"{{:0{ceil(bitsize / 4)}x}}"
+
+    raise ValueError(f"unknown number format {fmt}")
+
+
+def format_numbers(values: Sequence[int], fmt: _LogNumberFmt, bitsize: int) -> List[str]:
+    """
+    Format a whole column of values at once
+
+    Gives the same strings as `format_number` called for every value, but
+    the template is built once per column and negative values are only
+    converted when the column has any. `values` is read twice, so it must
+    be a sequence (like a trace column), not an iterator.
+    """
+    if fmt != _LogNumberFmt.DECIMAL and min(values, default=0) < 0:
+        values = [value + 2 ** bitsize if value < 0 else value for value in values]
+
+    return list(map(number_template(fmt, bitsize).format, values))
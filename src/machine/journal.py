@@ -0,0 +1,41 @@
+from itertools import starmap
+from typing import List, Optional, TextIO, Tuple
+
+from .fmt.format_instruction import repr_instruction
+from .fmt.format_number import _LogNumberFmt, format_numbers
+from .units.trace import TickTrace
+
+
+class JournalWriter:
+    """
+    Execution journal writer
+
+    Renders rows of the tick trace as journal lines. In the streaming mode the
+    trace calls `write_trace` every `chunk_size` ticks, written rows are
+    dropped from the trace and the file is flushed, so memory use stays flat
+    and the journal on disk is never more than one chunk behind.
+    """
+
+    def __init__(self, filename: str, journal_fmt: List[Tuple[str, _LogNumberFmt, int]]):
+        self.filename: str = filename
+        self.journal_fmt: List[Tuple[str, _LogNumberFmt, int]] = journal_fmt
+        self._file: Optional[TextIO] = open(filename, mode="w+")
+
+    def write_trace(self, trace: TickTrace) -> None:
+        line_template = ", ".join(f"{register}[{fmt.value}]: {{}}" for register, fmt, *_ in self.journal_fmt)
+        line_template += " - {}\n"
+
+        fields = [
+            format_numbers(trace.columns[register], fmt, *args)
+            for register, fmt, *args in self.journal_fmt
+        ]
+        instructions = map(repr_instruction, trace.columns["IR"])
+
+        self._file.writelines(starmap(line_template.format, zip(*fields, instructions)))
+        self._file.flush()
+        trace.clear()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
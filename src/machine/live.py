@@ -0,0 +1,187 @@
+import asyncio
+import codecs
+import contextlib
+import os
+import stat
+import sys
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from .units.common.enums import Interrupts
+from .units.control_unit import ControlUnit
+from .units.event_scheduler import ScheduledEvent
+from .units.output_port import OutputPort
+
+LIVE_YIELD_EVERY = 1000
+"""Ticks simulated between yields to the event loop"""
+
+LIVE_POLL_TICKS = 200
+"""
+Ticks between input port polls while input is pending
+
+Every poll is a device event, so the instruction-level engines take the
+microcoded path around it (see `InstructionEngine`): frequent polls would
+take away most of their speedup.
+"""
+
+LIVE_STDIO = "-"
+
+TAIL_POLL_INTERVAL = 0.1
+
+Sink = Callable[[str], Awaitable[None]]
+
+
+class LiveInput:
+    """
+    Input tokens from an async source
+
+    Text of the source is queued as it arrives. While characters are
+    pending, the input port is polled every `poll_ticks` ticks through the
+    event scheduler: the next character becomes an input token (at the
+    next tick) once the program handled the previous one, so the input
+    interrupt request isn't pending and interrupts are enabled (the handler
+    returned). A program which never takes the input interrupt gets the
+    first character only.
+    """
+
+    def __init__(self, control_unit: ControlUnit, source: AsyncIterator[str], poll_ticks: int = LIVE_POLL_TICKS):
+        self.control_unit: ControlUnit = control_unit
+        self.source: AsyncIterator[str] = source
+        self.poll_ticks: int = poll_ticks
+        self.pending: Deque[str] = deque()
+
+        self._event: Optional[ScheduledEvent] = None
+
+    async def read(self) -> None:
+        async for text in self.source:
+            self.pending.extend(text)
+
+    def start_polling(self) -> None:
+        """Called between simulation slices, so characters which arrived meanwhile are polled for"""
+        if self.pending and self._event is None:
+            self._schedule(self.control_unit._tick + 1)
+
+    def stop_polling(self) -> None:
+        if self._event is not None:
+            self.control_unit.events.cancel(self._event)
+            self._event = None
+
+    def _schedule(self, tick: int) -> None:
+        self._event = self.control_unit.events.schedule(tick, self._poll)
+
+    def _poll(self, tick: int) -> None:
+        self._event = None
+
+        control_unit = self.control_unit
+        interrupt_handler = control_unit.interrupt_handler
+        if (
+            interrupt_handler.ie.get_value() == 1
+            and interrupt_handler.irq.get_value() & Interrupts.INPUT_DATA == 0
+            and tick + 1 not in control_unit.input_tokens
+        ):
+            control_unit.input_port.add_token(tick + 1, self.pending.popleft())
+
+        if self.pending:
+            self._schedule(tick + self.poll_ticks)
+
+
+class LiveOutput:
+    """Words written to the output port, passed to a sink in batches"""
+
+    def __init__(self, output_port: OutputPort, format_word: Callable[[int], str]):
+        self.output_port: OutputPort = output_port
+        self.format_word: Callable[[int], str] = format_word
+        self.pending: List[int] = []
+
+        output_port.on_write = self.pending.append
+
+    async def flush(self, sink: Sink) -> None:
+        if not self.pending:
+            return
+
+        text = "".join(self.format_word(word) for word in self.pending)
+        self.pending.clear()
+        await sink(text)
+
+    def close(self) -> None:
+        self.output_port.on_write = None
+
+
+async def read_stream(reader: asyncio.StreamReader, chunk_size: int = 4096) -> AsyncIterator[str]:
+    """Text of a stream (a pipe, a socket connection), decoded as UTF-8"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while chunk := await reader.read(chunk_size):
+        yield decoder.decode(chunk)
+
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+async def read_pipe(pipe: BinaryIO) -> AsyncIterator[str]:
+    """Text of a pipe, like stdin (a regular file redirected to stdin is read at once)"""
+    reader = asyncio.StreamReader()
+    try:
+        await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    except ValueError:
+        yield pipe.read().decode("utf-8", errors="replace")
+        return
+
+    async for text in read_stream(reader):
+        yield text
+
+
+async def tail_file(filename: str, poll_interval: float = TAIL_POLL_INTERVAL) -> AsyncIterator[str]:
+    """Text of a file and everything appended to it later (like `tail -f`), never ends"""
+    with open(filename, mode="r", encoding="utf-8", errors="replace") as file:
+        while True:
+            if text := file.read():
+                yield text
+            else:
+                await asyncio.sleep(poll_interval)
+
+
+def file_sink(file: TextIO) -> Sink:
+    async def sink(text: str) -> None:
+        file.write(text)
+        file.flush()
+
+    return sink
+
+
+def stream_sink(writer: asyncio.StreamWriter) -> Sink:
+    async def sink(text: str) -> None:
+        writer.write(text.encode("utf-8"))
+        await writer.drain()
+
+    return sink
+
+
+@contextlib.asynccontextmanager
+async def open_live_io(path: str, output: TextIO) -> AsyncIterator[Tuple[AsyncIterator[str], Sink]]:
+    """
+    Source and sink for `path`
+
+    `LIVE_STDIO` reads stdin, a Unix socket is connected and gets the output
+    too, any other file is followed. The output goes to `output` otherwise.
+    """
+    if path == LIVE_STDIO:
+        yield read_pipe(sys.stdin.buffer), file_sink(output)
+    elif stat.S_ISSOCK(os.stat(path).st_mode):
+        reader, writer = await asyncio.open_unix_connection(path)
+        try:
+            yield read_stream(reader), stream_sink(writer)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    else:
+        yield tail_file(path), file_sink(output)
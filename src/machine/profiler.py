@@ -0,0 +1,155 @@
+import json
+from array import array
+from typing import Any, Dict, List
+
+from isa.constants import INSTR_OPCODE_SIZE
+from isa.instructions import INSTRUCTION_BY_OPCODE, OPCODES_COUNT
+
+from .fmt.format_instruction import repr_instruction
+from .units.memory import WORD_BYTES, Memory
+
+PROFILE_REPORT_TOP = 30
+"""Count of rows in every section of the text report (the JSON file has all of them)"""
+
+_OPCODE_MASK = 2 ** INSTR_OPCODE_SIZE - 1
+
+
+def _counters(size: int) -> array:
+    return array("Q", bytes(8 * size))
+
+
+class Profiler:
+    """
+    Execution profile
+
+    Counters are integer arrays indexed by the word address (`addr // 4`),
+    so a profiled run costs a few array increments per instruction and per
+    memory access however long it is.
+
+    An instruction is counted at its PC when it completes. An interrupt entry
+    is counted as the instruction it interrupts (it's fetched, but not
+    executed). The instruction stopped by HALT or the ticks limit isn't counted.
+    """
+
+    def __init__(self, memory_size: int):
+        words = (memory_size + WORD_BYTES - 1) // WORD_BYTES
+
+        self.instructions: array = _counters(words)
+        self.ticks: array = _counters(words)
+        self.opcode_instructions: array = _counters(OPCODES_COUNT)
+        self.opcode_ticks: array = _counters(OPCODES_COUNT)
+        self.reads: array = _counters(words)
+        self.writes: array = _counters(words)
+
+    def record_instruction(self, pc: int, ir: int, ticks: int) -> None:
+        index = pc >> 2
+        self.instructions[index] += 1
+        self.ticks[index] += ticks
+
+        opcode = ir & _OPCODE_MASK
+        self.opcode_instructions[opcode] += 1
+        self.opcode_ticks[opcode] += ticks
+
+    def report(self, memory: bytes) -> Dict[str, Any]:
+        """All non-zero counters sorted by the hottest first (`memory` is used for the disassembly)"""
+        pcs = [
+            {
+                "addr": index * WORD_BYTES,
+                "instructions": self.instructions[index],
+                "ticks": self.ticks[index],
+                "instruction": repr_instruction(_read_word(memory, index * WORD_BYTES)),
+            }
+            for index in sorted(_nonzero(self.instructions), key=lambda index: -self.ticks[index])
+        ]
+
+        opcodes = [
+            {
+                "opcode": INSTRUCTION_BY_OPCODE[opcode].name,
+                "instructions": self.opcode_instructions[opcode],
+                "ticks": self.opcode_ticks[opcode],
+            }
+            for opcode in sorted(_nonzero(self.opcode_instructions), key=lambda opcode: -self.opcode_ticks[opcode])
+        ]
+
+        accessed = set(_nonzero(self.reads)) | set(_nonzero(self.writes))
+        words = [
+            {"addr": index * WORD_BYTES, "reads": self.reads[index], "writes": self.writes[index]}
+            for index in sorted(accessed, key=lambda index: (-self.reads[index] - self.writes[index], index))
+        ]
+
+        return {
+            "instructions": sum(self.instructions),
+            "ticks": sum(self.ticks),
+            "pcs": pcs,
+            "opcodes": opcodes,
+            "memory": words,
+        }
+
+    def write_json(self, filename: str, memory: bytes) -> None:
+        with open(filename, mode="w") as file:
+            json.dump(self.report(memory), file, indent=2)
+
+    def write_report(self, filename: str, memory: bytes, top: int = PROFILE_REPORT_TOP) -> None:
+        report = self.report(memory)
+        ticks = report["ticks"] or 1
+
+        lines = [f"{report['instructions']} instructions, {report['ticks']} ticks", ""]
+
+        lines.append("Hot spots (ticks per PC):")
+        lines.append(f"{'addr':>10} {'ticks':>12} {'%':>7} {'instructions':>12}  instruction")
+        for row in report["pcs"][:top]:
+            lines.append(
+                f"{row['addr']:#010x} {row['ticks']:>12} {100 * row['ticks'] / ticks:>6.2f}% "
+                f"{row['instructions']:>12}  {row['instruction']}",
+            )
+        lines.append("")
+
+        lines.append("Ticks per opcode:")
+        lines.append(f"{'opcode':>10} {'ticks':>12} {'%':>7} {'instructions':>12}")
+        for row in report["opcodes"][:top]:
+            lines.append(
+                f"{row['opcode']:>10} {row['ticks']:>12} {100 * row['ticks'] / ticks:>6.2f}% "
+                f"{row['instructions']:>12}",
+            )
+        lines.append("")
+
+        lines.append("Memory accesses (per word):")
+        lines.append(f"{'addr':>10} {'reads':>12} {'writes':>12}")
+        for row in report["memory"][:top]:
+            lines.append(f"{row['addr']:#010x} {row['reads']:>12} {row['writes']:>12}")
+
+        with open(filename, mode="w") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+class ProfiledMemory(Memory):
+    """
+    Memory which counts data reads and writes per word into its `profiler`
+
+    Instruction fetches aren't counted here, they are the instruction counts
+    of the profiler. Unaligned accesses are counted for the word holding
+    their first byte.
+    """
+
+    def __init__(self, filename: str, size: int, mapped: bool = False):
+        super().__init__(filename, size, mapped=mapped)
+        self.profiler: Profiler = Profiler(self.size)
+        self._reads: array = self.profiler.reads
+        self._writes: array = self.profiler.writes
+
+    def read(self, addr: int) -> int:
+        value = super().read(addr)
+        self._reads[addr >> 2] += 1
+        return value
+
+    def write(self, addr: int, value: int) -> None:
+        super().write(addr, value)
+        self._writes[addr >> 2] += 1
+
+
+def _nonzero(counters: array) -> List[int]:
+    return [index for index, count in enumerate(counters) if count != 0]
+
+
+def _read_word(memory: bytes, addr: int) -> int:
+    return int.from_bytes(memory[addr:addr + WORD_BYTES], byteorder="big")
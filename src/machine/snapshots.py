@@ -0,0 +1,70 @@
+import os
+from typing import List, Tuple
+
+from .checkpoint import save_checkpoint
+from .units.datapath import Datapath
+
+SNAPSHOTS_DIRNAME = "snapshots"
+SNAPSHOT_INDEX_FILENAME = "index.txt"
+
+
+class SnapshotRecorder:
+    """
+    Periodic machine state snapshots
+
+    A snapshot (see `machine.checkpoint`) is saved at the first instruction
+    boundary at or after every `every`-th tick. Each snapshot gets a line
+    `<tick> <filename>` in the index file, the index is written as the
+    simulation goes, so it's usable even if the simulation is interrupted.
+    """
+
+    def __init__(self, dirname: str, every: int):
+        if every <= 0:
+            raise ValueError(f"snapshot interval must be more than 0 (got {every})")
+
+        self.dirname: str = dirname
+        self.every: int = every
+        self.next_tick: int = 0
+
+        os.makedirs(dirname, exist_ok=True)
+        self._index_filename: str = os.path.join(dirname, SNAPSHOT_INDEX_FILENAME)
+        open(self._index_filename, mode="w").close()
+
+    def record(self, datapath: Datapath) -> None:
+        tick = datapath.control_unit._tick
+
+        filename = f"{tick}.bin"
+        save_checkpoint(datapath, os.path.join(self.dirname, filename))
+        with open(self._index_filename, mode="a") as file:
+            file.write(f"{tick} {filename}\n")
+
+        self.next_tick = (tick // self.every + 1) * self.every
+
+
+def read_snapshot_index(dirname: str) -> List[Tuple[int, str]]:
+    """Snapshots ticks and their file paths sorted by tick"""
+    snapshots = []
+    with open(os.path.join(dirname, SNAPSHOT_INDEX_FILENAME), mode="r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+
+            tick, filename = line.split()
+            snapshots.append((int(tick), os.path.join(dirname, filename)))
+
+    return sorted(snapshots)
+
+
+def find_snapshot(dirname: str, tick: int) -> Tuple[int, str]:
+    """The latest snapshot taken at `tick` or before"""
+    found = None
+    for snapshot_tick, filename in read_snapshot_index(dirname):
+        if snapshot_tick > tick:
+            break
+
+        found = (snapshot_tick, filename)
+
+    if found is None:
+        raise ValueError(f"there is no snapshot at tick {tick} or before it in {dirname}")
+
+    return found
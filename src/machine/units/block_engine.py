@@ -0,0 +1,614 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from isa.constants import WORD_SIZE
+from isa.instructions import INSTRUCTION_BY_OPCODE, InstructionOpcode
+
+from .common.enums import Interrupts
+from .common.exceptions import MachineMemoryException
+from .instruction_cache import DecodedInstruction
+from .instruction_engine import (
+    _FLAGS_NZ_CLEAR_V,
+    _FLAGS_NZC_CLEAR_V,
+    _FLAGS_NZV,
+    _FLAGS_NZVC,
+    _LATCH_LIMIT,
+    _SIGNED_MAX,
+    _SIGNED_MIN,
+    _SKIPPED_JUMP,
+    InstructionEngine,
+)
+
+if TYPE_CHECKING:
+    from .control_unit import ControlUnit
+
+BLOCK_MAX_INSTRUCTIONS = 64
+"""Longer straight-line code is split into several blocks"""
+
+_FLAGS = ("n", "z", "v", "c")
+
+_FLAGS_WRITTEN = {
+    _FLAGS_NZVC: frozenset("nzvc"),
+    _FLAGS_NZV: frozenset("nzv"),
+    _FLAGS_NZC_CLEAR_V: frozenset("nzvc"),
+    _FLAGS_NZ_CLEAR_V: frozenset("nzv"),
+}
+
+_BINOPS: Dict[InstructionOpcode, Tuple[str, int]] = {
+    InstructionOpcode.ADD: ("{a} + {b}", _FLAGS_NZVC),
+    InstructionOpcode.SUB: ("{a} - {b}", _FLAGS_NZVC),
+    InstructionOpcode.MUL: ("{a} * {b}", _FLAGS_NZVC),
+    InstructionOpcode.REM: ("{a} % {b}", _FLAGS_NZVC),
+    InstructionOpcode.AND: ("{a} & {b}", _FLAGS_NZV),
+    InstructionOpcode.OR: ("{a} | {b}", _FLAGS_NZV),
+    InstructionOpcode.XOR: ("{a} ^ {b}", _FLAGS_NZV),
+    InstructionOpcode.SHL: ("{a} << {b}", _FLAGS_NZC_CLEAR_V),
+    InstructionOpcode.SHR: ("{a} >> {b}", _FLAGS_NZ_CLEAR_V),
+}
+
+_UNOPS: Dict[InstructionOpcode, Tuple[str, int]] = {
+    InstructionOpcode.NEG: ("-{a}", _FLAGS_NZVC),
+    InstructionOpcode.NOT: ("~{a}", _FLAGS_NZV),
+}
+
+_SET_CONDITIONS: Dict[InstructionOpcode, Tuple[str, FrozenSet[str]]] = {
+    InstructionOpcode.SETEQ: ("z == 1", frozenset("z")),
+    InstructionOpcode.SETNE: ("z == 0", frozenset("z")),
+    InstructionOpcode.SETGE: ("n == v", frozenset("nv")),
+    InstructionOpcode.SETLE: ("n != v or z == 1", frozenset("nvz")),
+    InstructionOpcode.SETSG: ("n == v and z == 0", frozenset("nvz")),
+    InstructionOpcode.SETSL: ("n != v", frozenset("nv")),
+}
+
+_JUMP_CONDITIONS: Dict[InstructionOpcode, str] = {
+    InstructionOpcode.JO: "True",
+    InstructionOpcode.JZ: "z == 1",
+    InstructionOpcode.JNZ: "z == 0",
+}
+
+_TICKS: Dict[InstructionOpcode, int] = {
+    InstructionOpcode.LUI: 7,
+    InstructionOpcode.LLI: 5,
+    InstructionOpcode.LW: 5,
+    InstructionOpcode.SW: 5,
+    InstructionOpcode.LWR: 6,
+    InstructionOpcode.SWR: 5,
+    InstructionOpcode.MV: 6,
+    InstructionOpcode.ADDI: 6,
+    InstructionOpcode.DIV: 6,
+    InstructionOpcode.CMP: 5,
+    InstructionOpcode.JAL: 6,
+    InstructionOpcode.JR: 3,
+    **{opcode: 6 for opcode in (*_BINOPS, *_UNOPS)},
+    **{opcode: 5 for opcode in _SET_CONDITIONS},
+}
+"""Ticks of every translated instruction (conditional jumps take 2 ticks, or 6 if taken)"""
+
+_RECORDED_OPERANDS: Dict[InstructionOpcode, Tuple[Tuple[str, bool], ...]] = {
+    InstructionOpcode.LUI: (("r1", False),),
+    InstructionOpcode.LLI: (),
+    InstructionOpcode.LW: (("r1", True),),
+    InstructionOpcode.SW: (("r1", False),),
+    InstructionOpcode.LWR: (("r2", False), ("r1", True)),
+    InstructionOpcode.SWR: (("r1", False), ("r2", False)),
+    InstructionOpcode.MV: (("r2", False),),
+    InstructionOpcode.ADDI: (("r1", False),),
+    InstructionOpcode.DIV: (("r2", False), ("r3", False)),
+    InstructionOpcode.CMP: (("r1", False), ("r2", False)),
+    InstructionOpcode.JAL: (("r1", False),),
+    InstructionOpcode.JR: (("r1", False),),
+    **{opcode: (("r2", False), ("r3", False)) for opcode in _BINOPS},
+    **{opcode: (("r2", False),) for opcode in _UNOPS},
+    **{opcode: (("r1", True),) for opcode in _SET_CONDITIONS},
+}
+"""
+Operands of the executed instructions (see `InstructionEngine._executed`): the
+register field, and whether its value is taken after the instruction
+"""
+
+_TERMINATORS = frozenset([
+    *_JUMP_CONDITIONS,
+    InstructionOpcode.JR,
+    InstructionOpcode.JAL,
+    # may raise the interrupt request, which is checked at the next instruction
+    InstructionOpcode.DIV,
+])
+
+_NOT_TRANSLATED = frozenset([InstructionOpcode.HALT, InstructionOpcode.RETI, InstructionOpcode.SWAP])
+
+_WORD_BYTES = WORD_SIZE // 8
+
+
+class _Block:
+    __slots__ = ("start", "end", "max_ticks", "function")
+
+    def __init__(self, start: int, end: int, max_ticks: int, function: Callable[[BlockEngine], None]):
+        self.start: int = start
+        self.end: int = end
+        """Address after the last instruction"""
+        self.max_ticks: int = max_ticks
+        self.function: Callable[[BlockEngine], None] = function
+
+
+class _BlockExit:
+    """Instructions executed by a block before one of its exits (see `BlockEngine._store_executed`)"""
+
+    __slots__ = ("instructions",)
+
+    def __init__(self, instructions: List[Tuple[int, int, DecodedInstruction, Tuple[int, ...]]]):
+        self.instructions: List[Tuple[int, int, DecodedInstruction, Tuple[int, ...]]] = instructions
+        """
+        The last execution of every instruction: its key, start tick (from the
+        block start), decoded instruction and indexes of its operands in the record
+        """
+
+
+class BlockEngine(InstructionEngine):
+    """
+    Basic block translation engine
+
+    Straight-line code from an address up to a jump (JO, JZ, JNZ, JR, JAL),
+    DIV or an instruction which isn't translated (HALT, RETI) is translated
+    once into a Python function, which applies register, flag and memory
+    effects of the whole block and adds its tick cost. Registers and flags
+    are local variables of the function, flags which are overwritten inside
+    the block before being read aren't calculated at all.
+
+    Blocks are dropped when their memory is written (through the decoded
+    instruction cache of the Memory Unit), a block storing into itself stops
+    right after the store. Pending interrupts are checked at block
+    boundaries. Near an event, the ticks limit or the stop tick, and while
+    profiling or with the memory cache, instructions are stepped one by one
+    by `InstructionEngine`, so the machine state is the same as with it.
+
+    An error inside a block (like a memory access out of range) leaves
+    registers and flags at the block start.
+    """
+
+    def __init__(self, control_unit: ControlUnit):
+        super().__init__(control_unit)
+
+        self._blocks: Dict[int, Optional[_Block]] = {}
+        """Translated blocks by their start (None if the first instruction isn't translated)"""
+
+        self._blocks_by_instruction: Dict[int, Set[int]] = {}
+        """Starts of blocks including the instruction at the address"""
+
+        self._namespace: Dict[str, object] = {
+            "read": self.memory.read,
+            "write": self._write_memory,
+            "latch": self._latch,
+            "SIGNED_MIN": _SIGNED_MIN,
+            "SIGNED_MAX": _SIGNED_MAX,
+            "ZERO_DIVISION": int(Interrupts.ZERO_DIVISION),
+        }
+
+        self.memory.instruction_cache.on_invalidate = self._invalidate
+
+    def _run_until(self, stop: Union[int, float]) -> None:
+        if self.profiler is not None or self.cache is not None:
+            super()._run_until(stop)
+            return
+
+        blocks = self._blocks
+        fast_forward = self.fast_forward
+
+        while self.tick < stop:
+            pc = self.pc
+
+            block = blocks[pc] if pc in blocks else self._translate(pc)
+
+            if (
+                block is None
+                or (self.ie == 1 and self.irq != 0)
+                or self.tick + block.max_ticks > min(self._next_event_tick - self._lookahead, stop)
+            ):
+                if self._next_event_tick - self.tick < self._lookahead:
+                    self._process_microcoded()
+                else:
+                    self.step()
+            else:
+                block.function(self)
+                pc = block.end - _WORD_BYTES
+
+            if fast_forward and self.pc < pc:
+                self._fast_forward_idle_loop(stop)
+
+    def _invalidate(self, addr: Optional[int]) -> None:
+        if addr is None:
+            self._blocks.clear()
+            self._blocks_by_instruction.clear()
+            return
+
+        for start in self._blocks_by_instruction.pop(addr, ()):
+            self._blocks.pop(start, None)
+
+    # Translation
+
+    def _translate(self, start: int) -> Optional[_Block]:
+        instructions = self._find_block(start)
+
+        block = None
+        if instructions:
+            end = instructions[-1][0] + _WORD_BYTES
+            source, max_ticks, exits = _BlockTranslator(start, end, instructions).translate()
+
+            namespace = dict(self._namespace)
+            namespace.update(exits)
+            exec(compile(source, f"<block {start:#x}>", "exec"), namespace)
+            block = _Block(start, end, max_ticks, namespace["block"])
+
+        self._blocks[start] = block
+        for addr in range(start, start + max(1, len(instructions)) * _WORD_BYTES, _WORD_BYTES):
+            self._blocks_by_instruction.setdefault(addr, set()).add(start)
+
+        return block
+
+    def _find_block(self, start: int) -> List[Tuple[int, DecodedInstruction]]:
+        instructions = []
+
+        addr = start
+        while len(instructions) < BLOCK_MAX_INSTRUCTIONS:
+            try:
+                decoded = self.memory.fetch(addr)
+            except (MachineMemoryException, NotImplementedError):
+                break
+
+            opcode = INSTRUCTION_BY_OPCODE[decoded.opcode]
+            if opcode in _NOT_TRANSLATED or not self._is_translatable(addr, decoded, opcode):
+                break
+
+            instructions.append((addr, decoded))
+            addr += _WORD_BYTES
+
+            if opcode in _TERMINATORS:
+                break
+
+        # a store into the block ends it (the rest of the block may be changed)
+        for index, (addr, decoded) in enumerate(instructions):
+            end = start + len(instructions) * _WORD_BYTES
+            if INSTRUCTION_BY_OPCODE[decoded.opcode] == InstructionOpcode.SW and start - _WORD_BYTES < decoded.imm < end:
+                del instructions[index + 1:]
+                break
+
+        return instructions
+
+    def _store_executed(self) -> None:
+        """A block records every exit taken, it is replaced by the instructions executed before the exit"""
+        executed: Dict[object, Tuple] = {}
+
+        for key, record in self._executed.items():
+            if not isinstance(key, _BlockExit):
+                if key not in executed or executed[key][0] < record[0]:
+                    executed[key] = record
+                continue
+
+            for instruction_key, start_tick, decoded, operands in key.instructions:
+                tick = record[0] + start_tick
+                if instruction_key not in executed or executed[instruction_key][0] < tick:
+                    executed[instruction_key] = (tick, decoded, *(record[index] for index in operands))
+
+        self._executed = executed
+        super()._store_executed()
+
+    @staticmethod
+    def _is_translatable(addr: int, decoded: DecodedInstruction, opcode: InstructionOpcode) -> bool:
+        """Constants which overflow the latches are left to `InstructionEngine`, it raises the error"""
+        if opcode == InstructionOpcode.LUI:
+            return abs(decoded.imm << 16) < _LATCH_LIMIT
+
+        if opcode in _JUMP_CONDITIONS:
+            return abs(addr + decoded.imm) < _LATCH_LIMIT
+
+        return True
+
+
+class _BlockTranslator:
+    """Python source of a block function (see `BlockEngine`)"""
+
+    def __init__(self, start: int, end: int, instructions: List[Tuple[int, DecodedInstruction]]):
+        self.start: int = start
+        self.end: int = end
+        self.instructions: List[Tuple[int, DecodedInstruction]] = instructions
+
+        self.registers: Set[int] = set()
+        self.fields: Set[str] = set()
+        """Engine fields (except registers and flags) changed by the block"""
+
+        self.body: List[str] = []
+        self.ticks: int = 0
+
+        self.start_ticks: List[int] = []
+        """Ticks from the block start to every instruction"""
+        self.operands: List[Tuple[str, ...]] = []
+        """Local variables holding the recorded operands of every instruction (see `_RECORDED_OPERANDS`)"""
+        self.exits: Dict[str, _BlockExit] = {}
+
+    def translate(self) -> Tuple[str, int, Dict[str, _BlockExit]]:
+        """The source defining `block(self)`, the longest block duration and the block exits it refers to"""
+        live_flags = self._live_flags()
+        recorded = self._recorded_instructions()
+
+        for index, (addr, decoded) in enumerate(self.instructions):
+            opcode = INSTRUCTION_BY_OPCODE[decoded.opcode]
+            self.body.append(f"# {addr:#x}: {opcode.name}")
+            self.start_ticks.append(self.ticks)
+
+            if opcode in _JUMP_CONDITIONS:
+                self.operands.append(())
+                self._translate_jump(index, addr, decoded, opcode)
+                continue
+
+            operands = _RECORDED_OPERANDS[opcode] if index in recorded else ()
+            self.operands.append(tuple(f"o{index}_{position}" for position in range(len(operands))))
+            self._record_operands(index, decoded, operands, after=False)
+
+            self.ticks += _TICKS[opcode]
+            self._translate_instruction(index, addr, decoded, opcode, live_flags[index])
+            self._record_operands(index, decoded, operands, after=True)
+
+        last_opcode = INSTRUCTION_BY_OPCODE[self.instructions[-1][1].opcode]
+        if last_opcode == InstructionOpcode.JR:
+            self.body.extend(self._exit(len(self.instructions), "jpc", self.ticks))
+        elif last_opcode not in _JUMP_CONDITIONS:
+            self.body.extend(self._exit(len(self.instructions), str(self.end), self.ticks))
+
+        lines = ["def block(self):", "    regs = self.regs"]
+        lines.extend(f"    r{register} = regs[{register}]" for register in sorted(self.registers))
+        lines.extend(f"    {flag} = self.{flag}" for flag in _FLAGS)
+        lines.extend(f"    {field} = self.{field}" for field in sorted(self.fields))
+        lines.extend(f"    {line}" for line in self.body)
+
+        return "\n".join(lines) + "\n", self.ticks, self.exits
+
+    def _recorded_instructions(self) -> Set[int]:
+        """Indexes of the instructions which are the last execution of their opcode before any exit"""
+        ends = [
+            index + 1
+            for index, (_, decoded) in enumerate(self.instructions[:-1])
+            if INSTRUCTION_BY_OPCODE[decoded.opcode] == InstructionOpcode.SWR
+        ]
+        ends.append(len(self.instructions))
+
+        recorded = set()
+        for end in ends:
+            last = {
+                decoded.opcode: index
+                for index, (_, decoded) in enumerate(self.instructions[:end])
+                if INSTRUCTION_BY_OPCODE[decoded.opcode] not in _JUMP_CONDITIONS
+            }
+            recorded.update(last.values())
+
+        return recorded
+
+    def _record_operands(
+        self,
+        index: int,
+        decoded: DecodedInstruction,
+        operands: Tuple[Tuple[str, bool], ...],
+        after: bool,
+    ) -> None:
+        for position, (field, is_after) in enumerate(operands):
+            if is_after == after:
+                self.body.append(f"o{index}_{position} = {self._register(getattr(decoded, field))}")
+
+    def _live_flags(self) -> List[FrozenSet[str]]:
+        """Flags which are read after every instruction (before being overwritten)"""
+        live = frozenset(_FLAGS)
+        live_after = [live] * len(self.instructions)
+
+        for index in range(len(self.instructions) - 1, -1, -1):
+            opcode = INSTRUCTION_BY_OPCODE[self.instructions[index][1].opcode]
+            if opcode == InstructionOpcode.SWR:
+                # the block may be left right after the store
+                live = frozenset(_FLAGS)
+
+            live_after[index] = live
+
+            if opcode in _BINOPS or opcode in _UNOPS:
+                live = live - _FLAGS_WRITTEN[(_BINOPS.get(opcode) or _UNOPS[opcode])[1]]
+            elif opcode in (InstructionOpcode.LUI, InstructionOpcode.ADDI, InstructionOpcode.CMP):
+                live = live - _FLAGS_WRITTEN[_FLAGS_NZVC]
+            elif opcode in _SET_CONDITIONS:
+                live = _SET_CONDITIONS[opcode][1]
+            elif opcode in _JUMP_CONDITIONS:
+                live = live | {"z"}
+
+        return live_after
+
+    def _register(self, register: int) -> str:
+        self.registers.add(register)
+        return f"r{register}"
+
+    def _field(self, field: str) -> str:
+        self.fields.add(field)
+        return field
+
+    def _flags(self, out: str, mode: int, live: FrozenSet[str]) -> List[str]:
+        written = _FLAGS_WRITTEN[mode] & live
+        lines = []
+
+        if "v" in written or "c" in written:
+            overflow = f"0 if SIGNED_MIN <= {out} <= SIGNED_MAX else 1"
+            if mode == _FLAGS_NZVC:
+                targets = [flag for flag in "vc" if flag in written]
+                lines.append(f"{' = '.join(targets)} = {overflow}")
+            elif mode == _FLAGS_NZV:
+                lines.append(f"v = {overflow}")
+            elif mode == _FLAGS_NZC_CLEAR_V:
+                if "v" in written:
+                    lines.append("v = 0")
+                if "c" in written:
+                    lines.append(f"c = {overflow}")
+            else:
+                lines.append("v = 0")
+
+        if "n" in written:
+            lines.append(f"n = 1 if {out} < 0 else 0")
+        if "z" in written:
+            lines.append(f"z = 1 if {out} == 0 else 0")
+
+        return lines
+
+    def _write_back(self, r1: int, value: str) -> List[str]:
+        return [
+            f"{self._field('alu_out')} = {value}",
+            f"{self._field('br')} = latch({value})",
+            f"{self._register(r1)} = {value}",
+        ]
+
+    def _translate_instruction(
+        self,
+        index: int,
+        addr: int,
+        decoded: DecodedInstruction,
+        opcode: InstructionOpcode,
+        live: FrozenSet[str],
+    ) -> None:
+        body = self.body
+        r1, r2, r3, imm = decoded.r1, decoded.r2, decoded.r3, decoded.imm
+
+        if opcode == InstructionOpcode.LUI:
+            body.append(f"out = {self._register(r1)} + {imm << 16}")
+            body.extend(self._flags("out", _FLAGS_NZVC, live))
+            body.extend(self._write_back(r1, "out"))
+        elif opcode == InstructionOpcode.LLI:
+            value = imm & 0xFFFF
+            body.append(f"{self._field('alu_out')} = {self._field('br')} = {self._register(r1)} = {value}")
+        elif opcode == InstructionOpcode.LW:
+            body.append(f"{self._field('ar')} = {imm}")
+            body.append(f"{self._field('br')} = {self._register(r1)} = read({imm})")
+        elif opcode == InstructionOpcode.SW:
+            body.append(f"{self._field('ar')} = {imm}")
+            body.append(f"{self._field('br')} = {self._register(r1)}")
+            body.append(f"write({imm}, br)")
+        elif opcode == InstructionOpcode.LWR:
+            body.append(f"{self._field('ar')} = {self._register(r2)}")
+            body.append(f"{self._field('br')} = {self._register(r1)} = read(ar)")
+        elif opcode == InstructionOpcode.SWR:
+            body.append(f"{self._field('br')} = {self._register(r1)}")
+            body.append(f"{self._field('ar')} = {self._register(r2)}")
+            body.append("write(ar, br)")
+            if index + 1 < len(self.instructions):
+                body.append(f"if {self.start - _WORD_BYTES} < ar < {self.end}:")
+                body.extend(f"    {line}" for line in self._exit(index + 1, str(addr + _WORD_BYTES), self.ticks))
+        elif opcode == InstructionOpcode.MV:
+            body.extend(self._write_back(r1, self._register(r2)))
+        elif opcode == InstructionOpcode.ADDI:
+            body.append(f"out = {self._register(r1)} + {imm}")
+            body.extend(self._flags("out", _FLAGS_NZVC, live))
+            body.extend(self._write_back(r1, "out"))
+        elif opcode in _BINOPS:
+            expression, mode = _BINOPS[opcode]
+            body.append(f"out = {expression.format(a=self._register(r2), b=self._register(r3))}")
+            body.extend(self._flags("out", mode, live))
+            body.extend(self._write_back(r1, "out"))
+        elif opcode == InstructionOpcode.DIV:
+            body.append(f"if {self._register(r3)} == 0:")
+            body.append("    self.irq |= ZERO_DIVISION")
+            body.extend(f"    {line}" for line in self._write_back(r1, "alu_out"))
+            body.append("else:")
+            body.append(f"    out = {self._register(r2)} // r{r3}")
+            body.extend(f"    {line}" for line in self._flags("out", _FLAGS_NZVC, live))
+            body.extend(f"    {line}" for line in self._write_back(r1, "out"))
+        elif opcode in _UNOPS:
+            expression, mode = _UNOPS[opcode]
+            body.append(f"out = {expression.format(a=self._register(r2))}")
+            body.extend(self._flags("out", mode, live))
+            body.extend(self._write_back(r1, "out"))
+        elif opcode == InstructionOpcode.CMP:
+            body.append(f"{self._field('alu_out')} = out = {self._register(r1)} - {self._register(r2)}")
+            body.extend(self._flags("out", _FLAGS_NZVC, live))
+        elif opcode in _SET_CONDITIONS:
+            condition, _ = _SET_CONDITIONS[opcode]
+            body.append(f"out = 1 if {condition} else 0")
+            body.append("n, z, v, c = 0, 1 if out == 0 else 0, 0, 0")
+            body.extend(self._write_back(r1, "out"))
+        elif opcode == InstructionOpcode.JAL:
+            body.append(f"{self._field('ar')} = {self._field('jpc')} = {imm}")
+            body.extend(self._write_back(r1, self._register(r1)))
+        elif opcode == InstructionOpcode.JR:
+            body.append(f"{self._field('ar')} = {self._field('jpc')} = {self._register(r1)}")
+        else:
+            raise NotImplementedError(f"{opcode.name} isn't translated")
+
+    def _translate_jump(self, index: int, addr: int, decoded: DecodedInstruction, opcode: InstructionOpcode) -> None:
+        """A conditional jump is the last instruction of a block, it takes 2 ticks, or 6 if taken"""
+        out = addr + decoded.imm
+        overflow = int(not (_SIGNED_MIN <= out <= _SIGNED_MAX))
+        flags = f"n, z, v, c = {int(out < 0)}, {int(out == 0)}, {overflow}, {overflow}"
+
+        self.body.append(f"if {_JUMP_CONDITIONS[opcode]}:")
+        self.body.append(f"    {flags}")
+        self.body.append(f"    {self._field('alu_out')} = {self._field('jpc')} = {self._field('br')} = {out}")
+
+        taken = (decoded.opcode, (addr,))
+        self.body.extend(f"    {line}" for line in self._exit(index + 1, str(out), self.ticks + 6, taken))
+        self.body.append("else:")
+        skipped = (_SKIPPED_JUMP, ())
+        self.body.extend(
+            f"    {line}" for line in self._exit(index + 1, str(addr + _WORD_BYTES), self.ticks + 2, skipped)
+        )
+
+        self.ticks += 6
+
+    def _exit(
+        self,
+        executed: int,
+        pc: str,
+        ticks: int,
+        jump: Optional[Tuple[int, Tuple[int, ...]]] = None,
+    ) -> List[str]:
+        """
+        Store the state after `executed` instructions of the block (which take `ticks`) and return
+
+        `jump` is the key and the operands of a conditional jump which ends the block.
+        """
+        last_addr, last_decoded = self.instructions[executed - 1]
+
+        last = {}
+        for index, (_, decoded) in enumerate(self.instructions[:executed]):
+            if INSTRUCTION_BY_OPCODE[decoded.opcode] not in _JUMP_CONDITIONS:
+                last[decoded.opcode] = index
+
+        values = ["self.tick"]
+        instructions = []
+        for key, index in last.items():
+            positions = tuple(range(len(values), len(values) + len(self.operands[index])))
+            values.extend(self.operands[index])
+            instructions.append((key, self.start_ticks[index], self.instructions[index][1], positions))
+
+        if jump is not None:
+            key, operands = jump
+            positions = tuple(range(len(values), len(values) + len(operands)))
+            values.extend(str(operand) for operand in operands)
+            instructions.append((key, self.start_ticks[executed - 1], last_decoded, positions))
+
+        name = f"exit{len(self.exits)}"
+        self.exits[name] = _BlockExit(instructions)
+
+        lines = [f"self._executed[{name}] = ({', '.join(values)},)"]
+        lines.extend(f"regs[{register}] = r{register}" for register in sorted(self.registers))
+        lines.extend(f"self.{flag} = {flag}" for flag in _FLAGS)
+        lines.extend(f"self.{field} = {field}" for field in sorted(self.fields))
+        lines.extend([
+            f"self.pc = {pc}",
+            f"self.ir = {last_decoded.word}",
+            "if self.ie == 1:",
+            f"    self.ipc = {last_addr}",
+            f"self.tick += {ticks}",
+            "return",
+        ])
+
+        return lines
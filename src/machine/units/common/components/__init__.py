@@ -1,4 +1,43 @@
-from .data_latch import DataLatch
-from .data_selector import DataSelector
+from typing import Iterable, Union
 
-__all__ = ["DataLatch", "DataSelector"]
+from .data_latch import DataLatch, UncheckedDataLatch
+from .data_selector import DataSelector, UncheckedDataSelector
+
+Component = Union[DataLatch, DataSelector]
+
+_STRICT_CLASSES = {
+    DataLatch: DataLatch,
+    UncheckedDataLatch: DataLatch,
+    DataSelector: DataSelector,
+    UncheckedDataSelector: DataSelector,
+}
+
+_UNCHECKED_CLASSES = {
+    DataLatch: UncheckedDataLatch,
+    UncheckedDataLatch: UncheckedDataLatch,
+    DataSelector: UncheckedDataSelector,
+    UncheckedDataSelector: UncheckedDataSelector,
+}
+
+
+def set_strict_checks(components: Iterable[Component], enabled: bool) -> None:
+    """
+    Enable or disable value and index checks of the given latches and selectors
+
+    Checks are enabled by default. Disabling them speeds up production runs
+    of already debugged programs. Only the given instances are switched
+    (see `Datapath.set_strict_checks`), so every machine has its own mode.
+    """
+    classes = _STRICT_CLASSES if enabled else _UNCHECKED_CLASSES
+    for component in components:
+        component.__class__ = classes[component.__class__]
+
+
+__all__ = [
+    "Component",
+    "DataLatch",
+    "DataSelector",
+    "UncheckedDataLatch",
+    "UncheckedDataSelector",
+    "set_strict_checks",
+]
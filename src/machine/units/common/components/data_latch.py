@@ -2,19 +2,33 @@ from isa.constants import WORD_SIZE
 
 
 class DataLatch:
+    __slots__ = ("_bitsize", "_max_value", "_value")
+
     def __init__(self, bitsize: int = WORD_SIZE, defult_value: int = 0):
         if bitsize <= 0:
             raise ValueError(f"bitsize must be more than 0 (got {bitsize})")
 
         self._bitsize = bitsize
+        self._max_value = 2 ** bitsize - 1
+        """The biggest absolute value which fits into the latch"""
+
         self.latch_value(defult_value)
 
     def latch_value(self, value: int) -> None:
-        value_bitsize = len(bin(abs(value))[2:])
-        if value_bitsize > self._bitsize:
+        if not (-self._max_value <= value <= self._max_value):
+            value_bitsize = len(bin(abs(value))[2:])
             raise ValueError(f"{value} is too big, max bit size is {self._bitsize} (got {value_bitsize})")
 
         self._value = value
 
     def get_value(self) -> int:
         return self._value
+
+
+class UncheckedDataLatch(DataLatch):
+    """`DataLatch` which doesn't check the latched values (see `set_strict_checks`)"""
+
+    __slots__ = ()
+
+    def latch_value(self, value: int) -> None:
+        self._value = value
@@ -1,21 +1,27 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 from isa.constants import INSTR_OPCODE_SIZE, REG_ID_SIZE, WORD_SIZE
-from isa.instructions import InstructionOpcode
+from isa.instructions import OPCODES_COUNT, InstructionOpcode
 from isa.registers import RegisterCode
 
-from ..constants import INPUT_ADDR, START_ADDR
+from ..constants import START_ADDR
 from .common.components.data_latch import DataLatch
 from .common.components.data_selector import DataSelector
-from .common.enums import ALUOperation, Interrupts, RegisterFileFetch
+from .common.enums import ALUOperation, RegisterFileFetch
 from .common.exceptions import MachineLimitException, MachineStop
-from .common.helpers import convert_to_signed
+from .event_scheduler import EventScheduler
+from .input_port import InputPort
+from .instruction_cache import DecodedInstruction, decode_instruction
+from .trace import TickTrace
 
 if TYPE_CHECKING:
     from .datapath import Datapath
 
+_Microstep = Tuple[Callable[[], None], ...]
+
 
 class _InterruptHandler:
     def __init__(self, control_unit: ControlUnit):
@@ -102,9 +108,6 @@ class _InterruptHandler:
 
 
 class _InstructionDecoder:
-    _OPCODE_MASK = int("1" * INSTR_OPCODE_SIZE, 2)
-    _REGISTER_MASK = int("1" * REG_ID_SIZE, 2)
-
     def __init__(self, control_unit: ControlUnit):
         self.control_unit: ControlUnit = control_unit
 
@@ -138,6 +141,9 @@ class _InstructionDecoder:
         }
         """ALU Flags (get from Datapath)"""
 
+        self._decoded: DecodedInstruction = decode_instruction(self.ir.get_value())
+        """Fields of the latched instruction (taken from the decoded instructions cache)"""
+
         self.out: DataSelector = DataSelector(12)
         """
         Instruction Decoder Out Multiplexer (12 inputs):
@@ -159,49 +165,33 @@ class _InstructionDecoder:
         """
 
     def signal_read_and_latch_ir(self) -> None:
-        self.ir.latch_value(value := self.control_unit.datapath.memory.read(self.control_unit.pc.get_value()))
-        self.opcode.latch_value(value & self._OPCODE_MASK)
+        datapath = self.control_unit.datapath
+        pc = self.control_unit.pc.get_value()
+        if datapath.cache is not None:
+            self.control_unit.stall_ticks += datapath.cache.access(pc)
+
+        self._decoded = datapath.memory.fetch(pc)
+        self.ir.latch_value(self._decoded.word)
+        self.opcode.latch_value(self._decoded.opcode)
+
+    def reload_decoded(self) -> None:
+        """Decode the latched instruction again (after IR is restored)"""
+        self._decoded = decode_instruction(self.ir.get_value())
 
     def signal_decode_instr(self) -> None:
-        instruction = self.ir.get_value()
-
-        opcode = bin(self.opcode.get_value())[2:].zfill(INSTR_OPCODE_SIZE)
-        match opcode:
-            case InstructionOpcode.LUI.bincode | InstructionOpcode.LLI.bincode | InstructionOpcode.ADDI.bincode \
-                    | InstructionOpcode.LW.bincode | InstructionOpcode.SW.bincode | InstructionOpcode.JAL.bincode:
-                self.r1.latch_value((instruction >> INSTR_OPCODE_SIZE) & self._REGISTER_MASK)
-                imm_value = instruction >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)
-                imm_value_size = WORD_SIZE - INSTR_OPCODE_SIZE - REG_ID_SIZE
-                self.imm.latch_value(convert_to_signed(imm_value, imm_value_size))
-
-            case InstructionOpcode.LWR.bincode | InstructionOpcode.SWR.bincode | InstructionOpcode.MV.bincode \
-                    | InstructionOpcode.NEG.bincode | InstructionOpcode.NOT.bincode | InstructionOpcode.CMP.bincode:
-                self.r1.latch_value((instruction >> INSTR_OPCODE_SIZE) & self._REGISTER_MASK)
-                self.r2.latch_value((instruction >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)) & self._REGISTER_MASK)
-
-            case InstructionOpcode.ADD.bincode | InstructionOpcode.SUB.bincode | InstructionOpcode.MUL.bincode \
-                    | InstructionOpcode.DIV.bincode | InstructionOpcode.REM.bincode | InstructionOpcode.AND.bincode \
-                    | InstructionOpcode.OR.bincode | InstructionOpcode.XOR.bincode | InstructionOpcode.SHL.bincode \
-                    | InstructionOpcode.SHR.bincode:
-                self.r1.latch_value((instruction >> INSTR_OPCODE_SIZE) & self._REGISTER_MASK)
-                self.r2.latch_value((instruction >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)) & self._REGISTER_MASK)
-                self.r3.latch_value((instruction >> (INSTR_OPCODE_SIZE + REG_ID_SIZE * 2)) & self._REGISTER_MASK)
-
-            case InstructionOpcode.JR.bincode | InstructionOpcode.SETEQ.bincode | InstructionOpcode.SETNE.bincode \
-                    | InstructionOpcode.SETGE.bincode | InstructionOpcode.SETLE.bincode \
-                    | InstructionOpcode.SETSG.bincode | InstructionOpcode.SETSL.bincode:
-                self.r1.latch_value((instruction >> INSTR_OPCODE_SIZE) & self._REGISTER_MASK)
-
-            case InstructionOpcode.JO.bincode | InstructionOpcode.JZ.bincode | InstructionOpcode.JNZ.bincode:
-                imm_value = instruction >> INSTR_OPCODE_SIZE
-                imm_value_size = WORD_SIZE - INSTR_OPCODE_SIZE
-                self.imm.latch_value(convert_to_signed(imm_value, imm_value_size))
-
-            case InstructionOpcode.RETI.bincode | InstructionOpcode.HALT.bincode:
-                pass
-
-            case _:
-                raise NotImplementedError(f"unexpected opcode {opcode}")
+        decoded = self._decoded
+
+        if decoded.r1 is not None:
+            self.r1.latch_value(decoded.r1)
+
+        if decoded.r2 is not None:
+            self.r2.latch_value(decoded.r2)
+
+        if decoded.r3 is not None:
+            self.r3.latch_value(decoded.r3)
+
+        if decoded.imm is not None:
+            self.imm.latch_value(decoded.imm)
 
         self.out.set_input_value(0, self.imm.get_value())
         self.out.set_input_value(1, self.r1.get_value())
@@ -228,16 +218,20 @@ class _InstructionDecoder:
 
 
 class ControlUnit:
-    def __init__(self, datapath: Datapath):
+    def __init__(self, datapath: Datapath, start_addr: int = START_ADDR):
         self._tick: int = 0
         self.ticks_limit: Optional[int] = None
-        self.input_tokens: Dict[int, str] = {}
+        self.events: EventScheduler = EventScheduler()
 
         self.simulation_log: List[Dict[str, Any]] = []
+        self.signal_log_enabled: bool = False
+        """Append memory signals to `simulation_log` (a debugging aid, off by default)"""
+        self.trace: Optional[TickTrace] = None
 
         self.datapath: Datapath = datapath
         self.instruction_decoder: _InstructionDecoder = _InstructionDecoder(self)
         self.interrupt_handler: _InterruptHandler = _InterruptHandler(self)
+        self.input_port: InputPort = InputPort(self)
 
         self.mux_dp: DataSelector = DataSelector(2)
         """
@@ -278,7 +272,7 @@ class ControlUnit:
             - Program Counter
         """
 
-        self.pc: DataLatch = DataLatch(defult_value=START_ADDR)
+        self.pc: DataLatch = DataLatch(defult_value=start_addr)
         """
         Program Counter (input - PC Multiplexer)
 
@@ -291,662 +285,485 @@ class ControlUnit:
 
         self.signal_latch_pc(init=True)
 
-    def process_instruction(self) -> None:
-        interrupted = False
-
-        # Simple steps
-        def pc_to_ipc_and_check_int():
-            """IPC <- PC"""
-            nonlocal interrupted
-            self.interrupt_handler.signal_latch_ipc()
-            interrupted = self.interrupt_handler.signal_check_int()
-
-        def ipc_to_pc():
-            """PC <- IPC"""
-            self.interrupt_handler.signal_sel_out(0)
-            self.signal_sel_pc(1)
-            self.signal_latch_pc()
-
-        def set_ie_1():
-            """IE = 1"""
-            self.interrupt_handler.signal_set_ie(1)
-
-        def mem_pc_to_ir():
-            """IR <- [PC]"""
-            self.instruction_decoder.signal_read_and_latch_ir()
-
-        def pc_plus_4_to_pc():
-            """PC <- PC + 4"""
-            self.signal_sel_pc(2)
-            self.signal_latch_pc()
-
-        def decode_instruction():
-            """imm, R1, R2, R3 <- IR"""
-            self.instruction_decoder.signal_decode_instr()
-
-        def imm_to_alu_b():
-            """ALU_B <- IR[12:31] or ALU_B <- IR[7:11]"""
-            self.instruction_decoder.signal_sel_out(0)
-            self.signal_sel_dp(1)
-            self.datapath.signal_sel_alu_b(1)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def imm_to_ar():
-            """AR <- IR[12:31]"""
-            self.instruction_decoder.signal_sel_out(0)
-            self.signal_sel_dp(1)
-            self.datapath.signal_sel_ar(2)
-            self.datapath.signal_latch_ar()
-
-        def do_alu_op(operation: ALUOperation):
-            """NZVC, ALU_Out <- any alu operation"""
-            self.datapath.alu.signal_alu_op(operation)
-
-        def do_alu_op_and_store_to_br(operation: ALUOperation):
-            """BR <- any alu operation"""
-            do_alu_op(operation)
-            self.datapath.signal_sel_br(1)
-            self.datapath.signal_latch_br()
-
-        def mem_r1_to_alu_a():
-            """ALU_A <- [R1]"""
-            self.instruction_decoder.signal_sel_out(1)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
-            self.datapath.signal_sel_alu_a(0)
-            self.datapath.alu.signal_latch_alu_a()
-
-        def mem_r1_to_alu_b():
-            """ALU_B <- [R1]"""
-            self.instruction_decoder.signal_sel_out(1)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
-            self.datapath.signal_sel_alu_b(0)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def mem_r1_to_alu_a_mem_r2_to_alu_b():
-            """ALU_A <- [R1], ALU_B <- [R2]"""
-            self.instruction_decoder.signal_sel_out(4)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
-            self.datapath.signal_sel_alu_a(0)
-            self.datapath.alu.signal_latch_alu_a()
-            self.datapath.signal_sel_alu_b(0)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def mem_r2_to_alu_b():
-            """ALU_B <- [R2]"""
-            self.instruction_decoder.signal_sel_out(2)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
-            self.datapath.signal_sel_alu_b(0)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def br_to_alu_b():
-            """ALU_B <- BR"""
-            self.datapath.signal_sel_alu_b(2)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def br_to_mem_r1():
-            """[R1] <- BR"""
-            self.instruction_decoder.signal_sel_out(1)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_write_reg()
-
-        def br_to_mem_ar():
-            self.datapath.signal_write()
-
-        def mem_ar_to_br():
-            """BR <- [AR]"""
-            self.datapath.signal_read()
-            self.datapath.signal_sel_br(2)
-            self.datapath.signal_latch_br()
-
-        def mem_r1_to_br():
-            """BR <- [R1]"""
-            self.instruction_decoder.signal_sel_out(1)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
-            self.datapath.signal_sel_br(0)
-            self.datapath.signal_latch_br()
-
-        def mem_r1_to_ar():
-            """AR <- [R1]"""
-            self.instruction_decoder.signal_sel_out(1)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
-            self.datapath.signal_sel_ar(1)
-            self.datapath.signal_latch_ar()
-
-        def mem_r2_to_ar():
-            """AR <- [R2]"""
-            self.instruction_decoder.signal_sel_out(2)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
-            self.datapath.signal_sel_ar(1)
-            self.datapath.signal_latch_ar()
-
-        def mem_r1_to_br_mem_r2_to_ar():
-            """AR <- [R2], BR <- [R1]"""
-            self.instruction_decoder.signal_sel_out(4)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
-            self.datapath.signal_sel_br(0)
-            self.datapath.signal_latch_br()
-            self.datapath.signal_sel_ar(1)
-            self.datapath.signal_latch_ar()
-
-        def mem_r2_to_alu_a_mem_r3_to_alu_b():
-            """ALU_A <- [R2], ALU_B <- [R3]"""
-            self.instruction_decoder.signal_sel_out(5)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
-            self.datapath.signal_sel_alu_a(0)
-            self.datapath.alu.signal_latch_alu_a()
-            self.datapath.signal_sel_alu_b(0)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def mem_r2_to_alu_a():
-            """ALU_A <- [R2]"""
-            self.instruction_decoder.signal_sel_out(2)
-            self.signal_sel_dp(1)
-            self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
-            self.datapath.signal_sel_alu_a(0)
-            self.datapath.alu.signal_latch_alu_a()
-
-        def flags_cmp_to_alu_b(out_index: int):
-            """ALU_B <- any flags comparison in instruction decoder"""
-            self.instruction_decoder.signal_sel_out(out_index)
-            self.signal_sel_dp(1)
-            self.datapath.signal_sel_alu_b(1)
-            self.datapath.alu.signal_latch_alu_b()
-
-        def ar_to_jpc():
-            """JPC <- AR"""
-            self.datapath.signal_sel_cu(0)
-            self.signal_sel_jpc(0)
-            self.signal_latch_jpc()
-
-        def jpc_to_pc():
-            """PC <- JPC"""
-            self.signal_sel_pc(0)
-            self.signal_latch_pc()
-
-        def pc_to_alu_a():
-            """ALU_A <- PC"""
-            self.signal_sel_dp(0)
-            self.datapath.signal_sel_alu_a(1)
-            self.datapath.alu.signal_latch_alu_a()
-
-        def br_to_jpc():
-            """JPC <- BR"""
-            self.datapath.signal_sel_cu(1)
-            self.signal_sel_jpc(0)
-            self.signal_latch_jpc()
-
-        # Similar instructions
-        def alu_unop_instr_signals(operation: ALUOperation):
-            # IF
-            pc_to_ipc_and_check_int()
-            self.tick()
-
-            if interrupted:
-                return
-
-            pc_plus_4_to_pc()
-            self.tick()
+        self.microstep_index: int = 0
+        """Index of the next microstep of the current instruction (0 between instructions)"""
 
-            # ID
-            decode_instruction()
-            self.tick()
-
-            # EX
-            mem_r2_to_alu_a()
-            self.tick()
-
-            do_alu_op_and_store_to_br(operation)
-            self.tick()
+        self.stall_ticks: int = 0
+        """Ticks the machine waits for the memory cache (see `Datapath.cache`) after the current microstep"""
 
-            # WB
-            br_to_mem_r1()
-            self.tick()
+        self._microprogram_finished: bool = False
+        self._microprograms: List[Optional[List[_Microstep]]] = self._build_microprograms()
 
-        def alu_binop_instr_signals(operation: ALUOperation):
-            # IF
-            pc_to_ipc_and_check_int()
-            self.tick()
+    def process_instruction(self) -> None:
+        """
+        Run the current instruction to its end
 
-            if interrupted:
-                return
+        An instruction interrupted by `MachineLimitException` (or restored from
+        a checkpoint) in the middle is continued from its next microstep.
 
-            pc_plus_4_to_pc()
-            self.tick()
+        Memory cache stalls are taken after the microstep which has accessed
+        memory, every stall tick is a tick without signals.
+        """
+        if self.stall_ticks:
+            self._stall()
 
-            # ID
-            decode_instruction()
-            self.tick()
+        start_index = self.microstep_index
+        if start_index == 0:
+            self.instruction_decoder.signal_read_and_latch_ir()
+        opcode = self.instruction_decoder.opcode.get_value()
 
-            # EX
-            mem_r2_to_alu_a_mem_r3_to_alu_b()
-            self.tick()
+        microprogram = self._microprograms[opcode]
+        if microprogram is None:
+            raise NotImplementedError(f"unexpected opcode {bin(opcode)[2:].zfill(INSTR_OPCODE_SIZE)}")
 
-            do_alu_op_and_store_to_br(operation)
-            self.tick()
+        last_index = len(microprogram) - 1
+        self._microprogram_finished = False
+        for index in range(start_index, last_index + 1):
+            for signal in microprogram[index]:
+                signal()
 
-            # WB
-            br_to_mem_r1()
+            self.microstep_index = 0 if self._microprogram_finished or index == last_index else index + 1
             self.tick()
 
-        def set_instr_signals(id_out_index: int):
-            # IF
-            pc_to_ipc_and_check_int()
-            self.tick()
+            if self.stall_ticks:
+                self._stall()
 
-            if interrupted:
+            if self.microstep_index == 0:
                 return
 
-            pc_plus_4_to_pc()
-            self.tick()
-
-            # ID
-            decode_instruction()
-            flags_cmp_to_alu_b(id_out_index)
-            self.tick()
-
-            # EX
-            do_alu_op_and_store_to_br(ALUOperation.FETCH_B_SET_Z)
-            self.tick()
-
-            # WB
-            br_to_mem_r1()
-            self.tick()
+    def process_tick(self) -> None:
+        """
+        Run a single tick of the current instruction: its next microstep or a memory cache stall tick
 
-        def jump_flag_condition(z_can_be: List[int]):
-            # IF
-            pc_to_ipc_and_check_int()
+        Calling it until `microstep_index` is 0 again is the same as a single
+        `process_instruction` call.
+        """
+        if self.stall_ticks:
+            self.stall_ticks -= 1
             self.tick()
+            return
 
-            if interrupted:
-                return
-
-            if self.instruction_decoder.flags["Z"].get_value() not in z_can_be:
-                pc_plus_4_to_pc()
-                self.tick()
-                return
+        index = self.microstep_index
+        if index == 0:
+            self.instruction_decoder.signal_read_and_latch_ir()
+        opcode = self.instruction_decoder.opcode.get_value()
 
-            self.tick()
+        microprogram = self._microprograms[opcode]
+        if microprogram is None:
+            raise NotImplementedError(f"unexpected opcode {bin(opcode)[2:].zfill(INSTR_OPCODE_SIZE)}")
 
-            # ID
-            decode_instruction()
-            pc_to_alu_a()
-            self.tick()
+        self._microprogram_finished = False
+        for signal in microprogram[index]:
+            signal()
 
-            imm_to_alu_b()
-            self.tick()
-
-            # EX
-            do_alu_op_and_store_to_br(ALUOperation.ADD)
-            self.tick()
+        self.microstep_index = 0 if self._microprogram_finished or index == len(microprogram) - 1 else index + 1
+        self.tick()
 
-            br_to_jpc()
-            jpc_to_pc()
+    def _stall(self) -> None:
+        while self.stall_ticks > 0:
+            self.stall_ticks -= 1
             self.tick()
 
-        mem_pc_to_ir()
-        opcode = str(bin(self.instruction_decoder.opcode.get_value())[2:]).zfill(INSTR_OPCODE_SIZE)
-
-        match opcode:
-            case InstructionOpcode.LUI.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
+    def _build_microprograms(self) -> List[Optional[List[_Microstep]]]:
+        """
+        Microprograms indexed by the instruction opcode
 
-                if interrupted:
-                    return
+        Each microprogram is a list of microsteps, every microstep takes one tick.
+        """
+        alu_op = self._do_alu_op
+        alu_op_to_br = self._do_alu_op_and_store_to_br
 
-                pc_plus_4_to_pc()
-                self.tick()
+        # IF
+        fetch = (self._pc_to_ipc_and_check_int,)
+        fetch_next = [fetch, (self._pc_plus_4_to_pc,)]
 
+        def alu_unop(operation: ALUOperation) -> List[_Microstep]:
+            return fetch_next + [
                 # ID
-                decode_instruction()
-                imm_to_alu_b()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                do_alu_op_and_store_to_br(ALUOperation.FETCH_B_SHIFT_16)
-                self.tick()
-
-                mem_r1_to_alu_a()
-                br_to_alu_b()
-                self.tick()
-
-                do_alu_op_and_store_to_br(ALUOperation.ADD)
-                self.tick()
-
+                (self._mem_r2_to_alu_a,),
+                (partial(alu_op_to_br, operation),),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.LLI.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
+                (self._br_to_mem_r1,),
+            ]
 
+        def alu_binop(operation: ALUOperation) -> List[_Microstep]:
+            return fetch_next + [
                 # ID
-                decode_instruction()
-                imm_to_alu_b()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                do_alu_op_and_store_to_br(ALUOperation.FETCH_B_LOWER)
-                self.tick()
-
+                (self._mem_r2_to_alu_a_mem_r3_to_alu_b,),
+                (partial(alu_op_to_br, operation),),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.LW.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
+                (self._br_to_mem_r1,),
+            ]
 
-                pc_plus_4_to_pc()
-                self.tick()
+        def set_flag(id_out_index: int) -> List[_Microstep]:
+            return fetch_next + [
+                # ID
+                (self._decode_instruction, partial(self._flags_cmp_to_alu_b, id_out_index)),
+                # EX
+                (partial(alu_op_to_br, ALUOperation.FETCH_B_SET_Z),),
+                # WB
+                (self._br_to_mem_r1,),
+            ]
 
+        def jump_flag_condition(z_can_be: List[int]) -> List[_Microstep]:
+            return [
+                fetch,
+                (partial(self._skip_jump_unless_z_in, z_can_be),),
                 # ID
-                decode_instruction()
-                imm_to_ar()
-                self.tick()
+                (self._decode_instruction, self._pc_to_alu_a),
+                (self._imm_to_alu_b,),
+                # EX
+                (partial(alu_op_to_br, ALUOperation.ADD),),
+                (self._br_to_jpc, self._jpc_to_pc),
+            ]
 
+        microprograms = {
+            InstructionOpcode.LUI: fetch_next + [
+                # ID
+                (self._decode_instruction, self._imm_to_alu_b),
+                # EX
+                (partial(alu_op_to_br, ALUOperation.FETCH_B_SHIFT_16),),
+                (self._mem_r1_to_alu_a, self._br_to_alu_b),
+                (partial(alu_op_to_br, ALUOperation.ADD),),
+                # WB
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.LLI: fetch_next + [
+                # ID
+                (self._decode_instruction, self._imm_to_alu_b),
+                # EX
+                (partial(alu_op_to_br, ALUOperation.FETCH_B_LOWER),),
+                # WB
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.LW: fetch_next + [
+                # ID
+                (self._decode_instruction, self._imm_to_ar),
                 # MEM
-                mem_ar_to_br()
-                self.tick()
-
+                (self._mem_ar_to_br,),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.SW.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.SW: fetch_next + [
                 # ID
-                decode_instruction()
-                imm_to_ar()
-                self.tick()
-
+                (self._decode_instruction, self._imm_to_ar),
                 # EX
-                mem_r1_to_br()
-                self.tick()
-
+                (self._mem_r1_to_br,),
                 # MEM
-                br_to_mem_ar()
-                self.tick()
-
-            case InstructionOpcode.LWR.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_ar,),
+            ],
+            InstructionOpcode.LWR: fetch_next + [
                 # ID
-                decode_instruction()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r2_to_ar()
-                self.tick()
-
+                (self._mem_r2_to_ar,),
                 # MEM
-                mem_ar_to_br()
-                self.tick()
-
+                (self._mem_ar_to_br,),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.SWR.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.SWR: fetch_next + [
                 # ID
-                decode_instruction()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r1_to_br_mem_r2_to_ar()
-                self.tick()
-
+                (self._mem_r1_to_br_mem_r2_to_ar,),
                 # MEM
-                br_to_mem_ar()
-                self.tick()
-
-            case InstructionOpcode.MV.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_ar,),
+            ],
+            InstructionOpcode.SWAP: fetch_next + [
                 # ID
-                decode_instruction()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r2_to_alu_b()
-                self.tick()
-
-                do_alu_op_and_store_to_br(ALUOperation.FETCH_B)
-                self.tick()
-
+                (self._mem_r1_to_br_mem_r2_to_ar,),
+                # MEM
+                (self._swap_br_mem_ar,),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.ADDI.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.MV: fetch_next + [
                 # ID
-                decode_instruction()
-                imm_to_alu_b()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r1_to_alu_a()
-                self.tick()
-
-                do_alu_op_and_store_to_br(ALUOperation.ADD)
-                self.tick()
-
+                (self._mem_r2_to_alu_b,),
+                (partial(alu_op_to_br, ALUOperation.FETCH_B),),
+                # WB
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.ADDI: fetch_next + [
+                # ID
+                (self._decode_instruction, self._imm_to_alu_b),
+                # EX
+                (self._mem_r1_to_alu_a,),
+                (partial(alu_op_to_br, ALUOperation.ADD),),
                 # MEM
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.ADD.bincode:
-                alu_binop_instr_signals(ALUOperation.ADD)
-
-            case InstructionOpcode.SUB.bincode:
-                alu_binop_instr_signals(ALUOperation.SUB)
-
-            case InstructionOpcode.MUL.bincode:
-                alu_binop_instr_signals(ALUOperation.MUL)
-
-            case InstructionOpcode.DIV.bincode:
-                alu_binop_instr_signals(ALUOperation.DIV)
-
-            case InstructionOpcode.REM.bincode:
-                alu_binop_instr_signals(ALUOperation.REM)
-
-            case InstructionOpcode.NEG.bincode:
-                alu_unop_instr_signals(ALUOperation.NEG)
-
-            case InstructionOpcode.AND.bincode:
-                alu_binop_instr_signals(ALUOperation.AND)
-
-            case InstructionOpcode.OR.bincode:
-                alu_binop_instr_signals(ALUOperation.OR)
-
-            case InstructionOpcode.XOR.bincode:
-                alu_binop_instr_signals(ALUOperation.XOR)
-
-            case InstructionOpcode.NOT.bincode:
-                alu_unop_instr_signals(ALUOperation.NOT)
-
-            case InstructionOpcode.SHL.bincode:
-                alu_binop_instr_signals(ALUOperation.SHL)
-
-            case InstructionOpcode.SHR.bincode:
-                alu_binop_instr_signals(ALUOperation.SHR)
-
-            case InstructionOpcode.CMP.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.ADD: alu_binop(ALUOperation.ADD),
+            InstructionOpcode.SUB: alu_binop(ALUOperation.SUB),
+            InstructionOpcode.MUL: alu_binop(ALUOperation.MUL),
+            InstructionOpcode.DIV: alu_binop(ALUOperation.DIV),
+            InstructionOpcode.REM: alu_binop(ALUOperation.MOD),
+            InstructionOpcode.NEG: alu_unop(ALUOperation.NEG),
+            InstructionOpcode.AND: alu_binop(ALUOperation.AND),
+            InstructionOpcode.OR: alu_binop(ALUOperation.OR),
+            InstructionOpcode.XOR: alu_binop(ALUOperation.XOR),
+            InstructionOpcode.NOT: alu_unop(ALUOperation.NOT),
+            InstructionOpcode.SHL: alu_binop(ALUOperation.SHL),
+            InstructionOpcode.SHR: alu_binop(ALUOperation.SHR),
+            InstructionOpcode.CMP: fetch_next + [
                 # ID
-                decode_instruction()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r1_to_alu_a_mem_r2_to_alu_b()
-                self.tick()
-
-                do_alu_op(ALUOperation.SUB)
-                self.tick()
-
-            case InstructionOpcode.SETEQ.bincode:
-                set_instr_signals(6)
-
-            case InstructionOpcode.SETNE.bincode:
-                set_instr_signals(7)
-
-            case InstructionOpcode.SETGE.bincode:
-                set_instr_signals(8)
-
-            case InstructionOpcode.SETLE.bincode:
-                set_instr_signals(9)
-
-            case InstructionOpcode.SETSG.bincode:
-                set_instr_signals(10)
-
-            case InstructionOpcode.SETSL.bincode:
-                set_instr_signals(11)
-
-            case InstructionOpcode.JAL.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
-                pc_plus_4_to_pc()
-                self.tick()
-
+                (self._mem_r1_to_alu_a_mem_r2_to_alu_b,),
+                (partial(alu_op, ALUOperation.SUB),),
+            ],
+            InstructionOpcode.SETEQ: set_flag(6),
+            InstructionOpcode.SETNE: set_flag(7),
+            InstructionOpcode.SETGE: set_flag(8),
+            InstructionOpcode.SETLE: set_flag(9),
+            InstructionOpcode.SETSG: set_flag(10),
+            InstructionOpcode.SETSL: set_flag(11),
+            InstructionOpcode.JAL: fetch_next + [
                 # ID
-                decode_instruction()
-                imm_to_ar()
-                self.tick()
-
+                (self._decode_instruction, self._imm_to_ar),
                 # EX
-                ar_to_jpc()
-                mem_r1_to_alu_b()
-                self.tick()
-
-                do_alu_op_and_store_to_br(ALUOperation.FETCH_B)
-                self.tick()
-
+                (self._ar_to_jpc, self._mem_r1_to_alu_b),
+                (partial(alu_op_to_br, ALUOperation.FETCH_B),),
                 # WB
-                br_to_mem_r1()
-                self.tick()
-
-            case InstructionOpcode.JR.bincode:
-                # IF
-                pc_to_ipc_and_check_int()
-                self.tick()
-
-                if interrupted:
-                    return
-
+                (self._br_to_mem_r1,),
+            ],
+            InstructionOpcode.JR: [
+                fetch,
                 # ID
-                decode_instruction()
-                self.tick()
-
+                (self._decode_instruction,),
                 # EX
-                mem_r1_to_ar()
-                ar_to_jpc()
-                jpc_to_pc()
-                self.tick()
-
-            case InstructionOpcode.JO.bincode:
-                jump_flag_condition([0, 1])
-
-            case InstructionOpcode.JZ.bincode:
-                jump_flag_condition([1])
-
-            case InstructionOpcode.JNZ.bincode:
-                jump_flag_condition([0])
-
-            case InstructionOpcode.RETI.bincode:
-                self.tick()
-
+                (self._mem_r1_to_ar, self._ar_to_jpc, self._jpc_to_pc),
+            ],
+            InstructionOpcode.JO: jump_flag_condition([0, 1]),
+            InstructionOpcode.JZ: jump_flag_condition([1]),
+            InstructionOpcode.JNZ: jump_flag_condition([0]),
+            InstructionOpcode.RETI: [
+                (),
                 # ID
-                ipc_to_pc()
-                set_ie_1()
-                self.tick()
-
-            case InstructionOpcode.HALT.bincode:
-                self.tick()
-                raise MachineStop()
+                (self._ipc_to_pc, self._set_ie_1),
+            ],
+            InstructionOpcode.HALT: [
+                (),
+                (self._halt,),
+            ],
+        }
 
-            case _:
-                raise NotImplementedError(f"unexpected opcode {opcode}")
+        table: List[Optional[List[_Microstep]]] = [None] * OPCODES_COUNT
+        for instruction, microprogram in microprograms.items():
+            table[instruction.opcode] = microprogram
+
+        return table
+
+    # Microsteps signals
+
+    def _pc_to_ipc_and_check_int(self) -> None:
+        """IPC <- PC"""
+        self.interrupt_handler.signal_latch_ipc()
+        self._microprogram_finished = self.interrupt_handler.signal_check_int()
+
+    def _ipc_to_pc(self) -> None:
+        """PC <- IPC"""
+        self.interrupt_handler.signal_sel_out(0)
+        self.signal_sel_pc(1)
+        self.signal_latch_pc()
+
+    def _set_ie_1(self) -> None:
+        """IE = 1"""
+        self.interrupt_handler.signal_set_ie(1)
+
+    def _halt(self) -> None:
+        raise MachineStop()
+
+    def _pc_plus_4_to_pc(self) -> None:
+        """PC <- PC + 4"""
+        self.signal_sel_pc(2)
+        self.signal_latch_pc()
+
+    def _skip_jump_unless_z_in(self, z_can_be: List[int]) -> None:
+        """PC <- PC + 4 (if the jump condition is false)"""
+        if self.instruction_decoder.flags["Z"].get_value() not in z_can_be:
+            self._pc_plus_4_to_pc()
+            self._microprogram_finished = True
+
+    def _decode_instruction(self) -> None:
+        """imm, R1, R2, R3 <- IR"""
+        self.instruction_decoder.signal_decode_instr()
+
+    def _imm_to_alu_b(self) -> None:
+        """ALU_B <- IR[12:31] or ALU_B <- IR[7:11]"""
+        self.instruction_decoder.signal_sel_out(0)
+        self.signal_sel_dp(1)
+        self.datapath.signal_sel_alu_b(1)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _imm_to_ar(self) -> None:
+        """AR <- IR[12:31]"""
+        self.instruction_decoder.signal_sel_out(0)
+        self.signal_sel_dp(1)
+        self.datapath.signal_sel_ar(2)
+        self.datapath.signal_latch_ar()
+
+    def _do_alu_op(self, operation: ALUOperation) -> None:
+        """NZVC, ALU_Out <- any alu operation"""
+        self.datapath.alu.signal_alu_op(operation)
+
+    def _do_alu_op_and_store_to_br(self, operation: ALUOperation) -> None:
+        """BR <- any alu operation"""
+        self._do_alu_op(operation)
+        self.datapath.signal_sel_br(1)
+        self.datapath.signal_latch_br()
+
+    def _mem_r1_to_alu_a(self) -> None:
+        """ALU_A <- [R1]"""
+        self.instruction_decoder.signal_sel_out(1)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
+        self.datapath.signal_sel_alu_a(0)
+        self.datapath.alu.signal_latch_alu_a()
+
+    def _mem_r1_to_alu_b(self) -> None:
+        """ALU_B <- [R1]"""
+        self.instruction_decoder.signal_sel_out(1)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
+        self.datapath.signal_sel_alu_b(0)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _mem_r1_to_alu_a_mem_r2_to_alu_b(self) -> None:
+        """ALU_A <- [R1], ALU_B <- [R2]"""
+        self.instruction_decoder.signal_sel_out(4)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
+        self.datapath.signal_sel_alu_a(0)
+        self.datapath.alu.signal_latch_alu_a()
+        self.datapath.signal_sel_alu_b(0)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _mem_r2_to_alu_b(self) -> None:
+        """ALU_B <- [R2]"""
+        self.instruction_decoder.signal_sel_out(2)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
+        self.datapath.signal_sel_alu_b(0)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _br_to_alu_b(self) -> None:
+        """ALU_B <- BR"""
+        self.datapath.signal_sel_alu_b(2)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _br_to_mem_r1(self) -> None:
+        """[R1] <- BR"""
+        self.instruction_decoder.signal_sel_out(1)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_write_reg()
+
+    def _br_to_mem_ar(self) -> None:
+        """[AR] <- BR"""
+        self.datapath.signal_write()
+
+    def _mem_ar_to_br(self) -> None:
+        """BR <- [AR]"""
+        self.datapath.signal_read()
+        self.datapath.signal_sel_br(2)
+        self.datapath.signal_latch_br()
+
+    def _swap_br_mem_ar(self) -> None:
+        """BR <- [AR], [AR] <- BR"""
+        self.datapath.signal_swap()
+        self.datapath.signal_sel_br(2)
+        self.datapath.signal_latch_br()
+
+    def _mem_r1_to_br(self) -> None:
+        """BR <- [R1]"""
+        self.instruction_decoder.signal_sel_out(1)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
+        self.datapath.signal_sel_br(0)
+        self.datapath.signal_latch_br()
+
+    def _mem_r1_to_ar(self) -> None:
+        """AR <- [R1]"""
+        self.instruction_decoder.signal_sel_out(1)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
+        self.datapath.signal_sel_ar(1)
+        self.datapath.signal_latch_ar()
+
+    def _mem_r2_to_ar(self) -> None:
+        """AR <- [R2]"""
+        self.instruction_decoder.signal_sel_out(2)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.RIGHT)
+        self.datapath.signal_sel_ar(1)
+        self.datapath.signal_latch_ar()
+
+    def _mem_r1_to_br_mem_r2_to_ar(self) -> None:
+        """AR <- [R2], BR <- [R1]"""
+        self.instruction_decoder.signal_sel_out(4)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
+        self.datapath.signal_sel_br(0)
+        self.datapath.signal_latch_br()
+        self.datapath.signal_sel_ar(1)
+        self.datapath.signal_latch_ar()
+
+    def _mem_r2_to_alu_a_mem_r3_to_alu_b(self) -> None:
+        """ALU_A <- [R2], ALU_B <- [R3]"""
+        self.instruction_decoder.signal_sel_out(5)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
+        self.datapath.signal_sel_alu_a(0)
+        self.datapath.alu.signal_latch_alu_a()
+        self.datapath.signal_sel_alu_b(0)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _mem_r2_to_alu_a(self) -> None:
+        """ALU_A <- [R2]"""
+        self.instruction_decoder.signal_sel_out(2)
+        self.signal_sel_dp(1)
+        self.datapath.register_file.signal_read_reg(RegisterFileFetch.LEFT)
+        self.datapath.signal_sel_alu_a(0)
+        self.datapath.alu.signal_latch_alu_a()
+
+    def _flags_cmp_to_alu_b(self, out_index: int) -> None:
+        """ALU_B <- any flags comparison in instruction decoder"""
+        self.instruction_decoder.signal_sel_out(out_index)
+        self.signal_sel_dp(1)
+        self.datapath.signal_sel_alu_b(1)
+        self.datapath.alu.signal_latch_alu_b()
+
+    def _ar_to_jpc(self) -> None:
+        """JPC <- AR"""
+        self.datapath.signal_sel_cu(0)
+        self.signal_sel_jpc(0)
+        self.signal_latch_jpc()
+
+    def _jpc_to_pc(self) -> None:
+        """PC <- JPC"""
+        self.signal_sel_pc(0)
+        self.signal_latch_pc()
+
+    def _pc_to_alu_a(self) -> None:
+        """ALU_A <- PC"""
+        self.signal_sel_dp(0)
+        self.datapath.signal_sel_alu_a(1)
+        self.datapath.alu.signal_latch_alu_a()
+
+    def _br_to_jpc(self) -> None:
+        """JPC <- BR"""
+        self.datapath.signal_sel_cu(1)
+        self.signal_sel_jpc(0)
+        self.signal_latch_jpc()
 
     def signal_read_instr(self) -> None:
         self.instruction_decoder.signal_latch_ir(self.datapath.memory.read(self.pc.get_value()))
@@ -977,53 +794,61 @@ class ControlUnit:
         self.mux_dp.set_input_value(0, value)
         self.mux_pc.set_input_value(2, value + 4)
 
+    @property
+    def input_tokens(self) -> Dict[int, str]:
+        """Input tokens which are not delivered yet (see `InputPort`)"""
+        return self.input_port.tokens
+
+    @input_tokens.setter
+    def input_tokens(self, tokens: Dict[int, str]) -> None:
+        self.input_port.set_tokens(tokens)
+
     def tick(self) -> None:
         self._tick += 1
 
-        if self._tick in self.input_tokens.keys():
-            self.datapath.memory.write(INPUT_ADDR, ord(self.input_tokens[self._tick]))
-            self.interrupt_handler.signal_add_irq(Interrupts.INPUT_DATA)
+        if self._tick >= self.events.next_tick:
+            self.events.run_due(self._tick)
+
+        if self.trace is not None:
+            self.trace.record()
+
+        if self.ticks_limit is not None and self._tick >= self.ticks_limit:
+            raise MachineLimitException("tick's limit reached")
+
+    def trace_probes(self) -> Dict[str, Callable[[], int]]:
+        """Getters of every value which can be recorded to the tick trace"""
+        decoder_flags = self.instruction_decoder.flags
+        alu_flags = self.datapath.alu.flags
 
-        tick_log = {
-            "TICK": self._tick,
+        probes = {
+            "TICK": lambda: self._tick,
 
-            "PC": self.pc.get_value(),
-            "JPC": self.jpc.get_value(),
+            "PC": self.pc.get_value,
+            "JPC": self.jpc.get_value,
 
-            "IR": self.instruction_decoder.ir.get_value(),
-            "OPCODE": self.instruction_decoder.opcode.get_value(),
-            "R1": self.instruction_decoder.r1.get_value(),
-            "R2": self.instruction_decoder.r2.get_value(),
-            "R3": self.instruction_decoder.r3.get_value(),
-            "IMM": self.instruction_decoder.imm.get_value(),
-            "ID_NZVC": int("".join(str(self.instruction_decoder.flags[flag].get_value()) for flag in "NZVC"), 2),
+            "IR": self.instruction_decoder.ir.get_value,
+            "OPCODE": self.instruction_decoder.opcode.get_value,
+            "R1": self.instruction_decoder.r1.get_value,
+            "R2": self.instruction_decoder.r2.get_value,
+            "R3": self.instruction_decoder.r3.get_value,
+            "IMM": self.instruction_decoder.imm.get_value,
+            "ID_NZVC": lambda: int("".join(str(decoder_flags[flag].get_value()) for flag in "NZVC"), 2),
 
-            "IPC": self.interrupt_handler.ipc.get_value(),
-            "IRQ": self.interrupt_handler.irq.get_value(),
-            "IE": self.interrupt_handler.ie.get_value(),
+            "IPC": self.interrupt_handler.ipc.get_value,
+            "IRQ": self.interrupt_handler.irq.get_value,
+            "IE": self.interrupt_handler.ie.get_value,
 
-            "AR": self.datapath.ar.get_value(),
-            "BR": self.datapath.br.get_value(),
+            "AR": self.datapath.ar.get_value,
+            "BR": self.datapath.br.get_value,
 
-            "ALU_A": self.datapath.alu.a.get_value(),
-            "ALU_B": self.datapath.alu.b.get_value(),
-            "ALU_NZVC": int("".join(str(self.datapath.alu.flags[flag].get_value()) for flag in "NZVC"), 2),
+            "ALU_A": self.datapath.alu.a.get_value,
+            "ALU_B": self.datapath.alu.b.get_value,
+            "ALU_NZVC": lambda: int("".join(str(alu_flags[flag].get_value()) for flag in "NZVC"), 2),
         }
 
-        tick_log.update({
-            register.name: self.datapath.register_file.registers[register.value].get_value()
-            for register in [
-                RegisterCode.SP, RegisterCode.RA, RegisterCode.S1, RegisterCode.S2, RegisterCode.S3,
-                RegisterCode.S4, RegisterCode.S5, RegisterCode.S6, RegisterCode.S7, RegisterCode.S8,
-                RegisterCode.S9, RegisterCode.S10, RegisterCode.S11, RegisterCode.S12, RegisterCode.I1,
-                RegisterCode.I2, RegisterCode.T1, RegisterCode.T2, RegisterCode.T3, RegisterCode.T4,
-                RegisterCode.T5, RegisterCode.T6, RegisterCode.T7, RegisterCode.T8, RegisterCode.A1,
-                RegisterCode.A2, RegisterCode.A3, RegisterCode.A4, RegisterCode.A5, RegisterCode.A6,
-                RegisterCode.A7, RegisterCode.A8,
-            ]
+        probes.update({
+            register.name: self.datapath.register_file.registers[register.code].get_value
+            for register in RegisterCode
         })
 
-        self.simulation_log.append({"tick_state": tick_log})
-
-        if self.ticks_limit is not None and self._tick >= self.ticks_limit:
-            raise MachineLimitException("tick's limit reached")
+        return probes
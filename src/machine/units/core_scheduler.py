@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, List, Optional
+
+from .common.exceptions import MachineStop
+
+if TYPE_CHECKING:
+    from .control_unit import ControlUnit
+
+
+class CoreScheduler:
+    """
+    Deterministic round-robin scheduler of cores sharing the Memory Unit
+
+    Every tick each core runs a single tick (see `ControlUnit.process_tick`)
+    in the order of `control_units`, so memory accesses made at the same tick
+    are ordered by the core index and every run is the same. Cores keep
+    their clocks in step: a halted core ticks without signals (its events
+    still run), the machine stops when every core is halted.
+
+    The first core owns the I/O ports (see `Datapath`), its tick is the
+    machine tick.
+    """
+
+    def __init__(self, control_units: List[ControlUnit]):
+        self.control_units: List[ControlUnit] = control_units
+        self.halted: List[bool] = [False] * len(control_units)
+
+    def run(self, stop_tick: Optional[int] = None) -> None:
+        """
+        Run until `stop_tick`, raises `MachineStop` when every core is halted
+
+        The ticks limit of the cores is checked as usual (the first core
+        reaches it first).
+        """
+        cores = list(enumerate(self.control_units))
+        halted = self.halted
+        primary = self.control_units[0]
+        stop = math.inf if stop_tick is None else stop_tick
+
+        while primary._tick < stop:
+            for index, control_unit in cores:
+                if halted[index]:
+                    control_unit.tick()
+                    continue
+
+                try:
+                    control_unit.process_tick()
+                except MachineStop:
+                    halted[index] = True
+                    control_unit.tick()
+
+            if all(halted):
+                raise MachineStop()
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Iterator, List, Optional
 
 from isa.constants import REG_ID_SIZE, WORD_SIZE
-from isa.registers import RegisterCode
 
-from .common.components import DataLatch, DataSelector
+from ..constants import START_ADDR
+from .common.components import (
+    Component,
+    DataLatch,
+    DataSelector,
+    set_strict_checks,
+)
 from .common.enums import ALUOperation, Interrupts, RegisterFileFetch
 from .control_unit import ControlUnit
 from .memory import Memory
+from .memory_cache import MemoryCache
+from .output_port import OutputPort
 
 
 class _ArithmeticLogicUnit:
@@ -168,46 +175,14 @@ class _RegisterFile:
     def __init__(self, datapath: Datapath):
         self.datapath: Datapath = datapath
 
-        self.registers: Dict[str, DataLatch] = {
-            RegisterCode.SP.value: DataLatch(),
-            RegisterCode.RA.value: DataLatch(),
-            RegisterCode.S1.value: DataLatch(),
-            RegisterCode.S2.value: DataLatch(),
-            RegisterCode.S3.value: DataLatch(),
-            RegisterCode.S4.value: DataLatch(),
-            RegisterCode.S5.value: DataLatch(),
-            RegisterCode.S6.value: DataLatch(),
-            RegisterCode.S7.value: DataLatch(),
-            RegisterCode.S8.value: DataLatch(),
-            RegisterCode.S9.value: DataLatch(),
-            RegisterCode.S10.value: DataLatch(),
-            RegisterCode.S11.value: DataLatch(),
-            RegisterCode.S12.value: DataLatch(),
-            RegisterCode.I1.value: DataLatch(),
-            RegisterCode.I2.value: DataLatch(),
-            RegisterCode.T1.value: DataLatch(),
-            RegisterCode.T2.value: DataLatch(),
-            RegisterCode.T3.value: DataLatch(),
-            RegisterCode.T4.value: DataLatch(),
-            RegisterCode.T5.value: DataLatch(),
-            RegisterCode.T6.value: DataLatch(),
-            RegisterCode.T7.value: DataLatch(),
-            RegisterCode.T8.value: DataLatch(),
-            RegisterCode.A1.value: DataLatch(),
-            RegisterCode.A2.value: DataLatch(),
-            RegisterCode.A3.value: DataLatch(),
-            RegisterCode.A4.value: DataLatch(),
-            RegisterCode.A5.value: DataLatch(),
-            RegisterCode.A6.value: DataLatch(),
-            RegisterCode.A7.value: DataLatch(),
-            RegisterCode.A8.value: DataLatch(),
-        }
+        self.registers: List[DataLatch] = [DataLatch() for _ in range(2 ** REG_ID_SIZE)]
+        """Registers indexed by their number (see `isa.registers.RegisterCode`)"""
 
     def signal_read_reg(self, req: RegisterFileFetch) -> None:
         registers = self.datapath.control_unit.mux_dp.get_selected_value()
 
-        first_reg = bin(registers & self._REGISTER_MASK)[2:].zfill(REG_ID_SIZE)
-        second_reg = bin((registers >> REG_ID_SIZE) & self._REGISTER_MASK)[2:].zfill(REG_ID_SIZE)
+        first_reg = registers & self._REGISTER_MASK
+        second_reg = (registers >> REG_ID_SIZE) & self._REGISTER_MASK
 
         match req:
             case RegisterFileFetch.BOTH:
@@ -220,24 +195,34 @@ class _RegisterFile:
             case RegisterFileFetch.RIGHT:
                 self._read_right(first_reg)
 
-    def _read_left(self, reg_code: str) -> None:
-        value = self.registers[reg_code].get_value()
+    def _read_left(self, reg_id: int) -> None:
+        value = self.registers[reg_id].get_value()
         self.datapath.mux_alu_a.set_input_value(0, value)
         self.datapath.mux_br.set_input_value(0, value)
 
-    def _read_right(self, reg_code: str) -> None:
-        value = self.registers[reg_code].get_value()
+    def _read_right(self, reg_id: int) -> None:
+        value = self.registers[reg_id].get_value()
         self.datapath.mux_alu_b.set_input_value(0, value)
         self.datapath.mux_ar.set_input_value(1, value)
 
     def signal_write_reg(self) -> None:
         register = self.datapath.control_unit.mux_dp.get_selected_value()
-        reg_code = bin(register & self._REGISTER_MASK)[2:].zfill(REG_ID_SIZE)
-        self.registers[reg_code].latch_value(self.datapath.br.get_value())
+        self.registers[register & self._REGISTER_MASK].latch_value(self.datapath.br.get_value())
 
 
 class Datapath:
-    def __init__(self, memory_unit: Memory):
+    def __init__(
+        self,
+        memory_unit: Memory,
+        cache: Optional[MemoryCache] = None,
+        start_addr: int = START_ADDR,
+        output_port: Optional[OutputPort] = None,
+    ):
+        """
+        Several datapaths can share the Memory Unit (see `machine.units.core_scheduler`),
+        the first one attaches the I/O ports and the others get its `output_port`
+        (their input ports aren't attached, so they never get input tokens).
+        """
         self.memory: Memory = memory_unit
         """
         Memory Unit
@@ -251,7 +236,22 @@ class Datapath:
             - AR Multiplexer
         """
 
-        self.control_unit: ControlUnit = ControlUnit(self)
+        self.cache: Optional[MemoryCache] = cache
+        """
+        Memory Cache (timing model, optional)
+
+        Accounts instruction fetches, data reads and writes, and stalls the
+        Control Unit by their latency.
+        """
+
+        self.output_port: OutputPort = output_port or OutputPort()
+        """
+        Output Port (a Memory Unit device)
+
+        Captures words written to the output address.
+        """
+
+        self.control_unit: ControlUnit = ControlUnit(self, start_addr)
         """
         Control Unit (input - Buffer Register)
 
@@ -262,6 +262,10 @@ class Datapath:
             - AR Multiplexer
         """
 
+        if output_port is None:
+            memory_unit.devices.attach(self.output_port, self.output_port.addr)
+            memory_unit.devices.attach(self.control_unit.input_port, self.control_unit.input_port.addr)
+
         self.mux_ar: DataSelector = DataSelector(3)
         """
         AR Multiplexer (3 inputs):
@@ -358,12 +362,38 @@ class Datapath:
             - CU Multiplexer
         """
 
+    def components(self) -> Iterator[Component]:
+        """Every latch and selector of the datapath and its control unit"""
+        control_unit = self.control_unit
+        units = [
+            self, self.alu, self.register_file,
+            control_unit, control_unit.instruction_decoder, control_unit.interrupt_handler,
+        ]
+
+        for unit in units:
+            for value in vars(unit).values():
+                if isinstance(value, dict):
+                    value = list(value.values())
+                for component in value if isinstance(value, list) else [value]:
+                    if isinstance(component, (DataLatch, DataSelector)):
+                        yield component
+
+    def set_strict_checks(self, enabled: bool) -> None:
+        """Enable or disable the checks of this machine's components only (see `components`)"""
+        set_strict_checks(self.components(), enabled)
+
     def signal_read(self) -> None:
         addr = self.ar.get_value()
+        if self.cache is not None:
+            self.control_unit.stall_ticks += self.cache.access(addr)
+
         value = self.memory.read(addr)
         self.mux_br.set_input_value(2, value)
         self.mux_ar.set_input_value(0, value)
 
+        if not self.control_unit.signal_log_enabled:
+            return
+
         self.control_unit.simulation_log.append({
             "signal": {
                 "type": "mem_read",
@@ -375,11 +405,46 @@ class Datapath:
         })
 
     def signal_write(self) -> None:
+        if self.cache is not None:
+            self.control_unit.stall_ticks += self.cache.access(self.ar.get_value(), write=True)
+
         self.memory.write(
             addr := self.ar.get_value(),
             value := self.br.get_value(),
         )
 
+        if not self.control_unit.signal_log_enabled:
+            return
+
+        self.control_unit.simulation_log.append({
+            "signal": {
+                "type": "mem_write",
+                "data": {
+                    "addr": addr,
+                    "value": value,
+                },
+            },
+        })
+
+    def signal_swap(self) -> None:
+        """
+        Exchange BR and the word at AR in a single memory cycle
+
+        Other cores (see `machine.units.core_scheduler`) can't access the
+        word between the read and the write, so the swap is atomic.
+        """
+        addr = self.ar.get_value()
+        if self.cache is not None:
+            self.control_unit.stall_ticks += self.cache.access(addr, write=True)
+
+        old_value = self.memory.read(addr)
+        self.memory.write(addr, value := self.br.get_value())
+        self.mux_br.set_input_value(2, old_value)
+        self.mux_ar.set_input_value(0, old_value)
+
+        if not self.control_unit.signal_log_enabled:
+            return
+
         self.control_unit.simulation_log.append({
             "signal": {
                 "type": "mem_write",
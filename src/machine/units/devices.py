@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from isa.constants import WORD_SIZE
+
+if TYPE_CHECKING:
+    from .memory import Memory
+
+DEVICE_PAGE_BITS = 12
+"""Addresses are dispatched by pages of 2 ** DEVICE_PAGE_BITS bytes"""
+
+_WORD_BYTES = WORD_SIZE // 8
+
+
+class Device:
+    """
+    Memory-mapped device
+
+    Word reads and writes at the addresses claimed by the device (see
+    `DeviceRegistry.attach`) are handled by the device. By default the
+    words are kept in RAM, like ordinary memory words, so they are included
+    in memory dumps and checkpoints.
+    """
+
+    volatile: bool = True
+    """
+    Reads may change the device or give a new value without a scheduled
+    event, so idle loops reading the device aren't fast-forwarded (see
+    `InstructionEngine`). Memory counts such reads in `volatile_reads`.
+    """
+
+    def read(self, memory: Memory, addr: int) -> int:
+        return memory.read_ram(addr)
+
+    def write(self, memory: Memory, addr: int, value: int) -> None:
+        memory.write_ram(addr, value)
+
+
+class DeviceRegistry:
+    """
+    Address ranges claimed by devices
+
+    `pages` has an entry for every 4 KB page of the memory: None for pages
+    without devices (so RAM accesses take a single lookup) or the devices
+    of the page by their word address, so the words of a device-backed page
+    not claimed by a device are still RAM. Pages are coarse to keep the list
+    short for large memory images. Only aligned word accesses are dispatched
+    to devices, unaligned ones access RAM.
+    """
+
+    def __init__(self, memory_size: int):
+        self.memory_size: int = memory_size
+        self.pages: List[Optional[Dict[int, Device]]] = [None] * ((memory_size >> DEVICE_PAGE_BITS) + 1)
+        self.devices: List[Device] = []
+
+    def attach(self, device: Device, addr: int, size: int = _WORD_BYTES) -> None:
+        """Claim `size` bytes at `addr` (word-aligned) for the device"""
+        if addr % _WORD_BYTES != 0 or size <= 0 or size % _WORD_BYTES != 0:
+            raise ValueError(f"device range must be word-aligned (got {size} bytes at {addr:#x})")
+        if addr < 0 or addr + size > self.memory_size:
+            raise ValueError(f"device range {addr:#x}-{addr + size - 1:#x} is out of memory")
+
+        for word_addr in range(addr, addr + size, _WORD_BYTES):
+            if (other := self.find(word_addr)) is not None:
+                raise ValueError(f"address {word_addr:#x} is claimed by {type(other).__name__} already")
+
+        for word_addr in range(addr, addr + size, _WORD_BYTES):
+            page_index = word_addr >> DEVICE_PAGE_BITS
+            if self.pages[page_index] is None:
+                self.pages[page_index] = {}
+            self.pages[page_index][word_addr] = device
+
+        if device not in self.devices:
+            self.devices.append(device)
+
+    def find(self, addr: int) -> Optional[Device]:
+        """The device which claimed the word at `addr` (aligned), if any"""
+        if not 0 <= addr < self.memory_size or (page := self.pages[addr >> DEVICE_PAGE_BITS]) is None:
+            return None
+
+        return page.get(addr)
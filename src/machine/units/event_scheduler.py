@@ -0,0 +1,67 @@
+import heapq
+import itertools
+import math
+from typing import Callable, List, Optional, Union
+
+NO_EVENTS = math.inf
+"""`EventScheduler.next_tick` when nothing is scheduled"""
+
+
+class ScheduledEvent:
+    __slots__ = ("tick", "sequence", "callback")
+
+    def __init__(self, tick: int, sequence: int, callback: Callable[[int], None]):
+        self.tick: int = tick
+        self.sequence: int = sequence
+        self.callback: Optional[Callable[[int], None]] = callback
+        """None when the event is cancelled"""
+
+    def __lt__(self, other: "ScheduledEvent") -> bool:
+        return (self.tick, self.sequence) < (other.tick, other.sequence)
+
+
+class EventScheduler:
+    """
+    Timed device events
+
+    Devices schedule callbacks at ticks, the callback gets the tick it runs
+    at. Events of the same tick run in the order they were scheduled. The
+    control unit compares its tick with `next_tick` only, so the scheduler
+    costs nothing on ticks without events, and engines may run freely up to
+    `next_tick`.
+    """
+
+    def __init__(self):
+        self._events: List[ScheduledEvent] = []
+        self._sequence = itertools.count()
+
+        self.next_tick: Union[int, float] = NO_EVENTS
+        """The tick of the earliest pending event (`NO_EVENTS` if there are none)"""
+
+    def schedule(self, tick: int, callback: Callable[[int], None]) -> ScheduledEvent:
+        event = ScheduledEvent(tick, next(self._sequence), callback)
+        heapq.heappush(self._events, event)
+
+        if tick < self.next_tick:
+            self.next_tick = tick
+
+        return event
+
+    def cancel(self, event: ScheduledEvent) -> None:
+        event.callback = None
+        self._update_next_tick()
+
+    def run_due(self, tick: int) -> None:
+        """Run every event scheduled at `tick` or before (events may schedule new ones)"""
+        while self._events and self._events[0].tick <= tick:
+            event = heapq.heappop(self._events)
+            if event.callback is not None:
+                event.callback(tick)
+
+        self._update_next_tick()
+
+    def _update_next_tick(self) -> None:
+        while self._events and self._events[0].callback is None:
+            heapq.heappop(self._events)
+
+        self.next_tick = self._events[0].tick if self._events else NO_EVENTS
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import bisect
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from ..constants import INPUT_ADDR
+from .common.enums import Interrupts
+from .devices import Device
+from .event_scheduler import ScheduledEvent
+
+if TYPE_CHECKING:
+    from .control_unit import ControlUnit
+
+
+class InputPort(Device):
+    """
+    Input port (memory-mapped)
+
+    Delivers input tokens through the event scheduler of the control unit: at
+    the tick of a token its character code is written to the port address
+    and the input interrupt is requested. Only the next token is scheduled at
+    a time, tokens at the current tick or before it are never delivered.
+    """
+
+    volatile = False
+    """The port word changes only by scheduled events, reads are plain RAM reads"""
+
+    def __init__(self, control_unit: ControlUnit, addr: int = INPUT_ADDR):
+        self.control_unit: ControlUnit = control_unit
+        self.addr: int = addr
+
+        self._tokens: Dict[int, str] = {}
+        self._ticks: List[int] = []
+        self._index: int = 0
+        self._event: Optional[ScheduledEvent] = None
+
+    @property
+    def tokens(self) -> Dict[int, str]:
+        """Tokens which are not delivered yet, keyed by their tick"""
+        return {tick: self._tokens[tick] for tick in self._ticks[self._index:]}
+
+    def set_tokens(self, tokens: Dict[int, str]) -> None:
+        """Replace the pending tokens"""
+        if self._event is not None:
+            self.control_unit.events.cancel(self._event)
+
+        self._tokens = dict(tokens)
+        self._ticks = sorted(tick for tick in tokens.keys() if tick > self.control_unit._tick)
+        self._index = 0
+        self._schedule_next()
+
+    def add_token(self, tick: int, token: str) -> None:
+        """Add a pending token, `tick` must be after the current tick and free"""
+        if tick <= self.control_unit._tick:
+            raise ValueError(f"token tick {tick} isn't after the current tick {self.control_unit._tick}")
+        if tick in self._ticks[self._index:]:
+            raise ValueError(f"there is a pending token at tick {tick} already")
+
+        self._tokens[tick] = token
+        bisect.insort(self._ticks, tick, lo=self._index)
+
+        if self._event is None or tick < self._event.tick:
+            if self._event is not None:
+                self.control_unit.events.cancel(self._event)
+            self._schedule_next()
+
+    def _schedule_next(self) -> None:
+        if self._index < len(self._ticks):
+            self._event = self.control_unit.events.schedule(self._ticks[self._index], self._deliver)
+        else:
+            self._event = None
+
+    def _deliver(self, tick: int) -> None:
+        token = self._tokens[self._ticks[self._index]]
+        self._index += 1
+
+        self.control_unit.datapath.memory.write_ram(self.addr, ord(token))
+        self.control_unit.interrupt_handler.signal_add_irq(Interrupts.INPUT_DATA)
+
+        self._schedule_next()
@@ -0,0 +1,124 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from isa.constants import INSTR_OPCODE_SIZE, REG_ID_SIZE, WORD_SIZE
+from isa.instructions import ADDRESSING_MODE_BY_OPCODE, AddressingMode
+
+from .common.helpers import convert_to_signed
+
+_OPCODE_MASK = int("1" * INSTR_OPCODE_SIZE, 2)
+_REGISTER_MASK = int("1" * REG_ID_SIZE, 2)
+
+
+class DecodedInstruction(NamedTuple):
+    """
+    Instruction word split into fields
+
+    Fields which aren't encoded by the instruction format are None
+    (the decoder keeps previous values of the corresponding latches).
+    """
+
+    word: int
+    opcode: int
+    r1: Optional[int] = None
+    r2: Optional[int] = None
+    r3: Optional[int] = None
+    imm: Optional[int] = None
+
+
+def _decode_r1_imm(word: int, opcode: int) -> DecodedInstruction:
+    imm_value = word >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)
+    imm_value_size = WORD_SIZE - INSTR_OPCODE_SIZE - REG_ID_SIZE
+    return DecodedInstruction(
+        word, opcode,
+        r1=(word >> INSTR_OPCODE_SIZE) & _REGISTER_MASK,
+        imm=convert_to_signed(imm_value, imm_value_size),
+    )
+
+
+def _decode_imm(word: int, opcode: int) -> DecodedInstruction:
+    imm_value = word >> INSTR_OPCODE_SIZE
+    imm_value_size = WORD_SIZE - INSTR_OPCODE_SIZE
+    return DecodedInstruction(word, opcode, imm=convert_to_signed(imm_value, imm_value_size))
+
+
+def _decode_no_operands(word: int, opcode: int) -> DecodedInstruction:
+    return DecodedInstruction(word, opcode)
+
+
+def _decode_r1(word: int, opcode: int) -> DecodedInstruction:
+    return DecodedInstruction(word, opcode, r1=(word >> INSTR_OPCODE_SIZE) & _REGISTER_MASK)
+
+
+def _decode_r1_r2(word: int, opcode: int) -> DecodedInstruction:
+    return DecodedInstruction(
+        word, opcode,
+        r1=(word >> INSTR_OPCODE_SIZE) & _REGISTER_MASK,
+        r2=(word >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)) & _REGISTER_MASK,
+    )
+
+
+def _decode_r1_r2_r3(word: int, opcode: int) -> DecodedInstruction:
+    return DecodedInstruction(
+        word, opcode,
+        r1=(word >> INSTR_OPCODE_SIZE) & _REGISTER_MASK,
+        r2=(word >> (INSTR_OPCODE_SIZE + REG_ID_SIZE)) & _REGISTER_MASK,
+        r3=(word >> (INSTR_OPCODE_SIZE + REG_ID_SIZE * 2)) & _REGISTER_MASK,
+    )
+
+
+_DECODERS_BY_MODE: Dict[AddressingMode, Callable[[int, int], DecodedInstruction]] = {
+    AddressingMode.ABSOLUTE: _decode_r1_imm,
+    AddressingMode.RELATIVE: _decode_imm,
+    AddressingMode.NO_ADDRESS: _decode_no_operands,
+    AddressingMode.REGISTER_1: _decode_r1,
+    AddressingMode.REGISTER_2: _decode_r1_r2,
+    AddressingMode.REGISTER_3: _decode_r1_r2_r3,
+    AddressingMode.DIRECT_LOAD: _decode_r1_imm,
+}
+
+_DECODERS: List[Optional[Callable[[int, int], DecodedInstruction]]] = [
+    None if mode is None else _DECODERS_BY_MODE[mode] for mode in ADDRESSING_MODE_BY_OPCODE
+]
+"""Instruction format decoders indexed by the integer opcode"""
+
+
+def decode_instruction(word: int) -> DecodedInstruction:
+    opcode = word & _OPCODE_MASK
+    if (decoder := _DECODERS[opcode]) is None:
+        raise NotImplementedError(f"unexpected opcode {bin(opcode)[2:].zfill(INSTR_OPCODE_SIZE)}")
+
+    return decoder(word, opcode)
+
+
+class InstructionCache:
+    """
+    Decoded instructions keyed by their address
+
+    Memory is shared between code and data, so every memory write must
+    invalidate entries overlapping the written word.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, DecodedInstruction] = {}
+
+        self.on_invalidate: Optional[Callable[[Optional[int]], None]] = None
+        """Called with the address of every dropped entry (None when the cache is cleared)"""
+
+    def get(self, addr: int) -> Optional[DecodedInstruction]:
+        return self._entries.get(addr)
+
+    def put(self, addr: int, decoded: DecodedInstruction) -> None:
+        self._entries[addr] = decoded
+
+    def invalidate(self, addr: int, size: int = WORD_SIZE // 8) -> None:
+        if not self._entries:
+            return
+
+        for entry_addr in range(addr - WORD_SIZE // 8 + 1, addr + size):
+            if self._entries.pop(entry_addr, None) is not None and self.on_invalidate is not None:
+                self.on_invalidate(entry_addr)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        if self.on_invalidate is not None:
+            self.on_invalidate(None)
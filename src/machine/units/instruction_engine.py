@@ -0,0 +1,818 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from isa.constants import INSTR_OPCODE_SIZE, REG_ID_SIZE, WORD_SIZE
+from isa.instructions import OPCODES_COUNT, InstructionOpcode
+
+from .common.enums import Interrupts
+from .common.exceptions import MachineLimitException
+from .event_scheduler import NO_EVENTS
+from .instruction_cache import DecodedInstruction
+
+if TYPE_CHECKING:
+    from ..profiler import Profiler
+    from .control_unit import ControlUnit
+
+MAX_INSTRUCTION_TICKS = 7
+"""The longest instruction (LUI) takes 7 ticks in the microcoded path"""
+
+_OPCODE_MASK = int("1" * INSTR_OPCODE_SIZE, 2)
+_LATCH_LIMIT = 2 ** WORD_SIZE
+_SIGNED_MIN = -2 ** (WORD_SIZE - 1)
+_SIGNED_MAX = 2 ** (WORD_SIZE - 1) - 1
+
+# ALU flags update modes (which of NZVC are recalculated by the operation)
+_FLAGS_NZVC = 0
+_FLAGS_NZV = 1
+_FLAGS_NZC_CLEAR_V = 2
+_FLAGS_NZ_CLEAR_V = 3
+
+# Keys of the executed instructions which aren't opcodes (see `InstructionEngine._executed`)
+_SKIPPED_JUMP = OPCODES_COUNT
+_INTERRUPT_ENTRY = OPCODES_COUNT + 1
+
+
+class InstructionEngine:
+    """
+    Instruction-level engine
+
+    Executes a whole instruction per step instead of driving every latch and
+    selector of the datapath. Tick counter is advanced by the same per-opcode
+    tick cost the microcoded `ControlUnit.process_instruction` uses, so input
+    tokens and interrupts are handled at the same ticks.
+
+    When a device event (see `ControlUnit.events`) or the ticks limit falls
+    inside the next instruction, the instruction is executed by the microcoded
+    path to keep the timing exact.
+    Memory cache stalls (see `Datapath.cache`) are added to the instruction cost.
+
+    Idle loops (like the input polling loop) are fast-forwarded: when a
+    backward jump lands on the same address with the same state as on the
+    previous iteration and nothing has written memory or read a volatile
+    device since (see `Device.volatile`), every next iteration is the same,
+    so whole iterations are skipped up to the next event. The machine state
+    is the same as if every iteration was executed.
+
+    Latches and selectors which aren't a part of the engine state (like ALU
+    inputs, decoder fields and the datapath selectors) keep the values of the
+    last instruction which has set them. The last execution of every
+    instruction is recorded, and its signals are repeated when the state is
+    stored, so the datapath is the same as after the microcoded path.
+
+    Only memory writes are added to the signal log, the tick trace is not collected.
+    """
+
+    def __init__(self, control_unit: ControlUnit):
+        self.control_unit: ControlUnit = control_unit
+        self.memory = control_unit.datapath.memory
+        self.simulation_log = control_unit.simulation_log
+        self.cache = control_unit.datapath.cache
+
+        self.tick: int = 0
+        self.pc: int = 0
+        self.jpc: int = 0
+        self.ir: int = 0
+        self.ar: int = 0
+        self.br: int = 0
+        self.alu_out: int = 0
+        self.regs: List[int] = [0] * 2 ** REG_ID_SIZE
+        self.n: int = 0
+        self.z: int = 0
+        self.v: int = 0
+        self.c: int = 0
+        self.ie: int = 1
+        self.irq: int = 0
+        self.ipc: int = 0
+
+        self._next_event_tick: Union[int, float] = NO_EVENTS
+        """The earliest of the next device event (see `ControlUnit.events`) and the ticks limit"""
+        self._synced: bool = False
+        """Latches hold the actual state (the engine state is stale)"""
+
+        self._stall_ticks: int = 0
+        self._lookahead: int = MAX_INSTRUCTION_TICKS
+        """Instructions closer than this to the next event are executed by the microcoded path"""
+        if self.cache is not None:
+            # an instruction fetch and a data access
+            self._lookahead += 2 * self.cache.max_latency
+
+        self.profiler: Optional[Profiler] = None
+
+        self.fast_forward: bool = True
+        """Skip idle loop iterations (disabled while profiling or with the memory cache, their counters change)"""
+        self._idle_pc: int = -1
+        self._idle_tick: int = 0
+        self._idle_state: Optional[Tuple[int, ...]] = None
+        self._idle_volatile_reads: int = 0
+
+        self._executed: Dict[object, Tuple] = {}
+        """
+        The last execution of every instruction since the state was stored: its
+        start tick, decoded instruction and operands (see `_store_executed`)
+        """
+
+        handlers: Dict[int, Callable[[DecodedInstruction], int]] = {
+            InstructionOpcode.LUI.opcode: self._exec_lui,
+            InstructionOpcode.LLI.opcode: self._exec_lli,
+            InstructionOpcode.LW.opcode: self._exec_lw,
+            InstructionOpcode.SW.opcode: self._exec_sw,
+            InstructionOpcode.LWR.opcode: self._exec_lwr,
+            InstructionOpcode.SWR.opcode: self._exec_swr,
+            InstructionOpcode.MV.opcode: self._exec_mv,
+            InstructionOpcode.SWAP.opcode: self._exec_swap,
+            InstructionOpcode.ADDI.opcode: self._exec_addi,
+            InstructionOpcode.ADD.opcode: self._binop(lambda a, b: a + b, _FLAGS_NZVC),
+            InstructionOpcode.SUB.opcode: self._binop(lambda a, b: a - b, _FLAGS_NZVC),
+            InstructionOpcode.MUL.opcode: self._binop(lambda a, b: a * b, _FLAGS_NZVC),
+            InstructionOpcode.DIV.opcode: self._exec_div,
+            InstructionOpcode.REM.opcode: self._binop(lambda a, b: a % b, _FLAGS_NZVC),
+            InstructionOpcode.AND.opcode: self._binop(lambda a, b: a & b, _FLAGS_NZV),
+            InstructionOpcode.OR.opcode: self._binop(lambda a, b: a | b, _FLAGS_NZV),
+            InstructionOpcode.XOR.opcode: self._binop(lambda a, b: a ^ b, _FLAGS_NZV),
+            InstructionOpcode.SHL.opcode: self._binop(lambda a, b: a << b, _FLAGS_NZC_CLEAR_V),
+            InstructionOpcode.SHR.opcode: self._binop(lambda a, b: a >> b, _FLAGS_NZ_CLEAR_V),
+            InstructionOpcode.NEG.opcode: self._unop(lambda a: -a, _FLAGS_NZVC),
+            InstructionOpcode.NOT.opcode: self._unop(lambda a: ~a, _FLAGS_NZV),
+            InstructionOpcode.CMP.opcode: self._exec_cmp,
+            InstructionOpcode.SETEQ.opcode: self._set(lambda n, z, v: z == 1),
+            InstructionOpcode.SETNE.opcode: self._set(lambda n, z, v: z == 0),
+            InstructionOpcode.SETGE.opcode: self._set(lambda n, z, v: n == v),
+            InstructionOpcode.SETLE.opcode: self._set(lambda n, z, v: n != v or z == 1),
+            InstructionOpcode.SETSG.opcode: self._set(lambda n, z, v: n == v and z == 0),
+            InstructionOpcode.SETSL.opcode: self._set(lambda n, z, v: n != v),
+            InstructionOpcode.JAL.opcode: self._exec_jal,
+            InstructionOpcode.JR.opcode: self._exec_jr,
+            InstructionOpcode.JO.opcode: self._jump(lambda z: True),
+            InstructionOpcode.JZ.opcode: self._jump(lambda z: z == 1),
+            InstructionOpcode.JNZ.opcode: self._jump(lambda z: z == 0),
+        }
+
+        self._handlers: List[Optional[Callable[[DecodedInstruction], int]]] = [None] * OPCODES_COUNT
+        for opcode, handler in handlers.items():
+            self._handlers[opcode] = handler
+
+        self._reti_opcode = InstructionOpcode.RETI.opcode
+        self._halt_opcode = InstructionOpcode.HALT.opcode
+
+        signals: Dict[int, Callable[..., None]] = {
+            InstructionOpcode.LUI.opcode: self._signals_lui,
+            InstructionOpcode.LLI.opcode: self._signals_lli,
+            InstructionOpcode.LW.opcode: self._signals_lw,
+            InstructionOpcode.SW.opcode: self._signals_sw,
+            InstructionOpcode.LWR.opcode: self._signals_lwr,
+            InstructionOpcode.SWR.opcode: self._signals_swr,
+            InstructionOpcode.MV.opcode: self._signals_mv,
+            InstructionOpcode.SWAP.opcode: self._signals_swap,
+            InstructionOpcode.ADDI.opcode: self._signals_addi,
+            InstructionOpcode.NEG.opcode: self._signals_unop,
+            InstructionOpcode.NOT.opcode: self._signals_unop,
+            InstructionOpcode.CMP.opcode: self._signals_cmp,
+            InstructionOpcode.JAL.opcode: self._signals_jal,
+            InstructionOpcode.JR.opcode: self._signals_jr,
+            InstructionOpcode.RETI.opcode: self._signals_reti,
+            _SKIPPED_JUMP: self._signals_skipped_jump,
+            _INTERRUPT_ENTRY: self._signals_interrupt_entry,
+        }
+        for instruction in (
+            InstructionOpcode.ADD, InstructionOpcode.SUB, InstructionOpcode.MUL, InstructionOpcode.DIV,
+            InstructionOpcode.REM, InstructionOpcode.AND, InstructionOpcode.OR, InstructionOpcode.XOR,
+            InstructionOpcode.SHL, InstructionOpcode.SHR,
+        ):
+            signals[instruction.opcode] = self._signals_binop
+        for instruction in (
+            InstructionOpcode.SETEQ, InstructionOpcode.SETNE, InstructionOpcode.SETGE,
+            InstructionOpcode.SETLE, InstructionOpcode.SETSG, InstructionOpcode.SETSL,
+        ):
+            signals[instruction.opcode] = self._signals_set
+        for instruction in (InstructionOpcode.JO, InstructionOpcode.JZ, InstructionOpcode.JNZ):
+            signals[instruction.opcode] = self._signals_jump
+
+        self._signals: List[Optional[Callable[..., None]]] = [None] * (_INTERRUPT_ENTRY + 1)
+        for key, signal in signals.items():
+            self._signals[key] = signal
+
+    def run(self, stop_tick: Optional[int] = None) -> None:
+        """
+        Run instructions until `MachineStop` or `MachineLimitException` is raised
+
+        With `stop_tick` set, also returns after the first instruction which
+        ends at this tick or later.
+        """
+        if self.control_unit.microstep_index != 0 or self.control_unit.stall_ticks != 0:
+            self.control_unit.process_instruction()
+
+        stop = math.inf if stop_tick is None else stop_tick
+
+        self._load_state()
+        self._synced = False
+        self._idle_pc = -1
+
+        try:
+            self._run_until(stop)
+        finally:
+            if not self._synced:
+                self._store_state()
+
+    def _run_until(self, stop: Union[int, float]) -> None:
+        profiler = self.profiler
+        fast_forward = self.fast_forward and profiler is None and self.cache is None
+
+        while self.tick < stop:
+            pc, tick = self.pc, self.tick
+
+            if self._next_event_tick - self.tick < self._lookahead:
+                self._process_microcoded()
+            else:
+                self.step()
+
+            if profiler is not None:
+                profiler.record_instruction(pc, self.ir, self.tick - tick)
+
+            if fast_forward and self.pc < pc:
+                self._fast_forward_idle_loop(stop)
+
+    def _fast_forward_idle_loop(self, stop: Union[int, float]) -> None:
+        """Called after every backward jump, the loop iteration is from `_idle_pc` to `_idle_pc`"""
+        # an iteration which has read a volatile device may differ from the next one
+        volatile_reads = self.memory.volatile_reads
+        if self.pc != self._idle_pc or volatile_reads != self._idle_volatile_reads:
+            self._idle_pc = self.pc
+            self._idle_tick = self.tick
+            self._idle_state = None
+            self._idle_volatile_reads = volatile_reads
+            return
+
+        state = (
+            self.jpc, self.ir, self.ar, self.br, self.alu_out,
+            self.n, self.z, self.v, self.c, self.ie, self.irq, self.ipc,
+            *self.regs,
+        )
+
+        if state == self._idle_state:
+            period = self.tick - self._idle_tick
+            until = min(self._next_event_tick, stop)
+            if until != NO_EVENTS:
+                # keep the lookahead, so the event is still handled by the microcoded path
+                iterations = (until - self.tick - self._lookahead) // period
+                if iterations > 0:
+                    self.tick += iterations * period
+
+        self._idle_tick = self.tick
+        self._idle_state = state
+
+    def _process_microcoded(self) -> None:
+        """Run the next instruction by the control unit microcode"""
+        self._idle_pc = -1
+        self._synced = True
+        self._store_state()
+        self.control_unit.process_instruction()
+        self._load_state()
+        self._synced = False
+
+    def step(self) -> None:
+        pc = self.pc
+        decoded = self.memory.fetch(pc)
+        self.ir = decoded.word
+        opcode = decoded.opcode
+
+        if opcode == self._halt_opcode:
+            # the machine stops in the middle of HALT microprogram, so the control unit keeps its position
+            self._process_microcoded()
+            return
+
+        if self.cache is not None:
+            self._stall_ticks += self.cache.access(pc)
+
+        if opcode == self._reti_opcode:
+            self._executed[opcode] = (self.tick, decoded, self.ipc)
+            self.pc = self.ipc
+            self.ie = 1
+            self._advance(2)
+            return
+
+        if self.ie == 1:
+            self.ipc = pc
+
+            if self.irq != 0:
+                self._enter_interrupt()
+                self._advance(1)
+                return
+
+        self._advance(self._handlers[opcode](decoded))
+
+    def _advance(self, ticks: int) -> None:
+        if self._stall_ticks:
+            ticks += self._stall_ticks
+            self._stall_ticks = 0
+
+        self.tick += ticks
+        if self.tick >= self._next_event_tick:
+            self._handle_events()
+
+    def _handle_events(self) -> None:
+        control_unit = self.control_unit
+        events = control_unit.events
+
+        if self.tick >= events.next_tick:
+            self._idle_pc = -1
+
+            # devices see the interrupt state and request interrupts through the latches
+            interrupt_handler = control_unit.interrupt_handler
+            interrupt_handler.ie.latch_value(self.ie)
+            interrupt_handler.irq.latch_value(self.irq)
+            events.run_due(self.tick)
+            self.irq = interrupt_handler.irq.get_value()
+
+        self._update_next_event_tick()
+
+        if control_unit.ticks_limit is not None and self.tick >= control_unit.ticks_limit:
+            raise MachineLimitException("tick's limit reached")
+
+    def _update_next_event_tick(self) -> None:
+        ticks_limit = self.control_unit.ticks_limit
+        next_tick = self.control_unit.events.next_tick
+        self._next_event_tick = next_tick if ticks_limit is None else min(next_tick, ticks_limit)
+
+    def _enter_interrupt(self) -> None:
+        self.ie = 0
+
+        irq = self.irq
+        vector = 0
+        while (irq & 1) == 0:
+            irq >>= 1
+            vector += 1
+
+        self.irq -= 1 << vector
+        self.pc = self.memory.read(vector * 4)
+        self._executed[_INTERRUPT_ENTRY] = (self.tick, None, self.pc)
+
+    # Helpers
+
+    def _latch(self, value: int) -> int:
+        if value >= _LATCH_LIMIT or value <= -_LATCH_LIMIT:
+            raise ValueError(f"{value} is too big, max bit size is {WORD_SIZE} (got {len(bin(abs(value))[2:])})")
+
+        return value
+
+    def _set_flags(self, out: int, mode: int) -> None:
+        overflow = int(not (_SIGNED_MIN <= out <= _SIGNED_MAX))
+
+        if mode == _FLAGS_NZVC:
+            self.v = self.c = overflow
+        elif mode == _FLAGS_NZV:
+            self.v = overflow
+        elif mode == _FLAGS_NZC_CLEAR_V:
+            self.v, self.c = 0, overflow
+        else:
+            self.v = 0
+
+        self.n = int(out < 0)
+        self.z = int(out == 0)
+
+    def _write_back(self, decoded: DecodedInstruction, value: int) -> None:
+        self.alu_out = value
+        self.br = self._latch(value)
+        self.regs[decoded.r1] = value
+
+    def _read_memory(self, addr: int) -> int:
+        if self.cache is not None:
+            self._stall_ticks += self.cache.access(addr)
+
+        return self.memory.read(addr)
+
+    def _write_memory(self, addr: int, value: int) -> None:
+        if self.cache is not None:
+            self._stall_ticks += self.cache.access(addr, write=True)
+
+        self._idle_pc = -1
+        self.memory.write(addr, value)
+
+        if not self.control_unit.signal_log_enabled:
+            return
+
+        self.simulation_log.append({
+            "signal": {
+                "type": "mem_write",
+                "data": {
+                    "addr": addr,
+                    "value": value,
+                },
+            },
+        })
+
+    # Instructions (each one returns the count of ticks it takes)
+
+    def _exec_lui(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self._executed[decoded.opcode] = (self.tick, decoded, self.regs[decoded.r1])
+        shifted = self._latch(decoded.imm << 16)
+        out = self.regs[decoded.r1] + shifted
+        self._set_flags(out, _FLAGS_NZVC)
+        self._write_back(decoded, out)
+        return 7
+
+    def _exec_lli(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self._executed[decoded.opcode] = (self.tick, decoded)
+        self._write_back(decoded, decoded.imm & 0xFFFF)
+        return 5
+
+    def _exec_lw(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self.ar = decoded.imm
+        self.br = value = self._read_memory(self.ar)
+        self.regs[decoded.r1] = value
+        self._executed[decoded.opcode] = (self.tick, decoded, value)
+        return 5
+
+    def _exec_sw(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self.ar = decoded.imm
+        self.br = self.regs[decoded.r1]
+        self._executed[decoded.opcode] = (self.tick, decoded, self.br)
+        self._write_memory(self.ar, self.br)
+        return 5
+
+    def _exec_lwr(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self.ar = self.regs[decoded.r2]
+        self.br = value = self._read_memory(self.ar)
+        self.regs[decoded.r1] = value
+        self._executed[decoded.opcode] = (self.tick, decoded, self.ar, value)
+        return 6
+
+    def _exec_swr(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self.br = self.regs[decoded.r1]
+        self.ar = self.regs[decoded.r2]
+        self._executed[decoded.opcode] = (self.tick, decoded, self.br, self.ar)
+        self._write_memory(self.ar, self.br)
+        return 5
+
+    def _exec_swap(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self.ar = self.regs[decoded.r2]
+        value = self.memory.read(self.ar)
+        self._executed[decoded.opcode] = (self.tick, decoded, self.regs[decoded.r1], self.ar, value)
+        # a single memory cycle, accounted by the cache as a write
+        self._write_memory(self.ar, self.regs[decoded.r1])
+        self.br = self.regs[decoded.r1] = value
+        return 6
+
+    def _exec_mv(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self._executed[decoded.opcode] = (self.tick, decoded, self.regs[decoded.r2])
+        self._write_back(decoded, self.regs[decoded.r2])
+        return 6
+
+    def _exec_addi(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self._executed[decoded.opcode] = (self.tick, decoded, self.regs[decoded.r1])
+        out = self.regs[decoded.r1] + decoded.imm
+        self._set_flags(out, _FLAGS_NZVC)
+        self._write_back(decoded, out)
+        return 6
+
+    def _binop(self, operation: Callable[[int, int], int], flags_mode: int) -> Callable[[DecodedInstruction], int]:
+        def execute(decoded: DecodedInstruction) -> int:
+            self.pc += 4
+            a = self.regs[decoded.r2]
+            b = self.regs[decoded.r3]
+            self._executed[decoded.opcode] = (self.tick, decoded, a, b)
+            out = operation(a, b)
+            self._set_flags(out, flags_mode)
+            self._write_back(decoded, out)
+            return 6
+
+        return execute
+
+    def _exec_div(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        a = self.regs[decoded.r2]
+        b = self.regs[decoded.r3]
+        self._executed[decoded.opcode] = (self.tick, decoded, a, b)
+
+        if b == 0:
+            # ALU raises the interrupt request and keeps its previous output
+            self.irq |= Interrupts.ZERO_DIVISION
+            self._write_back(decoded, self.alu_out)
+            return 6
+
+        out = a // b
+        self._set_flags(out, _FLAGS_NZVC)
+        self._write_back(decoded, out)
+        return 6
+
+    def _unop(self, operation: Callable[[int], int], flags_mode: int) -> Callable[[DecodedInstruction], int]:
+        def execute(decoded: DecodedInstruction) -> int:
+            self.pc += 4
+            a = self.regs[decoded.r2]
+            self._executed[decoded.opcode] = (self.tick, decoded, a)
+            out = operation(a)
+            self._set_flags(out, flags_mode)
+            self._write_back(decoded, out)
+            return 6
+
+        return execute
+
+    def _exec_cmp(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        a = self.regs[decoded.r1]
+        b = self.regs[decoded.r2]
+        self._executed[decoded.opcode] = (self.tick, decoded, a, b)
+        self.alu_out = out = a - b
+        self._set_flags(out, _FLAGS_NZVC)
+        return 5
+
+    def _set(self, condition: Callable[[int, int, int], bool]) -> Callable[[DecodedInstruction], int]:
+        def execute(decoded: DecodedInstruction) -> int:
+            self.pc += 4
+            out = int(condition(self.n, self.z, self.v))
+            self._executed[decoded.opcode] = (self.tick, decoded, out)
+            self.n, self.z, self.v, self.c = 0, int(out == 0), 0, 0
+            self._write_back(decoded, out)
+            return 5
+
+        return execute
+
+    def _exec_jal(self, decoded: DecodedInstruction) -> int:
+        self.pc += 4
+        self._executed[decoded.opcode] = (self.tick, decoded, self.regs[decoded.r1])
+        self.ar = self.jpc = decoded.imm
+        self._write_back(decoded, self.regs[decoded.r1])
+        return 6
+
+    def _exec_jr(self, decoded: DecodedInstruction) -> int:
+        self.pc = self.jpc = self.ar = self.regs[decoded.r1]
+        self._executed[decoded.opcode] = (self.tick, decoded, self.ar)
+        return 3
+
+    def _jump(self, condition: Callable[[int], bool]) -> Callable[[DecodedInstruction], int]:
+        def execute(decoded: DecodedInstruction) -> int:
+            if not condition(self.z):
+                self._executed[_SKIPPED_JUMP] = (self.tick, decoded)
+                self.pc += 4
+                return 2
+
+            self._executed[decoded.opcode] = (self.tick, decoded, self.pc)
+            out = self.pc + decoded.imm
+            self._set_flags(out, _FLAGS_NZVC)
+            self.alu_out = out
+            self.pc = self.jpc = self.br = self._latch(out)
+            return 6
+
+        return execute
+
+    # State synchronization with the microcoded units
+
+    def _load_state(self) -> None:
+        control_unit = self.control_unit
+        datapath = control_unit.datapath
+        decoder = control_unit.instruction_decoder
+        interrupt_handler = control_unit.interrupt_handler
+
+        self.tick = control_unit._tick
+        self.pc = control_unit.pc.get_value()
+        self.jpc = control_unit.jpc.get_value()
+        self.ir = decoder.ir.get_value()
+        self.ar = datapath.ar.get_value()
+        self.br = datapath.br.get_value()
+        self.alu_out = datapath.mux_br.get_input_values()[1]
+
+        self.regs = [register.get_value() for register in datapath.register_file.registers]
+
+        self.n, self.z, self.v, self.c = (datapath.alu.flags[flag].get_value() for flag in "NZVC")
+
+        self.ie = interrupt_handler.ie.get_value()
+        self.irq = interrupt_handler.irq.get_value()
+        self.ipc = interrupt_handler.ipc.get_value()
+
+        self._executed = {}
+        self._update_next_event_tick()
+
+    def _store_state(self) -> None:
+        control_unit = self.control_unit
+        datapath = control_unit.datapath
+        decoder = control_unit.instruction_decoder
+        interrupt_handler = control_unit.interrupt_handler
+
+        control_unit._tick = self.tick
+        self._store_executed()
+
+        control_unit.pc.latch_value(self.pc)
+        control_unit.signal_latch_pc(init=True)
+        control_unit.jpc.latch_value(self.jpc)
+        control_unit.mux_jpc.set_input_value(0, self.jpc)
+        control_unit.mux_pc.set_input_value(0, self.jpc)
+
+        decoder.ir.latch_value(self.ir)
+        decoder.opcode.latch_value(self.ir & _OPCODE_MASK)
+        decoder.reload_decoded()
+
+        datapath.ar.latch_value(self.ar)
+        datapath.mux_cu.set_input_value(0, self.ar)
+        datapath.br.latch_value(self.br)
+        datapath.mux_cu.set_input_value(1, self.br)
+        datapath.mux_br.set_input_value(1, self.alu_out)
+
+        for register, value in zip(datapath.register_file.registers, self.regs):
+            register.latch_value(value)
+
+        for flag, value in zip("NZVC", (self.n, self.z, self.v, self.c)):
+            datapath.alu.flags[flag].latch_value(value)
+        decoder.signal_nzvc()
+
+        interrupt_handler.ie.latch_value(self.ie)
+        interrupt_handler.irq.latch_value(self.irq)
+        interrupt_handler.ipc.latch_value(self.ipc)
+        interrupt_handler.out.set_input_value(0, self.ipc)
+
+    def _store_executed(self) -> None:
+        """Repeat the signals of the last execution of every instruction, which have set the rest of latches"""
+        executed, self._executed = self._executed, {}
+
+        for key, (_, decoded, *operands) in sorted(executed.items(), key=lambda item: item[1][0]):
+            self._signals[key](decoded, *operands)
+
+    # Signals of the executed instructions (the values they leave in the datapath, see `ControlUnit` microsteps)
+
+    def _decode(self, decoded: DecodedInstruction, id_out_index: int) -> None:
+        """Decoder fields, and its output selected to the Datapath"""
+        decoder = self.control_unit.instruction_decoder
+        decoder._decoded = decoded
+        decoder.signal_decode_instr()
+        decoder.signal_sel_out(id_out_index)
+        self.control_unit.signal_sel_dp(1)
+
+    def _read_left(self, value: int) -> None:
+        datapath = self.control_unit.datapath
+        datapath.mux_alu_a.set_input_value(0, value)
+        datapath.mux_br.set_input_value(0, value)
+
+    def _read_right(self, value: int) -> None:
+        datapath = self.control_unit.datapath
+        datapath.mux_alu_b.set_input_value(0, value)
+        datapath.mux_ar.set_input_value(1, value)
+
+    def _read_data(self, value: int) -> None:
+        datapath = self.control_unit.datapath
+        datapath.mux_br.set_input_value(2, value)
+        datapath.mux_ar.set_input_value(0, value)
+
+    def _latch_alu_a(self, input_index: int, value: int) -> None:
+        datapath = self.control_unit.datapath
+        datapath.signal_sel_alu_a(input_index)
+        datapath.alu.a.latch_value(value)
+
+    def _latch_alu_b(self, input_index: int, value: int) -> None:
+        datapath = self.control_unit.datapath
+        datapath.signal_sel_alu_b(input_index)
+        datapath.alu.b.latch_value(value)
+
+    def _signals_lui(self, decoded: DecodedInstruction, r1: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_left(r1)
+        self._latch_alu_a(0, r1)
+        self._latch_alu_b(2, datapath.mux_alu_b.get_input_values()[2])
+        datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_lli(self, decoded: DecodedInstruction) -> None:
+        self._decode(decoded, 1)
+        self._latch_alu_b(1, self.control_unit.instruction_decoder.imm.get_value())
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_lw(self, decoded: DecodedInstruction, value: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_data(value)
+        datapath.signal_sel_ar(2)
+        datapath.signal_sel_br(2)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_sw(self, decoded: DecodedInstruction, r1: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_left(r1)
+        datapath.signal_sel_ar(2)
+        datapath.signal_sel_br(0)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_lwr(self, decoded: DecodedInstruction, r2: int, value: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_right(r2)
+        self._read_data(value)
+        datapath.signal_sel_ar(1)
+        datapath.signal_sel_br(2)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_swr(self, decoded: DecodedInstruction, r1: int, r2: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 4)
+        self._read_left(r1)
+        self._read_right(r2)
+        datapath.signal_sel_ar(1)
+        datapath.signal_sel_br(0)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_swap(self, decoded: DecodedInstruction, r1: int, r2: int, value: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_left(r1)
+        self._read_right(r2)
+        self._read_data(value)
+        datapath.signal_sel_ar(1)
+        datapath.signal_sel_br(2)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_mv(self, decoded: DecodedInstruction, r2: int) -> None:
+        self._decode(decoded, 1)
+        self._read_right(r2)
+        self._latch_alu_b(0, r2)
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_addi(self, decoded: DecodedInstruction, r1: int) -> None:
+        self._decode(decoded, 1)
+        self._read_left(r1)
+        self._latch_alu_a(0, r1)
+        self._latch_alu_b(1, self.control_unit.instruction_decoder.imm.get_value())
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_binop(self, decoded: DecodedInstruction, r2: int, r3: int) -> None:
+        self._decode(decoded, 1)
+        self._read_left(r2)
+        self._read_right(r3)
+        self._latch_alu_a(0, r2)
+        self._latch_alu_b(0, r3)
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_unop(self, decoded: DecodedInstruction, r2: int) -> None:
+        self._decode(decoded, 1)
+        self._read_left(r2)
+        self._latch_alu_a(0, r2)
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_cmp(self, decoded: DecodedInstruction, r1: int, r2: int) -> None:
+        self._decode(decoded, 4)
+        self._read_left(r1)
+        self._read_right(r2)
+        self._latch_alu_a(0, r1)
+        self._latch_alu_b(0, r2)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_set(self, decoded: DecodedInstruction, out: int) -> None:
+        self._decode(decoded, 1)
+        self._latch_alu_b(1, out)
+        self.control_unit.datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_jal(self, decoded: DecodedInstruction, r1: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_right(r1)
+        self._latch_alu_b(0, r1)
+        datapath.signal_sel_ar(2)
+        datapath.mux_cu.select_input(0)
+        datapath.signal_sel_br(1)
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_jr(self, decoded: DecodedInstruction, r1: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 1)
+        self._read_right(r1)
+        datapath.signal_sel_ar(1)
+        datapath.mux_cu.select_input(0)
+        self.control_unit.signal_sel_pc(0)
+
+    def _signals_jump(self, decoded: DecodedInstruction, pc: int) -> None:
+        datapath = self.control_unit.datapath
+        self._decode(decoded, 0)
+        self._latch_alu_a(1, pc)
+        self._latch_alu_b(1, self.control_unit.instruction_decoder.imm.get_value())
+        datapath.signal_sel_br(1)
+        datapath.mux_cu.select_input(1)
+        self.control_unit.signal_sel_pc(0)
+
+    def _signals_skipped_jump(self, decoded: DecodedInstruction) -> None:
+        self.control_unit.signal_sel_pc(2)
+
+    def _signals_reti(self, decoded: DecodedInstruction, ipc: int) -> None:
+        interrupt_handler = self.control_unit.interrupt_handler
+        interrupt_handler.out.select_input(0)
+        self.control_unit.mux_pc.set_input_value(1, ipc)
+        self.control_unit.signal_sel_pc(1)
+
+    def _signals_interrupt_entry(self, decoded: Optional[DecodedInstruction], handler_addr: int) -> None:
+        interrupt_handler = self.control_unit.interrupt_handler
+        interrupt_handler.out.set_input_value(1, handler_addr)
+        interrupt_handler.signal_sel_out(1)
+        self.control_unit.signal_sel_pc(1)
@@ -1,36 +1,159 @@
+import mmap
+import os
+import struct
+from typing import Union
+
 from isa.constants import WORD_SIZE
 
 from .common.exceptions import MachineMemoryException
 from .common.helpers import convert_to_unsigned
+from .devices import DEVICE_PAGE_BITS, DeviceRegistry
+from .instruction_cache import (
+    DecodedInstruction,
+    InstructionCache,
+    decode_instruction,
+)
+
+WORD_BYTES = WORD_SIZE // 8
+
+_WORD = struct.Struct(">I")
+"""Big-endian 32-bit word view over a memory buffer"""
 
 
 class Memory:
-    def __init__(self, filename: str, size: int):
-        with open(filename, mode="rb") as file:
-            self.content = file.read()
+    """
+    Memory Unit
+
+    The memory image is followed by `size` zero bytes. The image is either
+    copied into a `bytearray` or mapped copy-on-write (`mapped=True`), so
+    loading a large image costs nothing and the image file is never changed.
+
+    Aligned words are accessed through the big-endian word view in place,
+    unaligned words and words crossing the end of the mapped image are
+    assembled byte by byte.
+    """
+
+    def __init__(self, filename: str, size: int, mapped: bool = False):
+        image_size = os.path.getsize(filename)
+        if image_size > size:
+            raise MachineMemoryException(f"file content is too long (max size {size}, got {image_size})")
+
+        self.size: int = image_size + size
 
-        if len(self.content) > size:
-            raise MachineMemoryException(f"file content is too long (max size {size}, got {len(self.content)})")
+        self._image: Union[bytearray, mmap.mmap]
+        self._tail: bytearray
+        if mapped and image_size > 0:
+            with open(filename, mode="rb") as file:
+                self._image = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+            self._tail = bytearray(size)
+        else:
+            self._image = bytearray(self.size)
+            with open(filename, mode="rb") as file:
+                file.readinto(memoryview(self._image)[:image_size])
+            self._tail = bytearray()
 
-        self.content += int.to_bytes(0, size)
-        self.content = [byte for byte in self.content]
+        self._image_size: int = len(self._image)
+        self._last_word_addr: int = self._image_size - WORD_BYTES
+        self._last_tail_word_addr: int = self.size - WORD_BYTES
+
+        self.instruction_cache: InstructionCache = InstructionCache()
+
+        self.devices: DeviceRegistry = DeviceRegistry(self.size)
+        self._pages = self.devices.pages
+        self.volatile_reads: int = 0
+        """Reads dispatched to volatile devices (see `Device.volatile`)"""
 
     def read(self, addr: int) -> int:
-        if len(bytes_array := self.content[addr:addr + 4]) != 4:
-            raise MachineMemoryException(f"unable to read 4 bytes at {addr} address (got {len(bytes_array)})")
+        """Read a word, words claimed by devices are read by the device (see `DeviceRegistry`)"""
+        if addr & 3 == 0 and 0 <= addr < self.size:
+            if (page := self._pages[addr >> DEVICE_PAGE_BITS]) is not None and (device := page.get(addr)) is not None:
+                if device.volatile:
+                    self.volatile_reads += 1
+                return device.read(self, addr)
+
+            if addr <= self._last_word_addr:
+                return _WORD.unpack_from(self._image, addr)[0]
+
+            if self._image_size <= addr <= self._last_tail_word_addr:
+                return _WORD.unpack_from(self._tail, addr - self._image_size)[0]
 
-        return int.from_bytes(bytes(bytes_array), byteorder="big")
+        return self.read_ram(addr)
+
+    def read_ram(self, addr: int) -> int:
+        """Read a word of RAM, even if it is claimed by a device"""
+        if addr & 3 == 0:
+            if 0 <= addr <= self._last_word_addr:
+                return _WORD.unpack_from(self._image, addr)[0]
+
+            if self._image_size <= addr <= self._last_tail_word_addr:
+                return _WORD.unpack_from(self._tail, addr - self._image_size)[0]
+
+        if not (0 <= addr <= self.size - WORD_BYTES):
+            raise MachineMemoryException(
+                f"unable to read 4 bytes at {addr} address (got {max(0, min(WORD_BYTES, self.size - addr))})",
+            )
+
+        return int.from_bytes(bytes(self._read_byte(addr + i) for i in range(WORD_BYTES)), byteorder="big")
+
+    def fetch(self, addr: int) -> DecodedInstruction:
+        if (decoded := self.instruction_cache.get(addr)) is None:
+            # not `self.read`, subclasses may count data reads (see `machine.profiler.ProfiledMemory`)
+            decoded = decode_instruction(Memory.read(self, addr))
+            self.instruction_cache.put(addr, decoded)
+
+        return decoded
 
     def write(self, addr: int, value: int) -> None:
+        """Write a word, words claimed by devices are written by the device (see `DeviceRegistry`)"""
+        if (
+            addr & 3 == 0 and 0 <= addr < self.size
+            and (page := self._pages[addr >> DEVICE_PAGE_BITS]) is not None
+            and (device := page.get(addr)) is not None
+        ):
+            device.write(self, addr, value)
+        else:
+            self.write_ram(addr, value)
+
+    def write_ram(self, addr: int, value: int) -> None:
+        """Write a word of RAM, even if it is claimed by a device"""
         if value < 0:
             value = convert_to_unsigned(value, WORD_SIZE)
 
-        bytes_array = int.to_bytes(value, 4, byteorder="big")
-
-        if addr + 3 >= len(self.content):
+        if addr & 3 == 0 and 0 <= addr <= self._last_word_addr:
+            _WORD.pack_into(self._image, addr, value)
+        elif addr & 3 == 0 and self._image_size <= addr <= self._last_tail_word_addr:
+            _WORD.pack_into(self._tail, addr - self._image_size, value)
+        elif 0 <= addr <= self.size - WORD_BYTES:
+            for i, byte in enumerate(value.to_bytes(WORD_BYTES, byteorder="big")):
+                self._write_byte(addr + i, byte)
+        else:
             raise MachineMemoryException(
-                f"unable to write bytes there, size of memory equal to {len(self.content)} "
+                f"unable to write bytes there, size of memory equal to {self.size} "
                 f"(the last byte has address {addr + 3})",
             )
 
-        self.content[addr:addr + 4] = bytes_array
+        self.instruction_cache.invalidate(addr)
+
+    def dump(self) -> bytes:
+        """Whole memory content (the image followed by the zero-initialized part)"""
+        return bytes(self._image) + bytes(self._tail)
+
+    def restore(self, content: bytes) -> None:
+        if len(content) != self.size:
+            raise MachineMemoryException(f"memory content size must be {self.size} (got {len(content)})")
+
+        self._image[:] = content[:self._image_size]
+        self._tail[:] = content[self._image_size:]
+        self.instruction_cache.clear()
+
+    def _read_byte(self, addr: int) -> int:
+        if addr < self._image_size:
+            return self._image[addr]
+
+        return self._tail[addr - self._image_size]
+
+    def _write_byte(self, addr: int, value: int) -> None:
+        if addr < self._image_size:
+            self._image[addr] = value
+        else:
+            self._tail[addr - self._image_size] = value
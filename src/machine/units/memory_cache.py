@@ -0,0 +1,216 @@
+from typing import Any, Dict, List, Set
+
+REPLACEMENT_LRU = "lru"
+REPLACEMENT_FIFO = "fifo"
+REPLACEMENT_RANDOM = "random"
+REPLACEMENT_POLICIES = (REPLACEMENT_LRU, REPLACEMENT_FIFO, REPLACEMENT_RANDOM)
+
+WRITE_BACK = "write_back"
+WRITE_THROUGH = "write_through"
+WRITE_POLICIES = (WRITE_BACK, WRITE_THROUGH)
+
+_RANDOM_SEED = 0x2545F491
+
+
+def _is_power_of_two(value: int) -> bool:
+    return value > 0 and value & (value - 1) == 0
+
+
+class MemoryCache:
+    """
+    Set-associative cache (timing model)
+
+    Sits between the datapath (instruction fetches, data reads and writes)
+    and the Memory Unit. Memory content always stays in `Memory`, the cache
+    keeps only the cached lines and their dirty bits, so the cache changes
+    nothing but the count of ticks memory accesses take:
+        - a hit stalls the machine for `hit_latency` ticks
+        - a miss stalls it for `miss_latency` ticks, plus `miss_latency` more
+          if a dirty line is evicted (write-back)
+
+    A write miss allocates a line with the write-back policy and doesn't with
+    the write-through one. An unaligned access is counted for the line of its
+    first byte. Random replacement uses a seeded xorshift generator, so runs
+    are reproducible.
+    """
+
+    def __init__(
+        self,
+        size: int = 1024,
+        line_size: int = 16,
+        associativity: int = 2,
+        replacement: str = REPLACEMENT_LRU,
+        write_policy: str = WRITE_BACK,
+        hit_latency: int = 0,
+        miss_latency: int = 10,
+    ):
+        if not _is_power_of_two(line_size) or line_size < 4:
+            raise ValueError(f"cache line size must be a power of two of at least 4 bytes (got {line_size})")
+
+        if associativity <= 0:
+            raise ValueError(f"cache associativity must be more than 0 (got {associativity})")
+
+        if size <= 0 or size % (line_size * associativity) != 0 or not _is_power_of_two(
+            size // (line_size * associativity),
+        ):
+            raise ValueError(
+                f"cache size must be a power of two count of sets of {associativity} lines "
+                f"of {line_size} bytes (got {size})",
+            )
+
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(
+                f"unexpected replacement policy {replacement} (enabled policies are {', '.join(REPLACEMENT_POLICIES)})",
+            )
+
+        if write_policy not in WRITE_POLICIES:
+            raise ValueError(
+                f"unexpected write policy {write_policy} (enabled policies are {', '.join(WRITE_POLICIES)})",
+            )
+
+        if hit_latency < 0 or miss_latency < 0:
+            raise ValueError(f"cache latencies can't be negative (got {hit_latency} and {miss_latency})")
+
+        self.size: int = size
+        self.line_size: int = line_size
+        self.associativity: int = associativity
+        self.replacement: str = replacement
+        self.write_policy: str = write_policy
+        self.hit_latency: int = hit_latency
+        self.miss_latency: int = miss_latency
+
+        self.sets_count: int = size // (line_size * associativity)
+        self._offset_bits: int = line_size.bit_length() - 1
+        self._set_mask: int = self.sets_count - 1
+        self._lru: bool = replacement == REPLACEMENT_LRU
+        self._write_back: bool = write_policy == WRITE_BACK
+
+        self._sets: List[List[int]] = [[] for _ in range(self.sets_count)]
+        """Line numbers (`addr // line_size`) of every set, the next victim first (except the random policy)"""
+
+        self._dirty: Set[int] = set()
+        self._random_state: int = _RANDOM_SEED
+
+        self.read_hits: int = 0
+        self.read_misses: int = 0
+        self.write_hits: int = 0
+        self.write_misses: int = 0
+        self.writebacks: int = 0
+
+    @property
+    def max_latency(self) -> int:
+        """The longest stall of a single access (a miss evicting a dirty line)"""
+        return max(self.hit_latency, 2 * self.miss_latency)
+
+    def access(self, addr: int, write: bool = False) -> int:
+        """Account an access at `addr` and return the count of stall ticks it takes"""
+        line = addr >> self._offset_bits
+        ways = self._sets[line & self._set_mask]
+
+        if line in ways:
+            if self._lru:
+                ways.remove(line)
+                ways.append(line)
+
+            if write:
+                self.write_hits += 1
+                if self._write_back:
+                    self._dirty.add(line)
+            else:
+                self.read_hits += 1
+
+            return self.hit_latency
+
+        if write:
+            self.write_misses += 1
+            if not self._write_back:
+                return self.miss_latency
+        else:
+            self.read_misses += 1
+
+        latency = self.miss_latency
+        if len(ways) == self.associativity:
+            victim = ways.pop(self._victim_index())
+            if victim in self._dirty:
+                self._dirty.remove(victim)
+                self.writebacks += 1
+                latency += self.miss_latency
+
+        ways.append(line)
+        if write:
+            self._dirty.add(line)
+
+        return latency
+
+    def _victim_index(self) -> int:
+        if self.replacement != REPLACEMENT_RANDOM:
+            return 0
+
+        # xorshift32
+        state = self._random_state
+        state ^= (state << 13) & 0xFFFFFFFF
+        state ^= state >> 17
+        state ^= (state << 5) & 0xFFFFFFFF
+        self._random_state = state
+
+        return state % self.associativity
+
+    def stats(self) -> Dict[str, Any]:
+        accesses = self.read_hits + self.read_misses + self.write_hits + self.write_misses
+        hits = self.read_hits + self.write_hits
+
+        return {
+            "size": self.size,
+            "line_size": self.line_size,
+            "associativity": self.associativity,
+            "replacement": self.replacement,
+            "write_policy": self.write_policy,
+            "read_hits": self.read_hits,
+            "read_misses": self.read_misses,
+            "write_hits": self.write_hits,
+            "write_misses": self.write_misses,
+            "writebacks": self.writebacks,
+            "hit_rate": hits / accesses if accesses else 0.0,
+        }
+
+    def get_state(self) -> List[int]:
+        """Cached lines, dirty bits, the generator state and statistics as a list of integers"""
+        state = [
+            self.read_hits, self.read_misses, self.write_hits, self.write_misses, self.writebacks,
+            self._random_state,
+        ]
+
+        for ways in self._sets:
+            state.append(len(ways))
+            state.extend(ways)
+
+        state.append(len(self._dirty))
+        state.extend(sorted(self._dirty))
+
+        return state
+
+    def set_state(self, state: List[int]) -> None:
+        """Restore the state made by `get_state` of a cache with the same geometry"""
+        values = iter(state)
+        try:
+            stats = [next(values) for _ in range(5)]
+            random_state = next(values)
+
+            sets = []
+            for _ in range(self.sets_count):
+                ways = [next(values) for _ in range(next(values))]
+                if len(ways) > self.associativity:
+                    raise ValueError(f"cache set has {len(ways)} lines (associativity is {self.associativity})")
+                sets.append(ways)
+
+            dirty = {next(values) for _ in range(next(values))}
+        except StopIteration:
+            raise ValueError("cache state is truncated") from None
+
+        if next(values, None) is not None:
+            raise ValueError("cache state doesn't match the cache geometry")
+
+        self.read_hits, self.read_misses, self.write_hits, self.write_misses, self.writebacks = stats
+        self._random_state = random_state
+        self._sets = sets
+        self._dirty = dirty
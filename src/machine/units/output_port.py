@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from ..constants import OUTPUT_ADDR
+from .devices import Device
+
+if TYPE_CHECKING:
+    from .memory import Memory
+
+
+class OutputPort(Device):
+    """
+    Output port (memory-mapped)
+
+    Captures every word written to the port address, so the program output
+    is available without scanning the simulation log.
+    """
+
+    volatile = False
+    """Reads are plain RAM reads"""
+
+    def __init__(self, addr: int = OUTPUT_ADDR):
+        self.addr: int = addr
+        self.buffer: List[int] = []
+
+        self.on_write: Optional[Callable[[int], None]] = None
+        """Called with every word written to the port"""
+
+    def write(self, memory: Memory, addr: int, value: int) -> None:
+        super().write(memory, addr, value)
+
+        self.buffer.append(value)
+        if self.on_write is not None:
+            self.on_write(value)
@@ -0,0 +1,59 @@
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TRACE_TYPECODE = "q"
+"""Signed 64-bit columns fit both signed and unsigned 32-bit machine values"""
+
+
+class TickTrace:
+    """
+    Columnar tick trace
+
+    Keeps one typed column per recorded field, a row is appended on every tick.
+    Only the requested fields are recorded (usually the journal fields and IR).
+
+    With `chunk_size` set, `on_chunk` is called every time the trace holds
+    `chunk_size` rows (the callback is expected to consume and clear them).
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str],
+        probes: Dict[str, Callable[[], int]],
+        chunk_size: Optional[int] = None,
+        on_chunk: Optional[Callable[["TickTrace"], None]] = None,
+    ):
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError(f"chunk size must be more than 0 (got {chunk_size})")
+
+        self.fields: List[str] = list(dict.fromkeys(fields))
+        self.columns: Dict[str, array] = {}
+
+        self.chunk_size: Optional[int] = chunk_size
+        self.on_chunk: Optional[Callable[[TickTrace], None]] = on_chunk
+        self._rows: int = 0
+
+        self._recorders: List[Tuple[Callable[[int], None], Callable[[], int]]] = []
+        for field in self.fields:
+            if field not in probes:
+                raise ValueError(f"unknown trace field {field} (enabled fields are {', '.join(probes)})")
+
+            column = self.columns[field] = array(TRACE_TYPECODE)
+            self._recorders.append((column.append, probes[field]))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def record(self) -> None:
+        for append, probe in self._recorders:
+            append(probe())
+
+        self._rows += 1
+        if self._rows == self.chunk_size and self.on_chunk is not None:
+            self.on_chunk(self)
+
+    def clear(self) -> None:
+        for column in self.columns.values():
+            del column[:]
+
+        self._rows = 0
@@ -1,14 +1,27 @@
+import asyncio
+import json
 import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 import pytest
 
 from src.compiler import compile_code
 from src.machine import (
+    BLOCK_ENGINE,
     EXEC_LOG_FILENAME,
+    INSTRUCTION_ENGINE,
     MEMORY_DUMP_FILENAME,
     OUTPUT_LOG_FILENAME,
+    PROFILE_JSON_FILENAME,
+    TICK_ENGINE,
+    Simulation,
+    create_simulation,
+    read_config,
     run_simulation,
 )
+from src.machine.fmt.format_number import _LogNumberFmt
+from src.machine.snapshots import SNAPSHOTS_DIRNAME, read_snapshot_index
+from src.machine.units.common.exceptions import MachineLimitException
 
 GOLDEN_FILES_DIRNAME = "golden_files"
 
@@ -27,6 +40,58 @@ def get_golden_file_path(path: str) -> str:
     return get_current_path(os.path.join(GOLDEN_FILES_DIRNAME, path))
 
 
+def read_golden_file(golden: Dict[str, Any], key: str) -> str:
+    return open(get_golden_file_path(golden[key]), mode="r").read()
+
+
+def read_simulation_file(simulation_dir: str, filename: str) -> str:
+    return open(os.path.join(simulation_dir, filename), mode="r").read()
+
+
+class GoldenBuild(NamedTuple):
+    dirname: str
+    binary: str
+    """The compiled program"""
+    code: str
+    """The translator output"""
+    config_filename: str
+    config: Dict[str, Any]
+
+
+def compile_golden(golden: Dict[str, Any], suffix: str = "") -> GoldenBuild:
+    """Compile the golden program into its own build directory (`suffix` tells the tests apart)"""
+    build_dir = os.path.join(get_current_path(".build"), golden["filename"].split(".")[0] + suffix)
+    os.makedirs(build_dir, exist_ok=True)
+
+    build_bin_file_path = os.path.join(build_dir, "out.bin")
+    compiled_code = compile_code(get_golden_file_path(golden["source_code_path"]), build_bin_file_path)
+
+    config_path = get_golden_file_path(golden["machine_config_path"])
+    return GoldenBuild(build_dir, build_bin_file_path, compiled_code, config_path, read_config(config_path))
+
+
+def simulation_from_config(
+    build: GoldenBuild,
+    simulation_dir: str,
+    ticks_limit: Optional[int] = None,
+    tokens: Optional[Dict[int, str]] = None,
+    journal_fmt: Optional[List[Tuple[str, _LogNumberFmt, int]]] = None,
+    **kwargs: Any,
+) -> Simulation:
+    """Simulation of the golden build with its config settings (the ticks limit, tokens and journal can be replaced)"""
+    config = build.config
+    return Simulation(
+        build.binary,
+        config["machine"]["memory_size"],
+        simulation_dir,
+        config["machine"]["ticks_limit"] if ticks_limit is None else ticks_limit,
+        config["memio"]["tokens"] if tokens is None else tokens,
+        config["journal_fmt"] if journal_fmt is None else journal_fmt,
+        config["memio"]["output_fmt"],
+        **kwargs,
+    )
+
+
 golden_files = []
 for filename in os.listdir(get_current_path(GOLDEN_FILES_DIRNAME)):
     if filename.endswith(".yml") or filename.endswith(".yaml"):
@@ -37,41 +102,283 @@ class TestMachine:
     @pytest.mark.usefixtures("golden")
     @pytest.mark.parametrize("golden", golden_files, indirect=True)
     def test_machine_golden(self, golden):
-        build_dir = os.path.join(get_current_path(".build"), golden["filename"].split(".")[0])
+        build = compile_golden(golden)
+        with open(os.path.join(build.dirname, "out.txt"), mode="w") as file:
+            file.write(build.code)
 
-        os.makedirs(build_dir, exist_ok=True)
-        build_bin_file_path = os.path.join(build_dir, "out.bin")
+        simulation_dir = os.path.join(build.dirname, "simulation")
+        run_simulation(build.binary, build.config_filename, simulation_dir)
 
-        source_code_path = get_golden_file_path(golden["source_code_path"])
-        machine_config_path = get_golden_file_path(golden["machine_config_path"])
-        translator_out_path = get_golden_file_path(golden["translator_out_path"])
-        memory_dump_path = get_golden_file_path(golden["memory_dump_path"])
-        machine_journal_path = get_golden_file_path(golden["machine_journal_path"])
-        output_path = get_golden_file_path(golden["output_path"])
+        assert_content(build.code, read_golden_file(golden, "translator_out_path"))
+        assert_content(
+            read_simulation_file(simulation_dir, OUTPUT_LOG_FILENAME),
+            read_golden_file(golden, "output_path"),
+        )
+        assert_content(
+            read_simulation_file(simulation_dir, MEMORY_DUMP_FILENAME),
+            read_golden_file(golden, "memory_dump_path"),
+        )
+        assert_content(
+            read_simulation_file(simulation_dir, EXEC_LOG_FILENAME),
+            read_golden_file(golden, "machine_journal_path"),
+        )
 
-        compiled_code = compile_code(source_code_path, build_bin_file_path)
-        with open(os.path.join(build_dir, "out.txt"), mode="w") as file:
-            file.write(compiled_code)
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    @pytest.mark.parametrize("engine", [INSTRUCTION_ENGINE, BLOCK_ENGINE])
+    def test_instruction_engine_golden(self, golden, engine):
+        build = compile_golden(golden, "_" + engine)
 
-        simulation_dir = os.path.join(build_dir, "simulation")
-        run_simulation(build_bin_file_path, machine_config_path, simulation_dir)
+        simulation_dir = os.path.join(build.dirname, "simulation")
+        run_simulation(build.binary, build.config_filename, simulation_dir, engine=engine)
 
         assert_content(
-            compiled_code,
-            open(translator_out_path, mode="r").read(),
+            read_simulation_file(simulation_dir, OUTPUT_LOG_FILENAME),
+            read_golden_file(golden, "output_path"),
         )
-
         assert_content(
-            open(os.path.join(simulation_dir, OUTPUT_LOG_FILENAME), mode="r").read(),
-            open(output_path, mode="r").read(),
+            read_simulation_file(simulation_dir, MEMORY_DUMP_FILENAME),
+            read_golden_file(golden, "memory_dump_path"),
         )
 
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    def test_checkpoint_resume_golden(self, golden):
+        build = compile_golden(golden, "_checkpoint")
+        checkpoint_path = os.path.join(build.dirname, "checkpoint.bin")
+        simulation_dir = os.path.join(build.dirname, "simulation")
+
+        simulation = simulation_from_config(build, simulation_dir, ticks_limit=100)
+        with pytest.raises(MachineLimitException):
+            simulation.run()
+        simulation.save_checkpoint(checkpoint_path)
+
+        simulation = simulation_from_config(build, simulation_dir)
+        simulation.load_checkpoint(checkpoint_path)
+        simulation.run()
+
         assert_content(
-            open(os.path.join(simulation_dir, MEMORY_DUMP_FILENAME), mode="r").read(),
-            open(memory_dump_path, mode="r").read(),
+            read_simulation_file(simulation_dir, OUTPUT_LOG_FILENAME),
+            read_golden_file(golden, "output_path"),
+        )
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    def test_snapshot_restore_golden(self, golden):
+        build = compile_golden(golden, "_snapshots")
+
+        simulation_dir = os.path.join(build.dirname, "simulation")
+        run_simulation(build.binary, build.config_filename, simulation_dir, snapshot_every=100)
+
+        journal = read_golden_file(golden, "machine_journal_path").strip().split("\n")
+        for tick in (1, len(journal) // 2, len(journal)):
+            simulation = create_simulation(build.binary, build.config_filename, simulation_dir)
+            simulation.restore_tick(tick)
+
+            assert simulation.state_line() == journal[tick - 1]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    @pytest.mark.parametrize("engine", [INSTRUCTION_ENGINE, BLOCK_ENGINE])
+    def test_engine_snapshot_restore_golden(self, golden, engine):
+        build = compile_golden(golden, "_snapshots_" + engine)
+        # with the latches which aren't a part of the instruction engine state
+        journal_fmt = build.config["journal_fmt"] + [
+            (field, _LogNumberFmt.HEXADECIMAL, 32) for field in ("ALU_A", "ALU_B", "R1", "R2", "R3", "IMM")
+        ]
+
+        expected_dir = os.path.join(build.dirname, "expected")
+        simulation_from_config(build, expected_dir, journal_fmt=journal_fmt).run()
+        journal = read_simulation_file(expected_dir, EXEC_LOG_FILENAME).strip().split("\n")
+
+        simulation_dir = os.path.join(build.dirname, "simulation")
+        simulation = simulation_from_config(
+            build, simulation_dir, journal_fmt=journal_fmt, engine=engine, snapshot_every=100,
         )
+        simulation.run()
+
+        snapshots = read_snapshot_index(os.path.join(simulation_dir, SNAPSHOTS_DIRNAME))
+        assert len(snapshots) > 2
+        for tick, _ in snapshots[1:]:
+            simulation = simulation_from_config(build, simulation_dir, journal_fmt=journal_fmt)
+            simulation.restore_tick(tick)
+
+            assert simulation.state_line() == journal[tick - 1]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    def test_profile_golden(self, golden):
+        build = compile_golden(golden, "_profile")
+
+        profiles = []
+        for engine in (TICK_ENGINE, INSTRUCTION_ENGINE):
+            simulation_dir = os.path.join(build.dirname, engine)
+            simulation = create_simulation(build.binary, build.config_filename, simulation_dir, engine, profile=True)
+            simulation.run()
+
+            profile = json.loads(read_simulation_file(simulation_dir, PROFILE_JSON_FILENAME))
+            # the HALT instruction isn't completed, so it isn't counted
+            assert profile["ticks"] == simulation.control_unit._tick - 1
+            assert profile["ticks"] == sum(row["ticks"] for row in profile["opcodes"])
+            profiles.append(profile)
+
+        assert profiles[0] == profiles[1]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    @pytest.mark.parametrize("cache", [
+        {"size": 64, "line_size": 8, "associativity": 2, "hit_latency": 1, "miss_latency": 4},
+        {"size": 128, "associativity": 1, "replacement": "random", "write_policy": "write_through"},
+    ])
+    def test_cache_golden(self, golden, cache):
+        build = compile_golden(golden, "_cache")
+
+        results = []
+        for engine in (TICK_ENGINE, INSTRUCTION_ENGINE):
+            simulation = simulation_from_config(
+                build,
+                os.path.join(build.dirname, engine),
+                ticks_limit=build.config["machine"]["ticks_limit"] * 10,
+                engine=engine,
+                cache=cache,
+            )
+            simulation.run()
+
+            stats = simulation.cache.stats()
+            assert stats["read_misses"] > 0
+            results.append((simulation.control_unit._tick, simulation.format_output(), stats))
+
+        assert results[0] == results[1]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    def test_idle_fast_forward_golden(self, golden):
+        build = compile_golden(golden, "_idle")
+        config = build.config
+
+        # sparse tokens, so the program mostly waits for input
+        tokens = {tick * 100: token for tick, token in config["memio"]["tokens"].items()}
+
+        results = []
+        for engine in (TICK_ENGINE, INSTRUCTION_ENGINE, BLOCK_ENGINE):
+            simulation = simulation_from_config(
+                build,
+                os.path.join(build.dirname, engine),
+                ticks_limit=config["machine"]["ticks_limit"] * 100,
+                tokens=tokens,
+                engine=engine,
+            )
+            simulation.run()
+
+            results.append((simulation.control_unit._tick, simulation.format_output(), simulation.memory_unit.dump()))
+
+        assert results[0] == results[1] == results[2]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    @pytest.mark.parametrize("engine", [TICK_ENGINE, INSTRUCTION_ENGINE, BLOCK_ENGINE])
+    def test_live_io_golden(self, golden, engine):
+        build = compile_golden(golden, "_live")
+        config = build.config
+
+        text = "".join(token for _, token in sorted(config["memio"]["tokens"].items()))
+
+        async def source():
+            # the input arrives in two parts, while the machine is running (every event
+            # loop turn is a simulation slice, so the arrival ticks don't depend on time)
+            yield text[:2]
+            for _ in range(5):
+                await asyncio.sleep(0)
+            yield text[2:]
+
+        results = []
+        for attempt in range(2):
+            simulation = simulation_from_config(
+                build,
+                os.path.join(build.dirname, engine),
+                ticks_limit=config["machine"]["ticks_limit"] * 10,
+                tokens={},
+                engine=engine,
+            )
+
+            output = []
+
+            async def sink(text):
+                output.append(text)
+
+            asyncio.run(simulation.run_live(source(), sink, yield_every=50))
+
+            assert "".join(output) == "".join(map(simulation.format_word, simulation.datapath.output_port.buffer))
+            assert_content(simulation.format_output(), read_golden_file(golden, "output_path"))
+            results.append((simulation.tick, simulation.memory_unit.dump()))
+
+        assert results[0] == results[1]
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    @pytest.mark.parametrize("engine", [TICK_ENGINE, INSTRUCTION_ENGINE, BLOCK_ENGINE])
+    def test_incremental_run_golden(self, golden, engine):
+        build = compile_golden(golden, "_incremental")
+
+        simulation_dir = os.path.join(build.dirname, engine)
+        simulation = create_simulation(build.binary, build.config_filename, simulation_dir, engine)
+
+        simulation.step()
+        simulation.step()
+
+        tick = simulation.tick
+        simulation.run_for(37)
+        assert simulation.tick >= tick + 37
+
+        tick = simulation.tick
+        assert not simulation.run_until(-1, max_ticks=100)
+        assert simulation.tick >= tick + 100
+        assert simulation.run_until(lambda sim: sim.tick >= tick + 150)
+
+        while not simulation.halted:
+            simulation.run_for(250)
+        simulation.step()
+
+        simulation.finish()
 
         assert_content(
-            open(os.path.join(simulation_dir, EXEC_LOG_FILENAME), mode="r").read(),
-            open(machine_journal_path, mode="r").read(),
+            read_simulation_file(simulation_dir, OUTPUT_LOG_FILENAME),
+            read_golden_file(golden, "output_path"),
         )
+        assert_content(
+            read_simulation_file(simulation_dir, MEMORY_DUMP_FILENAME),
+            read_golden_file(golden, "memory_dump_path"),
+        )
+
+        if engine == TICK_ENGINE:
+            assert_content(
+                read_simulation_file(simulation_dir, EXEC_LOG_FILENAME),
+                read_golden_file(golden, "machine_journal_path"),
+            )
+
+    @pytest.mark.usefixtures("golden")
+    @pytest.mark.parametrize("golden", golden_files, indirect=True)
+    def test_incremental_chunked_journal_golden(self, golden):
+        build = compile_golden(golden, "_incremental_chunks")
+
+        simulation_dir = os.path.join(build.dirname, "simulation")
+        simulation = simulation_from_config(build, simulation_dir, journal_chunk_size=50)
+
+        simulation.run_for(120)
+        # the journal is streamed while running, the trace keeps less than a chunk
+        journal = read_simulation_file(simulation_dir, EXEC_LOG_FILENAME)
+        assert len(journal.strip().split("\n")) == simulation.tick // 50 * 50
+        assert len(simulation.control_unit.trace.columns["IR"]) < 50
+
+        while not simulation.halted:
+            simulation.run_for(100)
+
+        simulation.finish()
+        journal = read_simulation_file(simulation_dir, EXEC_LOG_FILENAME)
+        assert journal.strip() == read_golden_file(golden, "machine_journal_path").strip()
+
+        # the second call doesn't save the consumed trace again
+        simulation.finish()
+        simulation.step()
+        assert read_simulation_file(simulation_dir, EXEC_LOG_FILENAME) == journal
+        assert simulation.finished
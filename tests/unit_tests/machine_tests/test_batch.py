@@ -0,0 +1,59 @@
+import json
+import os
+
+from src.compiler import compile_code
+from src.machine.batch import (
+    HALT_REASON_ERROR,
+    HALT_REASON_HALT,
+    read_manifest,
+    run_batch,
+    run_job,
+)
+
+TESTS_DIRNAME = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+GOLDEN_FILES_DIRNAME = os.path.join(TESTS_DIRNAME, "golden_tests", "golden_files")
+
+
+class TestBatch:
+    def test_run_batch(self, tmp_path) -> None:
+        golden_dirname = os.path.join(GOLDEN_FILES_DIRNAME, "hello_world_files")
+        compile_code(os.path.join(golden_dirname, "source_code.txt"), os.path.join(tmp_path, "hello_world.bin"))
+
+        manifest_filename = os.path.join(tmp_path, "manifest.yaml")
+        with open(manifest_filename, mode="w") as file:
+            file.write(json.dumps({
+                "jobs": [
+                    {"binary": "hello_world.bin", "config": os.path.join(golden_dirname, "machine_config.yaml")},
+                    {"name": "missing", "binary": "missing.bin", "config": "missing.yaml"},
+                ],
+            }))
+
+        summaries = list(run_batch(read_manifest(manifest_filename), os.path.join(tmp_path, "simulation"), workers=2))
+
+        assert [summary["name"] for summary in summaries] == ["hello_world", "missing"]
+
+        assert summaries[0]["halt_reason"] == HALT_REASON_HALT
+        assert summaries[0]["output"] == "Hello World"
+        assert summaries[0]["ticks"] > 0
+
+        assert summaries[1]["halt_reason"] == HALT_REASON_ERROR
+        assert summaries[1]["output"] is None
+
+    def test_output_format_error(self, tmp_path) -> None:
+        golden_dirname = os.path.join(GOLDEN_FILES_DIRNAME, "hello_world_files")
+        binary = os.path.join(tmp_path, "hello_world.bin")
+        compile_code(os.path.join(golden_dirname, "source_code.txt"), binary)
+
+        with open(os.path.join(golden_dirname, "machine_config.yaml")) as file:
+            config = file.read()
+        config_filename = os.path.join(tmp_path, "machine_config.yaml")
+        with open(config_filename, mode="w") as file:
+            file.write(config.replace("output_fmt: str", "output_fmt: hex"))
+
+        job = {"name": "hello_world", "binary": binary, "config": config_filename, "engine": None}
+        summary = run_job(job, os.path.join(tmp_path, "simulation"))
+
+        assert summary["halt_reason"] == HALT_REASON_ERROR
+        assert summary["error"] == "NotImplementedError: unexpected output format hex"
+        assert summary["output"] is None
+        assert summary["ticks"] > 0
@@ -0,0 +1,183 @@
+import os
+from typing import List, Tuple
+
+import pytest
+
+from src.machine.checkpoint import (
+    decode_checkpoint,
+    encode_checkpoint,
+    machine_components,
+)
+from src.machine.constants import START_ADDR
+from src.machine.units.block_engine import BlockEngine
+from src.machine.units.common.exceptions import MachineStop
+from src.machine.units.datapath import Datapath
+from src.machine.units.devices import Device
+from src.machine.units.instruction_engine import InstructionEngine
+from src.machine.units.memory import Memory
+
+T2, T5 = 17, 20
+DEVICE_ADDR = 0x600
+
+# The first ADDI adds 1 to T2 once, then it is patched (ADDI T2, 0x2) by SW, the second
+# ADDI is patched (ADDI T5, 0x4) by SWR before it runs, the loop runs 3 times
+PROGRAM = bytes.fromhex(
+    "028f2871"  # LLI T1, 0x28F2
+    "000018f2"  # ADDI T2, 0x1
+    "00404801"  # SW T1, 0x404
+    "00001972"  # ADDI T3, 0x1
+    "04a72af1"  # LLI T6, 0x4A72
+    "0041c9f1"  # LLI T4, 0x41C
+    "00013ad3"  # SWR T6, T4
+    "00001a72"  # ADDI T5, 0x1
+    "000039f1"  # LLI T4, 0x3
+    "00013951"  # CMP T3, T4
+    "ffffee12"  # JNZ -0x24
+    "00000031"  # HALT
+)
+
+# Polls the device until it reads non-zero
+POLLING_PROGRAM = bytes.fromhex(
+    "00000af1"  # LLI T6, 0x0
+    "00600800"  # LW T1, 0x600
+    "00015851"  # CMP T1, T6
+    "fffffc11"  # JZ -0x8
+    "00000031"  # HALT
+)
+
+# Every translated instruction, the loop runs 3 times (JAL only sets JPC, JR jumps to ADDI)
+INSTRUCTIONS_PROGRAM = bytes.fromhex(
+    "00003c71"  # LLI A1, 0x3
+    "00007871"  # LLI T1, 0x7
+    "000038f1"  # LLI T2, 0x3
+    "00000970"  # LUI T3, 0x0
+    "00230960"  # ADD T3, T1, T2
+    "002309e1"  # SUB T4, T1, T2
+    "00230a62"  # MUL T5, T1, T2
+    "00230ae3"  # DIV T6, T1, T2
+    "00230964"  # REM T3, T1, T2
+    "002309e5"  # AND T4, T1, T2
+    "00230a66"  # OR T5, T1, T2
+    "00230ae7"  # XOR T6, T1, T2
+    "00230968"  # SHL T3, T1, T2
+    "002309e9"  # SHR T4, T1, T2
+    "00010a54"  # NEG T5, T1
+    "00010ad0"  # NOT T6, T1
+    "00010955"  # MV T3, T1
+    "00011851"  # CMP T1, T2
+    "00000942"  # SETEQ T3
+    "000009c3"  # SETNE T4
+    "00000a44"  # SETGE T5
+    "00000ac5"  # SETLE T6
+    "00000946"  # SETSG T3
+    "000009c7"  # SETSL T4
+    "00600af1"  # LLI T6, 0x600
+    "00015853"  # SWR T1, T6
+    "000158d2"  # LWR T2, T6
+    "00015956"  # SWAP T3, T6
+    "00600980"  # LW T4, 0x600
+    "00604981"  # SW T4, 0x604
+    "00700a02"  # JAL T5, 0x700
+    "00484a71"  # LLI T5, 0x484
+    "00000a40"  # JR T5
+    "fffffc72"  # ADDI A1, 0x-1
+    "ffffbe12"  # JNZ 0x-84
+    "00000411"  # JZ 0x8
+    "00000031"  # HALT
+    "fffffe10"  # JO 0x-4
+)
+
+
+class ReadyDevice(Device):
+    """Reads return 0 until `ready_after` reads are made, then 1"""
+
+    def __init__(self, ready_after: int):
+        self.ready_after = ready_after
+        self.reads = 0
+
+    def read(self, memory: Memory, addr: int) -> int:
+        self.reads += 1
+        return int(self.reads > self.ready_after)
+
+    def write(self, memory: Memory, addr: int, value: int) -> None:
+        pass
+
+
+def create_datapath(dirname: str, program: bytes) -> Datapath:
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(bytes(START_ADDR) + program)
+
+    datapath = Datapath(Memory(filename, 2048))
+    datapath.control_unit.ticks_limit = 10_000
+    return datapath
+
+
+def machine_state(datapath: Datapath) -> Tuple[List[int], List[Tuple[int, List[int]]]]:
+    """Values of every latch, and the selected input and input values of every selector"""
+    latches, selectors = machine_components(datapath)
+    return (
+        [latch.get_value() for latch in latches],
+        [(selector.get_selected_input(), selector.get_input_values()) for selector in selectors],
+    )
+
+
+def run_program(dirname: str, engine_class) -> InstructionEngine:
+    engine = engine_class(create_datapath(dirname, PROGRAM).control_unit)
+    with pytest.raises(MachineStop):
+        engine.run()
+
+    return engine
+
+
+class TestBlockEngine:
+    def test_self_modifying_code(self, tmp_path) -> None:
+        engine = run_program(tmp_path, BlockEngine)
+
+        assert engine._blocks
+        assert (engine.regs[T2], engine.regs[T5]) == (1 + 2 + 2, 4 + 4 + 4)
+
+        expected = run_program(tmp_path, InstructionEngine)
+        assert (engine.tick, engine.regs) == (expected.tick, expected.regs)
+
+    @pytest.mark.parametrize("engine_class", [InstructionEngine, BlockEngine])
+    def test_device_polling_loop_is_not_fast_forwarded(self, tmp_path, engine_class) -> None:
+        expected = create_datapath(tmp_path, POLLING_PROGRAM)
+        expected_device = ReadyDevice(ready_after=50)
+        expected.memory.devices.attach(expected_device, DEVICE_ADDR)
+        with pytest.raises(MachineStop):
+            while True:
+                expected.control_unit.process_instruction()
+
+        datapath = create_datapath(tmp_path, POLLING_PROGRAM)
+        device = ReadyDevice(ready_after=50)
+        datapath.memory.devices.attach(device, DEVICE_ADDR)
+        engine = engine_class(datapath.control_unit)
+        with pytest.raises(MachineStop):
+            # the stop tick lets idle loops be fast-forwarded
+            engine.run(stop_tick=datapath.control_unit.ticks_limit)
+
+        assert device.reads == expected_device.reads == 51
+        assert engine.control_unit._tick == expected.control_unit._tick
+
+    @pytest.mark.parametrize("engine_class", [InstructionEngine, BlockEngine])
+    @pytest.mark.parametrize("run_ticks", [13, 211])
+    def test_checkpoint_is_same_as_tick_engine_one(self, tmp_path, engine_class, run_ticks: int) -> None:
+        expected = create_datapath(tmp_path, INSTRUCTIONS_PROGRAM)
+        datapath = create_datapath(tmp_path, INSTRUCTIONS_PROGRAM)
+        engine = engine_class(datapath.control_unit)
+
+        stop_tick = 0
+        with pytest.raises(MachineStop):
+            while True:
+                stop_tick += run_ticks
+                engine.run(stop_tick=stop_tick)
+                while expected.control_unit._tick < datapath.control_unit._tick:
+                    expected.control_unit.process_instruction()
+
+                restored = create_datapath(tmp_path, INSTRUCTIONS_PROGRAM)
+                decode_checkpoint(restored, encode_checkpoint(datapath))
+                assert restored.control_unit._tick == expected.control_unit._tick
+                assert machine_state(restored) == machine_state(expected)
+
+        assert stop_tick > 3 * 150
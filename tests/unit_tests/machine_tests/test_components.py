@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from src.machine import Simulation
+from src.machine.units.common.components import (
+    DataLatch,
+    DataSelector,
+    set_strict_checks,
+)
+
+
+class TestComponents:
+    @pytest.mark.parametrize("bitsize,value", [(1, 1), (1, -1), (5, 31), (32, 2 ** 32 - 1), (32, -(2 ** 32 - 1))])
+    def test_latch_accepts_value(self, bitsize: int, value: int) -> None:
+        latch = DataLatch(bitsize)
+        latch.latch_value(value)
+
+        assert latch.get_value() == value
+
+    @pytest.mark.parametrize("bitsize,value", [(1, 2), (1, -2), (5, 32), (32, 2 ** 32), (32, -(2 ** 32))])
+    def test_latch_rejects_too_big_value(self, bitsize: int, value: int) -> None:
+        with pytest.raises(ValueError):
+            DataLatch(bitsize).latch_value(value)
+
+    def test_selector_rejects_incorrect_input(self) -> None:
+        selector = DataSelector(2)
+
+        with pytest.raises(ValueError):
+            selector.select_input(2)
+
+        with pytest.raises(ValueError):
+            selector.set_input_value(-1, 0)
+
+        with pytest.raises(TypeError):
+            selector.set_input_value(0, "0")
+
+    def test_unchecked_mode(self) -> None:
+        latch = DataLatch(bitsize=1)
+        selector = DataSelector(2)
+        set_strict_checks([latch, selector], False)
+
+        latch.latch_value(2)
+        selector.set_input_value(1, 5)
+        selector.select_input(1)
+
+        assert latch.get_value() == 2
+        assert selector.get_selected_value() == 5
+
+        set_strict_checks([latch, selector], True)
+        with pytest.raises(ValueError):
+            latch.latch_value(2)
+        with pytest.raises(ValueError):
+            selector.select_input(2)
+
+        with pytest.raises(ValueError):
+            DataLatch(bitsize=1).latch_value(2)
+
+    def test_strict_checks_per_simulation(self, tmp_path) -> None:
+        filename = os.path.join(tmp_path, "memory.bin")
+        with open(filename, mode="wb") as file:
+            file.write(bytes(2048))
+
+        def create(strict_checks: bool) -> Simulation:
+            return Simulation(filename, 2048, tmp_path, 1000, {}, [], "num", strict_checks=strict_checks)
+
+        strict, unchecked, strict_again = create(True), create(False), create(True)
+
+        for simulation in (strict, strict_again):
+            with pytest.raises(ValueError):
+                simulation.datapath.alu.flags["N"].latch_value(2)
+            with pytest.raises(ValueError):
+                simulation.control_unit.mux_pc.select_input(3)
+
+        unchecked.datapath.alu.flags["N"].latch_value(2)
+        unchecked.control_unit.mux_pc.select_input(2)
+        assert unchecked.datapath.alu.flags["N"].get_value() == 2
+        assert all(
+            type(component).__name__.startswith("Unchecked") for component in unchecked.datapath.components()
+        )
@@ -0,0 +1,156 @@
+import os
+from typing import List
+
+import pytest
+
+from src.isa.instructions import InstructionOpcode
+from src.machine import INSTRUCTION_ENGINE, Simulation
+from src.machine.constants import START_ADDR
+from src.machine.units.block_engine import BlockEngine
+from src.machine.units.common.exceptions import MachineStop
+from src.machine.units.core_scheduler import CoreScheduler
+from src.machine.units.datapath import Datapath
+from src.machine.units.instruction_engine import InstructionEngine
+from src.machine.units.memory import Memory
+
+T1, T2, T3, T4, T5, T6 = range(16, 22)
+
+LOCK_ADDR, COUNTER_ADDR = 0x600, 0x604
+SECOND_CORE_ADDR = 0x480
+ITERATIONS = 20
+
+
+def encode(opcode: InstructionOpcode, r1: int = 0, r2: int = 0, value: int = 0) -> bytes:
+    """`value` is an immediate, an address or a jump offset"""
+    word = opcode.opcode | r1 << 7 | r2 << 12
+    if opcode.addressing_mode.name == "RELATIVE":
+        word |= (value << 7) & 0xFFFFFF80
+    else:
+        word |= (value << 12) & 0xFFFFF000
+    return word.to_bytes(4, byteorder="big")
+
+
+SWAP_PROGRAM = b"".join([
+    encode(InstructionOpcode.LLI, T1, value=LOCK_ADDR),
+    encode(InstructionOpcode.LLI, T2, value=7),
+    encode(InstructionOpcode.SWAP, T2, T1),
+    encode(InstructionOpcode.LLI, T3, value=9),
+    encode(InstructionOpcode.SWAP, T3, T1),
+    encode(InstructionOpcode.LW, T4, value=LOCK_ADDR),
+    encode(InstructionOpcode.HALT),
+])
+
+# Each core adds 1 to the counter ITERATIONS times, the counter is read and
+# written back while the spin lock (taken by SWAP) is held
+COUNTER_PROGRAM = b"".join([
+    encode(InstructionOpcode.LLI, T1, value=LOCK_ADDR),
+    encode(InstructionOpcode.LLI, T5, value=ITERATIONS),
+    encode(InstructionOpcode.LLI, T6, value=0),
+    # loop:
+    encode(InstructionOpcode.LLI, T2, value=1),
+    # spin:
+    encode(InstructionOpcode.SWAP, T2, T1),
+    encode(InstructionOpcode.CMP, T2, T6),
+    encode(InstructionOpcode.JNZ, value=-0x8),
+    encode(InstructionOpcode.LW, T3, value=COUNTER_ADDR),
+    encode(InstructionOpcode.ADDI, T3, value=1),
+    encode(InstructionOpcode.SW, T3, value=COUNTER_ADDR),
+    encode(InstructionOpcode.SW, T6, value=LOCK_ADDR),
+    encode(InstructionOpcode.ADDI, T5, value=-1),
+    encode(InstructionOpcode.JNZ, value=-0x24),
+    encode(InstructionOpcode.HALT),
+])
+
+
+def write_memory(dirname: str, *programs: bytes) -> str:
+    """Programs are placed at START_ADDR and SECOND_CORE_ADDR"""
+    image = bytearray(2048)
+    for addr, program in zip([START_ADDR, SECOND_CORE_ADDR], programs):
+        image[addr:addr + len(program)] = program
+
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(image)
+
+    return filename
+
+
+def registers(datapath: Datapath) -> List[int]:
+    return [register.get_value() for register in datapath.register_file.registers]
+
+
+class TestSwap:
+    @pytest.mark.parametrize("engine_class", [InstructionEngine, BlockEngine])
+    def test_swap(self, tmp_path, engine_class) -> None:
+        filename = write_memory(tmp_path, SWAP_PROGRAM)
+
+        datapath = Datapath(Memory(filename, 2048))
+        with pytest.raises(MachineStop):
+            while True:
+                datapath.control_unit.process_instruction()
+
+        regs = registers(datapath)
+        assert (regs[T2], regs[T3], regs[T4]) == (0, 7, 9)
+
+        engine = engine_class(Datapath(Memory(filename, 2048)).control_unit)
+        with pytest.raises(MachineStop):
+            engine.run()
+
+        assert (engine.control_unit._tick, engine.regs) == (datapath.control_unit._tick, regs)
+
+
+class TestCoreScheduler:
+    def run_cores(self, filename: str) -> CoreScheduler:
+        memory = Memory(filename, 2048)
+        first = Datapath(memory)
+        second = Datapath(memory, start_addr=SECOND_CORE_ADDR, output_port=first.output_port)
+
+        scheduler = CoreScheduler([first.control_unit, second.control_unit])
+        for control_unit in scheduler.control_units:
+            control_unit.ticks_limit = 100_000
+
+        with pytest.raises(MachineStop):
+            scheduler.run()
+
+        return scheduler
+
+    def test_cores_share_memory(self, tmp_path) -> None:
+        filename = write_memory(tmp_path, COUNTER_PROGRAM, COUNTER_PROGRAM)
+        scheduler = self.run_cores(filename)
+
+        first, second = scheduler.control_units
+        assert scheduler.halted == [True, True]
+        assert first._tick == second._tick
+        assert first.datapath.memory is second.datapath.memory
+        assert first.datapath.memory.read(COUNTER_ADDR) == 2 * ITERATIONS
+        assert first.datapath.memory.read(LOCK_ADDR) == 0
+
+        again = self.run_cores(filename)
+        assert again.control_units[0]._tick == first._tick
+
+    def test_stop_tick(self, tmp_path) -> None:
+        filename = write_memory(tmp_path, COUNTER_PROGRAM, COUNTER_PROGRAM)
+        memory = Memory(filename, 2048)
+        first = Datapath(memory)
+        second = Datapath(memory, start_addr=SECOND_CORE_ADDR, output_port=first.output_port)
+
+        scheduler = CoreScheduler([first.control_unit, second.control_unit])
+        scheduler.run(50)
+        assert first.control_unit._tick == second.control_unit._tick == 50
+        assert first.control_unit.pc.get_value() != second.control_unit.pc.get_value()
+
+    def test_simulation(self, tmp_path) -> None:
+        filename = write_memory(tmp_path, COUNTER_PROGRAM, COUNTER_PROGRAM)
+        simulation = Simulation(
+            filename, 2048, tmp_path, 100_000, {}, [], "num",
+            cores=2, start_addrs=[START_ADDR, SECOND_CORE_ADDR],
+        )
+        simulation.run()
+
+        assert simulation.memory_unit.read(COUNTER_ADDR) == 2 * ITERATIONS
+        assert simulation.control_unit._tick == self.run_cores(filename).control_units[0]._tick
+
+        with pytest.raises(ValueError):
+            Simulation(filename, 2048, tmp_path, 100_000, {}, [], "num", INSTRUCTION_ENGINE, cores=2)
+        with pytest.raises(ValueError):
+            Simulation(filename, 2048, tmp_path, 100_000, {}, [], "num", cores=2, start_addrs=[START_ADDR])
@@ -0,0 +1,48 @@
+from src.machine.units.event_scheduler import NO_EVENTS, EventScheduler
+
+
+class TestEventScheduler:
+    def test_runs_due_events_in_order(self) -> None:
+        scheduler = EventScheduler()
+        fired = []
+        scheduler.schedule(20, lambda tick: fired.append(("b", tick)))
+        scheduler.schedule(10, lambda tick: fired.append(("a", tick)))
+        scheduler.schedule(20, lambda tick: fired.append(("c", tick)))
+
+        assert scheduler.next_tick == 10
+
+        scheduler.run_due(15)
+        assert fired == [("a", 15)]
+        assert scheduler.next_tick == 20
+
+        scheduler.run_due(20)
+        assert fired == [("a", 15), ("b", 20), ("c", 20)]
+        assert scheduler.next_tick == NO_EVENTS
+
+    def test_cancel(self) -> None:
+        scheduler = EventScheduler()
+        fired = []
+        event = scheduler.schedule(10, fired.append)
+        scheduler.schedule(30, fired.append)
+
+        scheduler.cancel(event)
+        assert scheduler.next_tick == 30
+
+        scheduler.run_due(30)
+        assert fired == [30]
+
+    def test_event_schedules_next_one(self) -> None:
+        scheduler = EventScheduler()
+        fired = []
+
+        def timer(tick: int) -> None:
+            fired.append(tick)
+            if len(fired) < 3:
+                scheduler.schedule(tick + 5, timer)
+
+        scheduler.schedule(5, timer)
+        for tick in range(1, 30):
+            if tick >= scheduler.next_tick:
+                scheduler.run_due(tick)
+
+        assert fired == [5, 10, 15]
@@ -0,0 +1,39 @@
+import pytest
+
+from src.machine.fmt.format_instruction import (
+    repr_instruction,
+    string_repr_instruction,
+)
+
+
+class TestFormatInstruction:
+    @pytest.mark.parametrize(
+        "word, expected",
+        [
+            (0x00048B71, "LLI T7, 0x48"),
+            (0xFFFFFBF2, "ADDI T8, 0x-1"),
+            (0x00400C00, "LW A1, 0x400"),
+            (0xFFFFFF91, "JZ 0x-1"),
+            (0x00359C60, "ADD A1, A2, A3"),
+            (0x00000C40, "JR A1"),
+            (0x00000031, "HALT"),
+        ],
+    )
+    def test_repr_instruction(self, word: int, expected: str) -> None:
+        assert repr_instruction(word) == expected
+        assert string_repr_instruction(bin(word)[2:].zfill(32)) == expected
+
+    def test_repr_instruction_is_cached(self) -> None:
+        repr_instruction.cache_clear()
+        repr_instruction(0x00000031)
+        repr_instruction(0x00000031)
+
+        assert repr_instruction.cache_info().hits == 1
+
+    def test_unknown_opcode(self) -> None:
+        with pytest.raises(ValueError):
+            repr_instruction(0b1111111)
+
+    def test_wrong_instruction_size(self) -> None:
+        with pytest.raises(ValueError):
+            string_repr_instruction("1" * 31)
@@ -0,0 +1,17 @@
+from array import array
+
+import pytest
+
+from src.machine.fmt.format_number import (
+    _LogNumberFmt,
+    format_number,
+    format_numbers,
+)
+
+
+class TestFormatNumbers:
+    @pytest.mark.parametrize("fmt", list(_LogNumberFmt))
+    def test_same_as_format_number(self, fmt) -> None:
+        values = array("q", [0, 1, -1, 0x7FFF, -0x8000, 1234])
+
+        assert format_numbers(values, fmt, 16) == [format_number(value, fmt, 16) for value in values]
@@ -0,0 +1,91 @@
+import os
+import random
+
+from src.isa.constants import INSTR_OPCODE_SIZE, REG_ID_SIZE, WORD_SIZE
+from src.isa.instructions import (
+    ADDRESSING_MODE_BY_OPCODE,
+    INSTRUCTION_BY_OPCODE,
+    OPCODES_COUNT,
+    AddressingMode,
+    InstructionOpcode,
+)
+from src.machine.units.datapath import Datapath
+from src.machine.units.instruction_cache import (
+    DecodedInstruction,
+    decode_instruction,
+)
+from src.machine.units.instruction_engine import InstructionEngine
+from src.machine.units.memory import Memory
+
+
+def decode_bits(word: int) -> DecodedInstruction:
+    """Reference decoder working on the binary string forms of the ISA"""
+    bits = bin(word)[2:].zfill(WORD_SIZE)
+    opcode_bits = bits[-INSTR_OPCODE_SIZE:]
+    instruction = next(instruction for instruction in InstructionOpcode if instruction.bincode == opcode_bits)
+    mode = AddressingMode(opcode_bits[:len(AddressingMode.ABSOLUTE.bincode)])
+
+    def field(start: int, size: int) -> int:
+        """`size` bits after the lowest `start` bits"""
+        return int(bits[WORD_SIZE - start - size:WORD_SIZE - start], 2)
+
+    def signed(start: int) -> int:
+        value = field(start, WORD_SIZE - start)
+        return value - 2 ** (WORD_SIZE - start) if bits[0] == "1" else value
+
+    r1 = field(INSTR_OPCODE_SIZE, REG_ID_SIZE)
+    r2 = field(INSTR_OPCODE_SIZE + REG_ID_SIZE, REG_ID_SIZE)
+    r3 = field(INSTR_OPCODE_SIZE + REG_ID_SIZE * 2, REG_ID_SIZE)
+    opcode = int(instruction.bincode, 2)
+
+    if mode in (AddressingMode.ABSOLUTE, AddressingMode.DIRECT_LOAD):
+        return DecodedInstruction(word, opcode, r1=r1, imm=signed(INSTR_OPCODE_SIZE + REG_ID_SIZE))
+    if mode == AddressingMode.RELATIVE:
+        return DecodedInstruction(word, opcode, imm=signed(INSTR_OPCODE_SIZE))
+    if mode == AddressingMode.REGISTER_1:
+        return DecodedInstruction(word, opcode, r1=r1)
+    if mode == AddressingMode.REGISTER_2:
+        return DecodedInstruction(word, opcode, r1=r1, r2=r2)
+    if mode == AddressingMode.REGISTER_3:
+        return DecodedInstruction(word, opcode, r1=r1, r2=r2, r3=r3)
+    return DecodedInstruction(word, opcode)
+
+
+class TestOpcodeTables:
+    def test_tables_match_binary_codes(self) -> None:
+        assert len(INSTRUCTION_BY_OPCODE) == len(ADDRESSING_MODE_BY_OPCODE) == OPCODES_COUNT
+
+        for opcode in range(OPCODES_COUNT):
+            bits = bin(opcode)[2:].zfill(INSTR_OPCODE_SIZE)
+            instruction = next((instruction for instruction in InstructionOpcode if instruction.bincode == bits), None)
+
+            assert INSTRUCTION_BY_OPCODE[opcode] is instruction
+            if instruction is None:
+                assert ADDRESSING_MODE_BY_OPCODE[opcode] is None
+            else:
+                assert ADDRESSING_MODE_BY_OPCODE[opcode].bincode == bits[:len(AddressingMode.ABSOLUTE.bincode)]
+
+    def test_decode_instruction(self) -> None:
+        generator = random.Random(0)
+
+        for instruction in InstructionOpcode:
+            words = [0, 2 ** WORD_SIZE - 1] + [generator.getrandbits(WORD_SIZE) for _ in range(50)]
+            for word in words:
+                word = (word & ~(OPCODES_COUNT - 1)) | instruction.opcode
+                assert decode_instruction(word) == decode_bits(word)
+
+    def test_dispatch_tables_cover_instructions(self, tmp_path) -> None:
+        filename = os.path.join(tmp_path, "memory.bin")
+        with open(filename, mode="wb") as file:
+            file.write(bytes(64))
+
+        engine = InstructionEngine(Datapath(Memory(filename, 2048)).control_unit)
+        microprograms = engine.control_unit._microprograms
+
+        for opcode in range(OPCODES_COUNT):
+            instruction = INSTRUCTION_BY_OPCODE[opcode]
+            assert (microprograms[opcode] is not None) == (instruction is not None)
+
+            # HALT and RETI are run by the step itself
+            has_handler = instruction not in (None, InstructionOpcode.HALT, InstructionOpcode.RETI)
+            assert (engine._handlers[opcode] is not None) == has_handler
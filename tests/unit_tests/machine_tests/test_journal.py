@@ -0,0 +1,79 @@
+import os
+from typing import Optional
+
+import pytest
+
+from src.machine import EXEC_LOG_FILENAME, Simulation
+from src.machine.constants import START_ADDR
+from src.machine.fmt.format_number import _LogNumberFmt
+from src.machine.units.common.exceptions import MachineLimitException
+
+# Counts T1 down from 20 and stores it to 0x400 on every iteration
+PROGRAM = bytes.fromhex(
+    "00014871"  # LLI T1, 0x14
+    "00400801"  # SW T1, 0x400
+    "fffff872"  # ADDI T1, 0x-1
+    "fffffc12"  # JNZ -0x8
+    "00000031"  # HALT
+)
+
+JOURNAL_FMT = [
+    ("PC", _LogNumberFmt.HEXADECIMAL, 32),
+    ("T1", _LogNumberFmt.DECIMAL, 32),
+    ("ALU_NZVC", _LogNumberFmt.BINARY, 4),
+]
+
+
+def journaled_simulation(dirname: str, chunk_size: Optional[int], ticks_limit: int = 10_000) -> Simulation:
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(bytes(START_ADDR) + PROGRAM)
+
+    simulation_dirname = os.path.join(dirname, f"simulation_{chunk_size}_{ticks_limit}")
+    return Simulation(
+        filename, 2048, simulation_dirname, ticks_limit, {}, JOURNAL_FMT, "num", journal_chunk_size=chunk_size,
+    )
+
+
+def read_journal(simulation: Simulation) -> str:
+    with open(os.path.join(simulation.simulation_dirname, EXEC_LOG_FILENAME)) as file:
+        return file.read()
+
+
+class TestJournalWriter:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64])
+    def test_streamed_journal_is_same(self, tmp_path, chunk_size: int) -> None:
+        expected = journaled_simulation(tmp_path, None)
+        expected.run()
+
+        simulation = journaled_simulation(tmp_path, chunk_size)
+        simulation.run()
+
+        assert read_journal(simulation) == read_journal(expected)
+        assert read_journal(simulation).count("\n") == expected.tick
+
+    def test_chunks_are_written_while_running(self, tmp_path) -> None:
+        simulation = journaled_simulation(tmp_path, 7)
+
+        simulation.run_for(30)
+        lines = read_journal(simulation).splitlines()
+        assert len(lines) == simulation.tick // 7 * 7
+        assert len(simulation.control_unit.trace) < 7
+
+        simulation.finish()
+        expected = journaled_simulation(tmp_path, None)
+        expected.run()
+        assert read_journal(expected).startswith("".join(f"{line}\n" for line in lines))
+
+    def test_ticks_limit_leaves_complete_journal(self, tmp_path) -> None:
+        expected = journaled_simulation(tmp_path, None, ticks_limit=53)
+        with pytest.raises(MachineLimitException):
+            expected.run()
+
+        simulation = journaled_simulation(tmp_path, 7, ticks_limit=53)
+        with pytest.raises(MachineLimitException):
+            simulation.run()
+
+        assert simulation.journal_writer is None
+        assert read_journal(simulation) == read_journal(expected)
+        assert read_journal(simulation).count("\n") == 53
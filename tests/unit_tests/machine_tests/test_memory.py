@@ -0,0 +1,136 @@
+import os
+
+import pytest
+
+from src.machine.units.common.exceptions import MachineMemoryException
+from src.machine.units.devices import DEVICE_PAGE_BITS, Device
+from src.machine.units.instruction_cache import DecodedInstruction
+from src.machine.units.memory import Memory
+
+# LLI T7, 0x48 - ADDI T8, 0x0
+PROGRAM = bytes.fromhex("00048b71" "00000bf2")
+
+
+def create_memory(dirname: str, content: bytes = PROGRAM, size: int = 64, mapped: bool = False) -> Memory:
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(content)
+
+    return Memory(filename, size, mapped=mapped)
+
+
+class CounterDevice(Device):
+    """Reads return the number of writes"""
+
+    def __init__(self):
+        self.writes = []
+
+    def read(self, memory: Memory, addr: int) -> int:
+        return len(self.writes)
+
+    def write(self, memory: Memory, addr: int, value: int) -> None:
+        self.writes.append((addr, value))
+
+
+class TestMemory:
+    def test_fetch_decodes_instruction(self, tmp_path) -> None:
+        memory = create_memory(tmp_path)
+
+        assert memory.fetch(0) == DecodedInstruction(0x00048B71, 0b1110001, r1=0b10110, imm=0x48)
+        assert memory.fetch(4) == DecodedInstruction(0x00000BF2, 0b1110010, r1=0b10111, imm=0)
+
+    def test_fetch_is_cached(self, tmp_path) -> None:
+        memory = create_memory(tmp_path)
+
+        assert memory.fetch(0) is memory.fetch(0)
+
+    @pytest.mark.parametrize("write_addr", [0, 1, 3])
+    def test_write_invalidates_fetched_instruction(self, tmp_path, write_addr: int) -> None:
+        memory = create_memory(tmp_path)
+        memory.fetch(0)
+        memory.fetch(4)
+
+        memory.write(write_addr, 0)
+
+        assert memory.fetch(0).word == memory.read(0)
+        assert memory.fetch(4).word == memory.read(4)
+
+    @pytest.mark.parametrize("mapped", [False, True])
+    @pytest.mark.parametrize("addr", [0, 2, 5, 8, 30])
+    def test_read_after_write(self, tmp_path, mapped: bool, addr: int) -> None:
+        memory = create_memory(tmp_path, content=PROGRAM + b"\x01\x02", mapped=mapped)
+
+        memory.write(addr, -2)
+
+        assert memory.read(addr) == 0xFFFFFFFE
+        assert memory.size == len(PROGRAM) + 2 + 64
+
+    def test_mapped_image_is_not_changed(self, tmp_path) -> None:
+        memory = create_memory(tmp_path, mapped=True)
+
+        memory.write(0, 0)
+
+        assert memory.read(0) == 0
+        assert open(os.path.join(tmp_path, "memory.bin"), mode="rb").read() == PROGRAM
+
+    @pytest.mark.parametrize("mapped", [False, True])
+    @pytest.mark.parametrize("addr", [-4, -1, len(PROGRAM) + 61, 100])
+    def test_out_of_range_access(self, tmp_path, mapped: bool, addr: int) -> None:
+        memory = create_memory(tmp_path, mapped=mapped)
+
+        with pytest.raises(MachineMemoryException):
+            memory.read(addr)
+
+        with pytest.raises(MachineMemoryException):
+            memory.write(addr, 0)
+
+    @pytest.mark.parametrize("mapped", [False, True])
+    def test_device_dispatch(self, tmp_path, mapped: bool) -> None:
+        memory = create_memory(tmp_path, mapped=mapped)
+        device = CounterDevice()
+        memory.devices.attach(device, 16, size=8)
+
+        memory.write(16, 7)
+        memory.write(20, 9)
+        memory.write(24, 5)
+
+        assert device.writes == [(16, 7), (20, 9)]
+        assert (memory.read(16), memory.read(20), memory.read(24)) == (2, 2, 5)
+        # unaligned accesses and RAM accesses bypass the device
+        assert memory.read(14) == 0
+        assert memory.read_ram(16) == 0
+
+    @pytest.mark.parametrize("addr, size", [(18, 4), (16, 6), (68, 8), (-4, 4), (8, 0)])
+    def test_device_invalid_range(self, tmp_path, addr: int, size: int) -> None:
+        memory = create_memory(tmp_path)
+
+        with pytest.raises(ValueError):
+            memory.devices.attach(CounterDevice(), addr, size)
+
+    def test_device_ranges_dont_overlap(self, tmp_path) -> None:
+        memory = create_memory(tmp_path)
+        memory.devices.attach(CounterDevice(), 16, size=8)
+
+        with pytest.raises(ValueError):
+            memory.devices.attach(CounterDevice(), 20)
+
+    def test_device_in_large_image(self, tmp_path) -> None:
+        image_size = 64 * 1024 * 1024
+        filename = os.path.join(tmp_path, "memory.bin")
+        with open(filename, mode="wb") as file:
+            file.write(PROGRAM)
+            file.truncate(image_size)
+
+        memory = Memory(filename, image_size, mapped=True)
+        device = CounterDevice()
+        memory.devices.attach(device, image_size - 8)
+
+        # an entry per 4 KB page, the words of the device-backed page are dispatched one by one
+        assert len(memory.devices.pages) == (2 * image_size >> DEVICE_PAGE_BITS) + 1
+        memory.write(image_size - 8, 7)
+        memory.write(image_size - 4, 9)
+        memory.write(image_size, 5)
+
+        assert device.writes == [(image_size - 8, 7)]
+        assert [memory.read(image_size - 12 + offset) for offset in range(0, 16, 4)] == [0, 1, 9, 5]
+        assert memory.fetch(0) == DecodedInstruction(0x00048B71, 0b1110001, r1=0b10110, imm=0x48)
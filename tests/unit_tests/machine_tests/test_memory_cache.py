@@ -0,0 +1,58 @@
+import pytest
+
+from src.machine.units.memory_cache import MemoryCache
+
+
+class TestMemoryCache:
+    def test_lru_replacement(self) -> None:
+        # 2 sets of 2 lines, addresses 0x00, 0x20 and 0x40 are in the same set
+        cache = MemoryCache(size=64, line_size=16, associativity=2, hit_latency=1, miss_latency=5)
+
+        assert [cache.access(addr) for addr in (0x00, 0x20, 0x04, 0x40, 0x00, 0x20)] == [5, 5, 1, 5, 1, 5]
+        assert (cache.read_hits, cache.read_misses) == (2, 4)
+
+    def test_fifo_replacement(self) -> None:
+        cache = MemoryCache(size=64, line_size=16, associativity=2, replacement="fifo", miss_latency=5)
+
+        assert [cache.access(addr) for addr in (0x00, 0x20, 0x00, 0x40, 0x00)] == [5, 5, 0, 5, 5]
+
+    def test_write_back_evicts_dirty_line(self) -> None:
+        cache = MemoryCache(size=32, line_size=16, associativity=1, miss_latency=5)
+
+        assert cache.access(0x00, write=True) == 5
+        assert cache.access(0x20) == 10
+        assert cache.access(0x00) == 5
+        assert cache.writebacks == 1
+
+    def test_write_through_doesnt_allocate(self) -> None:
+        cache = MemoryCache(size=32, line_size=16, associativity=1, write_policy="write_through", miss_latency=5)
+
+        assert cache.access(0x00, write=True) == 5
+        assert cache.access(0x00) == 5
+        assert cache.access(0x00, write=True) == 0
+        assert cache.access(0x20) == 5
+        assert (cache.write_hits, cache.write_misses, cache.writebacks) == (1, 1, 0)
+
+    def test_state_roundtrip(self) -> None:
+        cache = MemoryCache(size=64, line_size=16, associativity=2, replacement="random")
+        for addr in range(0, 512, 12):
+            cache.access(addr, write=addr % 3 == 0)
+
+        restored = MemoryCache(size=64, line_size=16, associativity=2, replacement="random")
+        restored.set_state(cache.get_state())
+
+        assert restored.get_state() == cache.get_state()
+        addrs = range(0, 512, 20)
+        assert [restored.access(addr) for addr in addrs] == [cache.access(addr) for addr in addrs]
+
+    @pytest.mark.parametrize("config", [
+        {"line_size": 12},
+        {"size": 96},
+        {"associativity": 0},
+        {"replacement": "lfu"},
+        {"write_policy": "write_around"},
+        {"miss_latency": -1},
+    ])
+    def test_invalid_config(self, config) -> None:
+        with pytest.raises(ValueError):
+            MemoryCache(**config)
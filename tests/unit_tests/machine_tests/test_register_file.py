@@ -0,0 +1,71 @@
+import os
+
+from src.isa.constants import REG_ID_SIZE
+from src.isa.registers import REGISTER_BY_CODE, RegisterCode
+from src.machine.units.common.enums import RegisterFileFetch
+from src.machine.units.datapath import Datapath
+from src.machine.units.memory import Memory
+
+
+def create_datapath(dirname: str) -> Datapath:
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(bytes(64))
+
+    return Datapath(Memory(filename, 2048))
+
+
+def select_registers(datapath: Datapath, value: int) -> None:
+    """Put register numbers on the Control Unit output (as the instruction decoder does)"""
+    datapath.control_unit.mux_dp.set_input_value(1, value)
+    datapath.control_unit.mux_dp.select_input(1)
+
+
+def write_registers(datapath: Datapath) -> None:
+    """Every register gets 100 + its number"""
+    for register in RegisterCode:
+        select_registers(datapath, int(register.value, 2))
+        datapath.br.latch_value(100 + int(register.value, 2))
+        datapath.register_file.signal_write_reg()
+
+
+class TestRegisterFile:
+    def test_registers_are_indexed_by_code(self) -> None:
+        assert [register.code for register in REGISTER_BY_CODE] == list(range(2 ** REG_ID_SIZE))
+        assert all(register.code == int(register.value, 2) for register in RegisterCode)
+
+    def test_write_and_read(self, tmp_path) -> None:
+        datapath = create_datapath(tmp_path)
+        write_registers(datapath)
+        register_file = datapath.register_file
+
+        for register in RegisterCode:
+            code = int(register.value, 2)
+            assert register_file.registers[code].get_value() == 100 + code
+
+            select_registers(datapath, code)
+            register_file.signal_read_reg(RegisterFileFetch.LEFT)
+            register_file.signal_read_reg(RegisterFileFetch.RIGHT)
+            assert datapath.mux_alu_a.get_input_values()[0] == datapath.mux_br.get_input_values()[0] == 100 + code
+            assert datapath.mux_alu_b.get_input_values()[0] == datapath.mux_ar.get_input_values()[1] == 100 + code
+
+    def test_read_both(self, tmp_path) -> None:
+        datapath = create_datapath(tmp_path)
+        write_registers(datapath)
+        first, second = RegisterCode.T1.code, RegisterCode.A8.code
+
+        # the second register is the higher field, it goes to the left output
+        select_registers(datapath, (second << REG_ID_SIZE) + first)
+        datapath.register_file.signal_read_reg(RegisterFileFetch.BOTH)
+
+        assert datapath.mux_alu_a.get_input_values()[0] == 100 + second
+        assert datapath.mux_alu_b.get_input_values()[0] == 100 + first
+
+    def test_trace_probes(self, tmp_path) -> None:
+        datapath = create_datapath(tmp_path)
+        write_registers(datapath)
+        probes = datapath.control_unit.trace_probes()
+
+        assert {register.name: probes[register.name]() for register in RegisterCode} == {
+            register.name: 100 + int(register.value, 2) for register in RegisterCode
+        }
@@ -0,0 +1,85 @@
+import os
+from typing import List, Optional
+
+import pytest
+
+from src.machine.constants import START_ADDR
+from src.machine.units.common.exceptions import MachineStop
+from src.machine.units.datapath import Datapath
+from src.machine.units.memory import Memory
+from src.machine.units.trace import TickTrace
+
+# Counts T1 down from 3 and stores it to 0x400 on every iteration
+PROGRAM = bytes.fromhex(
+    "00003871"  # LLI T1, 0x3
+    "00400801"  # SW T1, 0x400
+    "fffff872"  # ADDI T1, 0x-1
+    "fffffc12"  # JNZ -0x8
+    "00000031"  # HALT
+)
+
+
+def run_traced(dirname: str, fields: Optional[List[str]] = None) -> TickTrace:
+    """Every probe is recorded without `fields`"""
+    filename = os.path.join(dirname, "memory.bin")
+    with open(filename, mode="wb") as file:
+        file.write(bytes(START_ADDR) + PROGRAM)
+
+    control_unit = Datapath(Memory(filename, 2048)).control_unit
+    probes = control_unit.trace_probes()
+    control_unit.trace = TickTrace(fields or list(probes), probes)
+
+    with pytest.raises(MachineStop):
+        while True:
+            control_unit.process_instruction()
+
+    return control_unit.trace
+
+
+class TestTickTrace:
+    def test_journal_fields_are_same_as_full_trace(self, tmp_path) -> None:
+        full = run_traced(tmp_path)
+        trace = run_traced(tmp_path, ["T1", "PC", "T1", "IR"])
+
+        assert trace.fields == ["T1", "PC", "IR"]
+        assert len(trace) == len(full) == full.columns["TICK"][-1]
+        assert full.columns["TICK"].tolist() == list(range(1, len(full) + 1))
+        assert set(full.columns["T1"]) == {0, 1, 2, 3}
+        for field in trace.fields:
+            assert trace.columns[field] == full.columns[field]
+
+    def test_signed_and_unsigned_words_fit(self) -> None:
+        values = iter([-2 ** 31, 2 ** 32 - 1])
+        trace = TickTrace(["IR"], {"IR": lambda: next(values)})
+        trace.record()
+        trace.record()
+
+        assert trace.columns["IR"].tolist() == [-2 ** 31, 2 ** 32 - 1]
+
+    def test_chunks(self, tmp_path) -> None:
+        full = run_traced(tmp_path, ["PC", "IR"])
+
+        chunks = []
+        filename = os.path.join(tmp_path, "memory.bin")
+        control_unit = Datapath(Memory(filename, 2048)).control_unit
+
+        def on_chunk(trace: TickTrace) -> None:
+            chunks.append(trace.columns["PC"].tolist())
+            trace.clear()
+
+        control_unit.trace = TickTrace(["PC", "IR"], control_unit.trace_probes(), 4, on_chunk)
+        with pytest.raises(MachineStop):
+            while True:
+                control_unit.process_instruction()
+
+        assert all(len(chunk) == 4 for chunk in chunks)
+        assert sum(chunks, []) + control_unit.trace.columns["PC"].tolist() == full.columns["PC"].tolist()
+        assert len(control_unit.trace) == len(full) % 4
+
+    def test_unknown_field(self) -> None:
+        with pytest.raises(ValueError):
+            TickTrace(["PC", "XX"], {"PC": lambda: 0})
+
+    def test_invalid_chunk_size(self) -> None:
+        with pytest.raises(ValueError):
+            TickTrace(["PC"], {"PC": lambda: 0}, chunk_size=0)